@@ -1,19 +1,112 @@
 # app.py
 
-import uvicorn
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Presupuesto de arranque en frío (import de backend.main + lifespan), en ms
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+# Módulos que no deben cargarse al importar la app (llegan con los routers)
+DEFERRED_MODULES = ("sqlalchemy", "jwt", "backend.routers", "backend.database")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def import_profile(top: int = 12):
+    """Import de backend.main en un proceso limpio con ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main, sys; "
+         f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if len(indent) == 1:  # módulos importados directamente por el proceso
+            total += int(cumulative_us)
+        rows.append((int(self_us), int(cumulative_us), name))
+    rows.sort(reverse=True)
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return total / 1000, rows[:top], loaded
+
+
+def profile_startup(budget_ms: float) -> int:
+    """Reporte de arranque: import en frío, lifespan y primeras peticiones."""
+    # Se mide como en Vercel: sin precálculo del GeoJSON ni migraciones al arrancar
+    os.environ.setdefault("PRELOAD_GEOJSON", "0")
+    os.environ.setdefault("AUTO_MIGRATE", "0")
+    total_ms, heaviest, loaded = import_profile()
+    print("\n" + "="*50)
+    print("⏱️  Perfil de arranque")
+    print("="*50)
+    print(f"Import de backend.main (proceso limpio): {total_ms:8.1f} ms")
+    print("\nMódulos más costosos (tiempo propio):")
+    for self_us, cumulative_us, name in heaviest:
+        print(f"  {self_us / 1000:7.1f} ms  (acum. {cumulative_us / 1000:7.1f} ms)  {name}")
+    if loaded:
+        print(f"\n❌ Cargados al importar (deberían ser perezosos): {', '.join(loaded)}")
+
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    in_process_ms = (time.perf_counter() - start) * 1000
+
+    steps = []
+    start = time.perf_counter()
+    # Sin migrar, la petición a la API responde 500 pero el tiempo de carga se mide igual
+    with TestClient(app, raise_server_exceptions=False) as client:
+        steps.append(("lifespan", (time.perf_counter() - start) * 1000))
+        for label, url in (("1ª GET /api/districts-geojson", "/api/districts-geojson?zoom=11"),
+                           ("1ª GET /api/projects (routers + motor)", "/api/projects?limit=1")):
+            start = time.perf_counter()
+            status = client.get(url).status_code
+            steps.append((f"{label} [{status}]", (time.perf_counter() - start) * 1000))
+
+    print(f"\nImport en este proceso:                  {in_process_ms:8.1f} ms")
+    for label, ms in steps:
+        print(f"{label:41} {ms:8.1f} ms")
+
+    cold_ms = total_ms + steps[0][1]
+    ok = cold_ms <= budget_ms and not loaded
+    print(f"\nArranque en frío (import + lifespan): {cold_ms:.1f} ms / presupuesto {budget_ms:.0f} ms "
+          f"{'✅' if ok else '❌'}")
+    print("="*50 + "\n")
+    return 0 if ok else 1
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mide el arranque en frío y sale con 1 si supera el presupuesto")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        sys.exit(profile_startup(args.budget_ms))
+
+    import uvicorn
+    from backend.database import describe
+
     print("\n" + "="*50)
     print("🚀 Servidor iniciado correctamente")
     print("="*50)
     print("📱 Acceso local:      http://localhost:8000")
     print("🌐 Acceso red local:  http://0.0.0.0:8000")
     print("📚 Docs API:          http://localhost:8000/docs")
+    print(describe())
     print("="*50 + "\n")
-    
+
     uvicorn.run(
         "backend.main:app",
         host="0.0.0.0",  # ← MANTÉN ESTO para acceso desde red
         port=8000,
         reload=True
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,209 @@
+# backend/bulk_import.py
+"""
+Importación masiva de proyectos (POST /api/projects/bulk).
+
+El cuerpo (NDJSON o un arreglo JSON) se decodifica a medida que llega, cada
+fila se valida por separado y las filas válidas se escriben por tandas: un
+INSERT multi-fila por tabla y un commit por tanda. Las filas cuyo
+``source_url`` ya existe (o se repite en el mismo envío) se omiten.
+"""
+import json
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend import models, schemas, district_summary, districts, search, change_log
+from backend.drawing_events import drawings_committed, projects_committed
+from backend.geometry import values_bbox
+
+DEFAULT_BATCH_SIZE = 500
+
+Row = Tuple[int, schemas.ProjectImport]   # (número de fila, datos validados)
+
+
+# ---------------------------------------------
+# DECODIFICACIÓN INCREMENTAL
+# ---------------------------------------------
+async def iter_json_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[object, Optional[str]]]:
+    """
+    (objeto, None) por cada registro del cuerpo, o (None, error) si un registro
+    no es JSON válido. Acepta NDJSON o un arreglo JSON de nivel superior.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    mode = None          # "array" | "ndjson"
+    finished = False
+    pending = b""
+
+    async for chunk in chunks:
+        # Cortar solo en límites de carácter UTF-8 completos
+        pending += chunk
+        try:
+            text = pending.decode("utf-8")
+            pending = b""
+        except UnicodeDecodeError as e:
+            text = pending[:e.start].decode("utf-8")
+            pending = pending[e.start:]
+        buffer += text
+
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            mode = "array" if stripped[0] == "[" else "ndjson"
+            buffer = stripped[1:] if mode == "array" else stripped
+
+        if mode == "ndjson":
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                if line.strip():
+                    yield _decode_line(line)
+        elif not finished:
+            buffer, records, finished = _drain_array(decoder, buffer)
+            for record in records:
+                yield record
+
+    if mode == "ndjson" and buffer.strip():
+        yield _decode_line(buffer)
+    elif mode == "array" and not finished:
+        buffer, records, finished = _drain_array(decoder, buffer, final=True)
+        for record in records:
+            yield record
+        if not finished:
+            yield None, "Unterminated JSON array"
+
+
+def _decode_line(line: str):
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+
+def _drain_array(decoder: json.JSONDecoder, buffer: str, final: bool = False):
+    """Saca del buffer los elementos completos del arreglo; devuelve (resto, registros, terminado)."""
+    records = []
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if not buffer:
+            return buffer, records, False
+        if buffer[0] == "]":
+            return "", records, True
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except ValueError as e:
+            if final:
+                records.append((None, f"Invalid JSON: {e}"))
+                return "", records, True
+            return buffer, records, False   # elemento incompleto: esperar más datos
+        records.append((obj, None))
+        buffer = buffer[end:]
+
+
+def validate(record) -> Tuple[Optional[schemas.ProjectImport], Optional[str]]:
+    try:
+        return schemas.ProjectImport.model_validate(record), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+
+
+# ---------------------------------------------
+# ESCRITURA POR TANDAS
+# ---------------------------------------------
+def existing_source_urls(db: Session, urls: Iterable[str]) -> Set[str]:
+    urls = [u for u in set(urls) if u]
+    if not urls:
+        return set()
+    return {u for (u,) in db.query(models.Project.source_url).filter(models.Project.source_url.in_(urls))}
+
+
+def import_batch(db: Session, rows: List[Row], seen_urls: Set[str]) -> List[dict]:
+    """Escribe una tanda en una transacción. Devuelve el resultado de cada fila."""
+    results: Dict[int, dict] = {}
+
+    # 1. Deduplicar por source_url (contra la BD y contra filas anteriores del envío)
+    already = existing_source_urls(db, (p.source_url for _, p in rows))
+    fresh: List[Row] = []
+    for row_number, project in rows:
+        url = project.source_url
+        if url and (url in already or url in seen_urls):
+            results[row_number] = {"row": row_number, "status": "duplicate", "source_url": url}
+            continue
+        if url:
+            seen_urls.add(url)
+        fresh.append((row_number, project))
+
+    if not fresh:
+        return [results[n] for n, _ in rows]
+
+    try:
+        # 2. Proyectos: un INSERT multi-fila con los ids en el orden de los parámetros
+        project_ids = db.scalars(
+            insert(models.Project).returning(models.Project.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": p.name, "description": p.description, "status": p.status,
+                    "verified": p.verified, "source_url": p.source_url, "scraped_at": p.scraped_at,
+                }
+                for _, p in fresh
+            ]
+        ).all()
+
+        # 3. Hijos de cada proyecto, también en un INSERT por tabla
+        district_ids = districts.resolve_ids(db, {name for _, p in fresh for name in p.districts})
+        district_rows, drawing_rows, annotation_rows = [], [], []
+        for project_id, (_, p) in zip(project_ids, fresh):
+            for name in dict.fromkeys(p.districts):
+                district_rows.append(
+                    {"project_id": project_id, "distrito_name": name, "district_id": district_ids.get(name)}
+                )
+            drawing_rows.extend(models.Drawing.row_values(project_id, d.geojson, d.drawing_type) for d in p.drawings)
+            annotation_rows.extend({"project_id": project_id, **a.model_dump()} for a in p.annotations)
+
+        if district_rows:
+            db.execute(insert(models.ProjectDistrict), district_rows)
+        added = []
+        if drawing_rows:
+            added = [
+                (r.id, r.project_id, values_bbox(r._mapping))
+                for r in db.execute(
+                    insert(models.Drawing).returning(
+                        models.Drawing.id, models.Drawing.project_id,
+                        models.Drawing.min_lon, models.Drawing.min_lat,
+                        models.Drawing.max_lon, models.Drawing.max_lat,
+                    ),
+                    drawing_rows
+                )
+            ]
+        annotation_ids = []
+        if annotation_rows:
+            annotation_ids = db.execute(
+                insert(models.Annotation).returning(models.Annotation.id, models.Annotation.project_id),
+                annotation_rows
+            ).all()
+
+        district_summary.refresh_districts(db, (r["distrito_name"] for r in district_rows))
+        search.reindex_projects(db, project_ids)
+        change_log.record(db, change_log.PROJECT, [(project_id, project_id) for project_id in project_ids])
+        change_log.record(db, change_log.DRAWING, [(drawing_id, project_id) for drawing_id, project_id, _ in added])
+        change_log.record(db, change_log.ANNOTATION, annotation_ids)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        for row_number, project in fresh:
+            if project.source_url:
+                seen_urls.discard(project.source_url)
+            results[row_number] = {"row": row_number, "status": "error", "error": str(e)}
+        return [results[n] for n, _ in rows]
+
+    drawings_committed(added=added)
+    projects_committed(db, project_ids)
+    for project_id, (row_number, project) in zip(project_ids, fresh):
+        results[row_number] = {"row": row_number, "status": "created", "id": project_id}
+        if project.source_url:
+            results[row_number]["source_url"] = project.source_url
+    return [results[n] for n, _ in rows]
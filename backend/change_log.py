@@ -0,0 +1,263 @@
+# backend/change_log.py
+"""
+Registro de cambios para la sincronización incremental de los clientes.
+
+Las escrituras de proyectos, dibujos y anotaciones agregan filas a
+``change_log`` dentro de su misma transacción (``record``). El id
+autoincremental de cada fila es el cursor: ``read_changes(since)`` devuelve lo
+que cambió después, con el estado actual de cada entidad y lápidas
+(``op = "delete"``) para los borrados. Borrar un proyecto deja también las
+lápidas de sus dibujos y anotaciones.
+
+El registro no crece sin límite: al agregar, cada ``PRUNE_EVERY`` cursores se
+podan las entradas más viejas que ``RETENTION_DAYS`` o a más de
+``MAX_ENTRIES`` cursores del último, y se compactan las reemplazadas (de cada
+entidad basta su última entrada, lápida o no). Un cursor anterior a lo podado
+(``ChangeLogHorizon``) recibe ``reset``.
+
+Tras el commit se despierta a los flujos SSE de este proceso (``broker``); los
+de otros procesos lo ven en su siguiente sondeo.
+"""
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from backend import models, serialization
+
+PROJECT = "project"
+DRAWING = "drawing"
+ANNOTATION = "annotation"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+ANNOTATION_COLUMNS = ("id", "project_id", "distrito_name", "title", "content", "created_at")
+
+# Retención (ver ``prune``)
+RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+MAX_ENTRIES = int(os.getenv("CHANGE_LOG_MAX_ENTRIES", "100000"))
+PRUNE_EVERY = int(os.getenv("CHANGE_LOG_PRUNE_EVERY", "1000"))
+
+# Clave del advisory lock de Postgres que ordena las escrituras del registro
+_PG_LOCK_KEY = 0x6368616e6765  # "change"
+
+
+# ---------------------------------------------
+# ESCRITURA (dentro de la transacción)
+# ---------------------------------------------
+def record(db: Session, entity: str, rows: Iterable[Tuple[int, int]], deleted: bool = False):
+    """Registra cambios de ``entity`` como pares (id, project_id); llamar antes del commit."""
+    values = [
+        {"entity": entity, "entity_id": entity_id, "project_id": project_id,
+         "op": DELETE if deleted else UPSERT}
+        for entity_id, project_id in rows
+    ]
+    if not values:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # Los ids se asignan al insertar pero se ven al confirmar: sin este lock dos
+        # transacciones podrían confirmar fuera de orden y un cliente saltarse un
+        # cambio. Se libera con el commit.
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+    ids = db.execute(insert(models.ChangeLog).returning(models.ChangeLog.id), values).scalars().all()
+    db.info["change_log_pending"] = True
+    # Poda amortizada: solo cuando los cursores nuevos cruzan un múltiplo de PRUNE_EVERY
+    if max(ids) // PRUNE_EVERY > (min(ids) - 1) // PRUNE_EVERY:
+        prune(db, max(ids))
+
+
+def record_project(db: Session, project_id: int, deleted: bool = False):
+    record(db, PROJECT, [(project_id, project_id)], deleted)
+
+
+def prune(db: Session, latest: int) -> int:
+    """
+    Poda lo que salió de la ventana de retención y compacta las entradas
+    reemplazadas; devuelve el nuevo horizonte. Corre dentro de la transacción
+    de la escritura (en Postgres, con el advisory lock ya tomado).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+    expired = db.execute(
+        select(func.max(models.ChangeLog.id)).where(models.ChangeLog.changed_at < cutoff)
+    ).scalar() or 0
+    current = horizon(db)
+    pruned = max(expired, latest - MAX_ENTRIES, current)
+    if pruned > current:
+        db.execute(
+            delete(models.ChangeLog).where(models.ChangeLog.id <= pruned)
+            .execution_options(synchronize_session=False)
+        )
+        db.merge(models.ChangeLogHorizon(id=1, cursor=pruned))
+
+    # Un cliente con un cursor anterior a una entrada reemplazada recibe igual la última
+    last_entries = select(func.max(models.ChangeLog.id)).group_by(
+        models.ChangeLog.entity, models.ChangeLog.entity_id
+    )
+    db.execute(
+        delete(models.ChangeLog).where(models.ChangeLog.id.not_in(last_entries))
+        .execution_options(synchronize_session=False)
+    )
+    return pruned
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session: Session):
+    # Solo se avisa si el commit se confirmó (no con un rollback)
+    if session.info.pop("change_log_pending", False):
+        broker.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _rolled_back(session: Session):
+    session.info.pop("change_log_pending", None)
+
+
+# ---------------------------------------------
+# LECTURA
+# ---------------------------------------------
+def latest_cursor(db: Session) -> int:
+    return db.execute(select(func.max(models.ChangeLog.id))).scalar() or 0
+
+
+def horizon(db: Session) -> int:
+    """Último cursor podado (0 si nunca se podó)."""
+    return db.execute(select(models.ChangeLogHorizon.cursor)).scalar() or 0
+
+
+def _annotation_dicts(db: Session, ids: List[int]) -> List[dict]:
+    columns = [getattr(models.Annotation, c) for c in ANNOTATION_COLUMNS]
+    rows = db.execute(select(*columns).where(models.Annotation.id.in_(ids)).order_by(models.Annotation.id))
+    return [dict(row._mapping) for row in rows]
+
+
+def _drawing_dicts(db: Session, ids: List[int]) -> List[dict]:
+    columns = [getattr(models.Drawing, c) for c in serialization.DRAWING_COLUMNS]
+    rows = db.execute(
+        select(models.Drawing.project_id, *columns).where(models.Drawing.id.in_(ids)).order_by(models.Drawing.id)
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def read_changes(db: Session, since: int, limit: int) -> dict:
+    """
+    Cambios con cursor mayor que ``since`` (como mucho ``limit`` filas del registro).
+
+    Cada entidad aparece una vez, con su última operación: el estado actual si
+    sigue existiendo o una lápida ``{"id", "project_id"}`` si se borró.
+    ``reset`` indica que ``since`` no pertenece a este registro o es anterior
+    a lo podado (el cliente debe recargar todo).
+    """
+    entries = db.execute(
+        select(models.ChangeLog.id, models.ChangeLog.entity, models.ChangeLog.entity_id,
+               models.ChangeLog.project_id, models.ChangeLog.op)
+        .where(models.ChangeLog.id > since)
+        .order_by(models.ChangeLog.id)
+        .limit(limit + 1)
+    ).all()
+    # El horizonte se lee después: una poda confirmada antes de la consulta anterior se ve aquí
+    expired = since < horizon(db)
+    if expired:
+        entries = []
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    reset = False
+    cursor = since
+    if entries:
+        cursor = entries[-1].id
+    elif since or expired:
+        latest = latest_cursor(db)
+        reset = expired or since > latest
+        cursor = latest if reset else since
+
+    # Última operación por entidad
+    last: Dict[Tuple[str, int], Tuple[int, str]] = {}
+    for entry in entries:
+        last[(entry.entity, entry.entity_id)] = (entry.project_id, entry.op)
+
+    upserts: Dict[str, List[int]] = {PROJECT: [], DRAWING: [], ANNOTATION: []}
+    tombstones: Dict[str, Dict[int, int]] = {PROJECT: {}, DRAWING: {}, ANNOTATION: {}}
+    for (entity, entity_id), (project_id, op) in last.items():
+        if op == DELETE:
+            tombstones[entity][entity_id] = project_id
+        else:
+            upserts[entity].append(entity_id)
+
+    projects = []
+    if upserts[PROJECT]:
+        rows = db.execute(
+            select(*serialization.project_columns())
+            .where(models.Project.id.in_(upserts[PROJECT]))
+            .order_by(models.Project.id)
+        ).all()
+        projects = serialization.project_dicts(db, rows, relations=("districts",))
+    drawings = _drawing_dicts(db, upserts[DRAWING]) if upserts[DRAWING] else []
+    annotations = _annotation_dicts(db, upserts[ANNOTATION]) if upserts[ANNOTATION] else []
+
+    # Lo que ya no existe se borró después de la ventana: lápida (su borrado llegará igual)
+    for entity, found in ((PROJECT, projects), (DRAWING, drawings), (ANNOTATION, annotations)):
+        present = {item["id"] for item in found}
+        for entity_id in upserts[entity]:
+            if entity_id not in present:
+                tombstones[entity][entity_id] = last[(entity, entity_id)][0]
+
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
+        "reset": reset,
+        "projects": projects,
+        "drawings": drawings,
+        "annotations": annotations,
+        "deleted": {
+            f"{entity}s": [{"id": entity_id, "project_id": project_id}
+                           for entity_id, project_id in sorted(items.items())]
+            for entity, items in tombstones.items()
+        },
+    }
+
+
+def is_empty(delta: dict) -> bool:
+    return not (delta["projects"] or delta["drawings"] or delta["annotations"]
+                or any(delta["deleted"].values()) or delta["reset"])
+
+
+# ---------------------------------------------
+# AVISOS EN PROCESO (SSE)
+# ---------------------------------------------
+class ChangeBroker:
+    """
+    Despierta a los flujos SSE en espera. Los commits ocurren en hilos del
+    threadpool: cada suscriptor se despierta en su propio event loop.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Event:
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._waiters[wakeup] = asyncio.get_running_loop()
+        return wakeup
+
+    def unsubscribe(self, wakeup: asyncio.Event):
+        with self._lock:
+            self._waiters.pop(wakeup, None)
+
+    def notify(self):
+        with self._lock:
+            waiters = list(self._waiters.items())
+        for wakeup, loop in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # event loop ya cerrado
+
+
+broker = ChangeBroker()
+
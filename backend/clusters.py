@@ -0,0 +1,310 @@
+# backend/clusters.py
+"""
+Agrupamiento de proyectos para el mapa general a zoom bajo.
+
+Cada proyecto se ubica en un punto: el promedio de los centros de sus dibujos
+o, si no tiene dibujos, el centroide de su primer distrito reconocido. Una
+rejilla jerárquica (las teselas Web Mercator de cada nivel) guarda por celda
+cuántos proyectos hay, cuántos por estado y la suma de sus coordenadas, así que
+un viewport se responde recorriendo solo las celdas del nivel, sin tocar los
+proyectos.
+
+Las escrituras mueven al proyecto afectado de celda en todos los niveles
+(O(niveles)); como el índice espacial, se recarga desde la BD cada tanto.
+"""
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.geojson_cache import districts_geojson
+from backend.geometry import BBox, geometry_centroid
+from backend.mvt import MAX_LATITUDE, tile_bounds, tiles_for_bbox
+from backend.spatial_index import INDEX_TTL_SECONDS
+
+# Celdas de 64 px: el nivel de la rejilla es el zoom del mapa + 2 (256 / 64 = 2²)
+CELL_ZOOM_OFFSET = 2
+# Desde este zoom se usa siempre el nivel más fino (el mapa ya dibuja las geometrías)
+MAX_CLUSTER_ZOOM = 16
+LEVELS = MAX_CLUSTER_ZOOM + CELL_ZOOM_OFFSET + 1
+FINEST = LEVELS - 1
+
+Point = Tuple[float, float]      # (lon, lat)
+CellKey = Tuple[int, int]        # (x, y) de la tesela del nivel
+
+
+def grid_xy(lon: float, lat: float) -> CellKey:
+    """Celda del nivel más fino; la de un nivel superior es ``(x >> d, y >> d)``."""
+    n = 2 ** FINEST
+    rad = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, lat)))
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n)
+    return min(n - 1, max(0, x)), min(n - 1, max(0, y))
+
+
+def district_centroids() -> Dict[int, Point]:
+    """Centroide de cada distrito del GeoJSON por su ``id`` (memoizado con el archivo)."""
+    if not districts_geojson.path.exists():
+        return {}
+
+    def build(data):
+        centroids = {}
+        for feature in data.get("features", []):
+            district_id = (feature.get("properties") or {}).get("id")
+            centroid = geometry_centroid(feature.get("geometry"))
+            if district_id is not None and centroid is not None:
+                centroids[district_id] = centroid
+        return centroids
+
+    return districts_geojson.derived("district-centroids", build)
+
+
+class _Cell:
+    __slots__ = ("count", "sum_lon", "sum_lat", "id_sum", "statuses")
+
+    def __init__(self):
+        self.count = 0
+        self.sum_lon = 0.0
+        self.sum_lat = 0.0
+        self.id_sum = 0          # con un solo proyecto en la celda es su id
+        self.statuses: Dict[Optional[str], int] = {}
+
+
+class _Project:
+    __slots__ = ("status", "district_point", "drawings", "placed")
+
+    def __init__(self, status: Optional[str]):
+        self.status = status
+        self.district_point: Optional[Point] = None
+        self.drawings: Dict[int, Point] = {}      # drawing_id -> centro de su bbox
+        self.placed = None                        # (lon, lat, gx, gy, estado) con que se sumó
+
+    def point(self) -> Optional[Point]:
+        if self.drawings:
+            n = len(self.drawings)
+            return (sum(p[0] for p in self.drawings.values()) / n,
+                    sum(p[1] for p in self.drawings.values()) / n)
+        return self.district_point
+
+
+class ProjectClusterIndex:
+    """Rejilla jerárquica de conteos por celda, cargada perezosamente desde la BD."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels: Optional[List[Dict[CellKey, _Cell]]] = None
+        self._projects: Dict[int, _Project] = {}
+        self._drawing_projects: Dict[int, int] = {}
+        self._loaded_at = 0.0
+
+    # ---------------------------------------------
+    # CARGA
+    # ---------------------------------------------
+    def _is_fresh(self) -> bool:
+        return self._levels is not None and time.monotonic() - self._loaded_at < INDEX_TTL_SECONDS
+
+    @staticmethod
+    def _read_projects(db: Session, project_ids: Optional[List[int]] = None) -> Dict[int, _Project]:
+        """Estado, distrito y centros de dibujos de todos los proyectos (o solo de esos)."""
+        def only(query, column):
+            return query if project_ids is None else query.filter(column.in_(project_ids))
+
+        projects = {
+            project_id: _Project(status)
+            for project_id, status in only(db.query(models.Project.id, models.Project.status), models.Project.id)
+        }
+
+        # Primer distrito reconocido de cada proyecto (orden de inserción)
+        first = only(
+            db.query(func.min(models.ProjectDistrict.id).label("id")).filter(
+                models.ProjectDistrict.district_id.isnot(None)
+            ),
+            models.ProjectDistrict.project_id,
+        ).group_by(models.ProjectDistrict.project_id).subquery()
+        centroids = district_centroids()
+        for project_id, district_id in db.query(
+            models.ProjectDistrict.project_id, models.ProjectDistrict.district_id
+        ).join(first, first.c.id == models.ProjectDistrict.id):
+            if project_id in projects:
+                projects[project_id].district_point = centroids.get(district_id)
+
+        drawings = only(db.query(
+            models.Drawing.id, models.Drawing.project_id,
+            models.Drawing.min_lon, models.Drawing.min_lat,
+            models.Drawing.max_lon, models.Drawing.max_lat,
+        ).filter(models.Drawing.min_lon.isnot(None)), models.Drawing.project_id)
+        for row in drawings:
+            member = projects.get(row.project_id)
+            if member is not None:
+                member.drawings[row.id] = ((row.min_lon + row.max_lon) / 2, (row.min_lat + row.max_lat) / 2)
+        return projects
+
+    def ensure_loaded(self, db: Session):
+        if self._is_fresh():
+            return
+        projects = self._read_projects(db)
+        with self._lock:
+            self._levels = [{} for _ in range(LEVELS)]
+            self._projects = projects
+            self._drawing_projects = {
+                drawing_id: project_id
+                for project_id, member in projects.items() for drawing_id in member.drawings
+            }
+            for project_id, member in projects.items():
+                self._put(project_id, member)
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Fuerza una recarga completa en la próxima consulta."""
+        with self._lock:
+            self._levels = None
+
+    # ---------------------------------------------
+    # CELDAS
+    # ---------------------------------------------
+    def _put(self, project_id: int, member: _Project):
+        point = member.point()
+        if point is None:
+            return  # sin dibujos ni distrito reconocido: no tiene dónde ir
+        lon, lat = point
+        gx, gy = grid_xy(lon, lat)
+        member.placed = (lon, lat, gx, gy, member.status)
+        for level, cells in enumerate(self._levels):
+            shift = FINEST - level
+            key = (gx >> shift, gy >> shift)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = _Cell()
+            cell.count += 1
+            cell.sum_lon += lon
+            cell.sum_lat += lat
+            cell.id_sum += project_id
+            cell.statuses[member.status] = cell.statuses.get(member.status, 0) + 1
+
+    def _take(self, project_id: int, member: _Project):
+        if member.placed is None:
+            return
+        lon, lat, gx, gy, status = member.placed
+        member.placed = None
+        for level, cells in enumerate(self._levels):
+            shift = FINEST - level
+            key = (gx >> shift, gy >> shift)
+            cell = cells[key]
+            cell.count -= 1
+            if not cell.count:
+                del cells[key]
+                continue
+            cell.sum_lon -= lon
+            cell.sum_lat -= lat
+            cell.id_sum -= project_id
+            if cell.statuses[status] > 1:
+                cell.statuses[status] -= 1
+            else:
+                del cell.statuses[status]
+
+    # ---------------------------------------------
+    # ESCRITURAS
+    # ---------------------------------------------
+    def drawings_changed(self, added: Iterable[Tuple[int, int, Optional[BBox]]],
+                         removed: Iterable[Tuple[int, Optional[BBox]]]):
+        """
+        Aplica altas y bajas de dibujos ya confirmadas (un dibujo editado llega
+        como baja + alta). Los proyectos que el índice aún no conoce se ignoran:
+        los suma ``refresh_projects``.
+        """
+        with self._lock:
+            if self._levels is None:
+                return  # se cargará completo desde la BD en la próxima consulta
+            touched: Dict[int, _Project] = {}
+            for drawing_id, _ in removed:
+                project_id = self._drawing_projects.pop(drawing_id, None)
+                member = self._projects.get(project_id)
+                if member is not None:
+                    member.drawings.pop(drawing_id, None)
+                    touched[project_id] = member
+            for drawing_id, project_id, bbox in added:
+                member = self._projects.get(project_id)
+                if member is None or bbox is None:
+                    continue
+                member.drawings[drawing_id] = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+                self._drawing_projects[drawing_id] = project_id
+                touched[project_id] = member
+            for project_id, member in touched.items():
+                self._take(project_id, member)
+                self._put(project_id, member)
+
+    def refresh_projects(self, db: Session, project_ids: Iterable[int]):
+        """Relee esos proyectos de la BD (tras crearlos, cambiar su estado o distritos, o borrarlos)."""
+        if self._levels is None:
+            return
+        project_ids = list(set(project_ids))
+        if not project_ids:
+            return
+        fresh = self._read_projects(db, project_ids)
+        with self._lock:
+            if self._levels is None:
+                return
+            for project_id in project_ids:
+                old = self._projects.pop(project_id, None)
+                if old is not None:
+                    self._take(project_id, old)
+                    for drawing_id in old.drawings:
+                        self._drawing_projects.pop(drawing_id, None)
+                member = fresh.get(project_id)
+                if member is not None:
+                    self._projects[project_id] = member
+                    for drawing_id in member.drawings:
+                        self._drawing_projects[drawing_id] = project_id
+                    self._put(project_id, member)
+
+    # ---------------------------------------------
+    # CONSULTAS
+    # ---------------------------------------------
+    def clusters(self, db: Session, zoom: int, bbox: Optional[BBox] = None) -> List[dict]:
+        """Celdas no vacías del nivel de ``zoom`` que tocan ``bbox`` (todas si es None)."""
+        level = min(zoom, MAX_CLUSTER_ZOOM) + CELL_ZOOM_OFFSET
+        # ``invalidate`` puede vaciar la rejilla entre la carga y la consulta: se recarga una vez
+        for _ in range(2):
+            self.ensure_loaded(db)
+            with self._lock:
+                if self._levels is not None:
+                    return self._query(level, bbox)
+        return []
+
+    def _query(self, level: int, bbox: Optional[BBox]) -> List[dict]:
+        """Celdas no vacías del nivel que tocan ``bbox``; llamar con el lock tomado."""
+        cells = self._levels[level]
+        if bbox is None:
+            found = list(cells.items())
+        else:
+            x0, y0, x1, y1 = tiles_for_bbox(level, bbox)
+            # Se recorre lo más chico: el rango de celdas del viewport o las celdas no vacías
+            if (x1 - x0 + 1) * (y1 - y0 + 1) < len(cells):
+                found = [((x, y), cells[(x, y)]) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+                         if (x, y) in cells]
+            else:
+                found = [(key, cell) for key, cell in cells.items()
+                         if x0 <= key[0] <= x1 and y0 <= key[1] <= y1]
+        return [self._cluster(level, key, cell) for key, cell in found]
+
+    @staticmethod
+    def _cluster(level: int, key: CellKey, cell: _Cell) -> dict:
+        x, y = key
+        cluster = {
+            "id": f"{level}/{x}/{y}",
+            "lon": round(cell.sum_lon / cell.count, 6),
+            "lat": round(cell.sum_lat / cell.count, 6),
+            "count": cell.count,
+            "statuses": dict(sorted(cell.statuses.items(), key=lambda item: str(item[0]))),
+            "bbox": [round(v, 6) for v in tile_bounds(level, x, y)],
+        }
+        if cell.count == 1:
+            cluster["project_id"] = cell.id_sum
+        return cluster
+
+
+cluster_index = ProjectClusterIndex()
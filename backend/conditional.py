@@ -0,0 +1,84 @@
+# backend/conditional.py
+"""
+GET condicionales (ETag / Last-Modified) a partir de ``Project.updated_at``.
+
+Toda escritura de un proyecto, sus distritos, dibujos o anotaciones actualiza
+``updated_at``, así que basta ese valor para validar el proyecto y sus
+colecciones. Para listas de varios proyectos se usa una marca de agua:
+cantidad, ``max(updated_at)`` y ``max(id)``.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+# El navegador guarda la copia pero revalida siempre (barato: 304 sin cuerpo)
+CACHE_CONTROL = "no-cache"
+
+
+def _stamp(value: Optional[datetime]) -> str:
+    return value.strftime("%Y%m%d%H%M%S%f") if value else "0"
+
+
+def resource_etag(kind: str, project_id: int, updated_at: Optional[datetime]) -> str:
+    """ETag débil de un proyecto o de una de sus colecciones (dibujos, anotaciones)."""
+    return f'W/"{kind}-{project_id}-{_stamp(updated_at)}"'
+
+
+def collection_etag(kind: str, parts: Iterable[object]) -> str:
+    """ETag débil de una colección de proyectos a partir de su marca de agua."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{kind}-{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """``updated_at`` (UTC sin zona) como fecha HTTP."""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (ignora el prefijo W/)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match manda; If-Modified-Since solo se mira si no viene el primero."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def validators(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def check(request: Request, response: Response, etag: str,
+          last_modified: Optional[datetime]) -> Optional[Response]:
+    """
+    Un 304 si el cliente ya tiene esta versión; si no, agrega ETag y
+    Last-Modified a ``response`` y devuelve None para seguir con la consulta.
+    """
+    headers = validators(etag, last_modified)
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,9 +1,15 @@
 # backend/database.py
+import logging
 import os
+import threading
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 from pathlib import Path
+from backend import metrics
+
+logger = logging.getLogger(__name__)
 
 # 1. Cargar variables de entorno
 load_dotenv()
@@ -11,53 +17,152 @@ load_dotenv()
 # 2. Obtener la URL de la base de datos
 DATABASE_URL = os.getenv("POSTGRES_URL")
 
+# Pool de conexiones (solo Postgres; SQLite usa el pool por defecto)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))         # segundos esperando una conexión libre
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))         # segundos; Neon corta conexiones ociosas
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))  # 0 = sin límite
+
+# Ruta asíncrona opcional (AsyncEngine + asyncpg / aiosqlite) para los endpoints de lectura
+ASYNC_ENABLED = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+def pool_options() -> dict:
+    return {
+        "pool_pre_ping": True,
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+    }
+
+# Ruta de la base local (sin POSTGRES_URL)
+BASE_DIR = Path(__file__).resolve().parent.parent
+DB_PATH = BASE_DIR / "lima_local_dev.db"
+
+if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
+    # Corrección de protocolo
+    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+def describe() -> str:
+    """Modo de la base de datos (para el banner de app.py; no conecta)."""
+    if DATABASE_URL:
+        return "✅ MODO: Producción (Postgres en la Nube)"
+    return (f"⚠️  MODO: Desarrollo Local (SQLite en {DB_PATH.name})\n"
+            "   Los datos NO se sincronizarán con la nube.")
+
 # ---------------------------------------------
-# 3. Configuración del Motor (Engine)
+# 3. Configuración del Motor (Engine), en el primer uso
 # ---------------------------------------------
-if DATABASE_URL:
-    # --- MODO POSTGRES (Nube / Vercel) ---
-    
-    # Corrección de protocolo
-    if DATABASE_URL.startswith("postgres://"):
-        DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-    
-    # Configuración de seguridad
-    connect_args = {"sslmode": "require"}
-
-    engine = create_engine(
-        DATABASE_URL, 
-        pool_pre_ping=True,
-        connect_args=connect_args
-    )
-    print("✅ MODO: Producción (Postgres en la Nube)")
-
-else:
-    # --- MODO SQLITE (Fallback Local) ---
-    BASE_DIR = Path(__file__).resolve().parent.parent
-    DB_PATH = BASE_DIR / "lima_local_dev.db"
-    
-    SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
-    
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        connect_args={"check_same_thread": False}
-    )
-    print(f"\n ⚠️  MODO: Desarrollo Local (SQLite en {DB_PATH.name})")
-    print("   Los datos NO se sincronizarán con la nube. \n")
-
-# 4. Configuración de Sesión y Base
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Crear el motor importa el driver y arma el pool: en un arranque en frío
+# (Vercel) solo se paga si la petición usa la base de datos.
+_engine = None
+_engine_lock = threading.Lock()
+
+def _create_engine():
+    # Pool que mide la espera por conexión (ver backend/metrics.py)
+    poolclass = metrics.timed_pool(QueuePool) if metrics.METRICS_ENABLED else QueuePool
+    if DATABASE_URL:
+        # --- MODO POSTGRES (Nube / Vercel) ---
+        connect_args = {"sslmode": "require"}
+        if STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+        engine = create_engine(DATABASE_URL, connect_args=connect_args, poolclass=poolclass, **pool_options())
+    else:
+        # --- MODO SQLITE (Fallback Local) ---
+        engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False},
+                               poolclass=poolclass)
+    if metrics.METRICS_ENABLED:
+        metrics.instrument_engine(engine)
+    return engine
+
+def get_engine():
+    """Motor síncrono; se crea una sola vez y enlaza ``SessionLocal``."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = _create_engine()
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+                logger.info(describe())
+    return _engine
+
+def __getattr__(name):
+    # Compatibilidad: ``from backend.database import engine`` crea el motor en ese momento
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# 4. Configuración de Sesión y Base (SessionLocal se enlaza en get_engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+def new_session():
+    """Sesión fuera de una petición (tareas, streaming, scripts)."""
+    get_engine()
+    return SessionLocal()
+
 def create_all_tables():
     """Ejecuta la creación de todas las tablas definidas en Base.metadata."""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 # 5. Dependencia para FastAPI
 def get_db():
-    db = SessionLocal()
+    # La conexión se toma del pool en la primera consulta, no al abrir la sesión
+    db = new_session()
     try:
-        db.connection()
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# ---------------------------------------------
+# 6. Motor asíncrono (opcional)
+# ---------------------------------------------
+_async_engine = None
+_async_sessionmaker = None
+
+def async_database_url() -> str:
+    """La misma base de datos con driver asíncrono (asyncpg o aiosqlite)."""
+    if DATABASE_URL:
+        return DATABASE_URL.split("?", 1)[0].replace("postgresql://", "postgresql+asyncpg://", 1)
+    return f"sqlite+aiosqlite:///{DB_PATH}"
+
+def get_async_engine():
+    """AsyncEngine creado en el primer uso (requiere asyncpg o aiosqlite instalados)."""
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        poolclass = metrics.timed_pool(AsyncAdaptedQueuePool) if metrics.METRICS_ENABLED else AsyncAdaptedQueuePool
+        if DATABASE_URL:
+            # asyncpg no entiende sslmode/options: se pasan como argumentos propios
+            connect_args = {"ssl": "require"}
+            if STATEMENT_TIMEOUT_MS:
+                connect_args["server_settings"] = {"statement_timeout": str(STATEMENT_TIMEOUT_MS)}
+            engine = create_async_engine(async_database_url(), connect_args=connect_args,
+                                         poolclass=poolclass, **pool_options())
+        else:
+            engine = create_async_engine(async_database_url(), poolclass=poolclass)
+        if metrics.METRICS_ENABLED:
+            metrics.instrument_engine(engine)
+        _async_engine = engine
+    return _async_engine
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_sessionmaker = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+async def get_async_db():
+    """Dependencia para los routers asíncronos."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def dispose_async_engine():
+    """Cierra el pool asíncrono si llegó a crearse."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
@@ -0,0 +1,96 @@
+# backend/district_lod.py
+"""
+Niveles de detalle (LOD) precalculados del GeoJSON de distritos.
+
+Todos los niveles salen de la misma topología de arcos compartidos, así que los
+bordes entre distritos siguen sin huecos aunque se simplifiquen.
+"""
+from typing import Optional
+
+from backend.geojson_cache import EncodedPayload, GeoJSONFileCache
+from backend.geometry import decimals_for_tolerance, pixel_size_degrees
+from backend.topology import Topology, quantization_for_tolerance
+
+TOPOJSON_MEDIA_TYPE = "application/topo+json"
+TOPOJSON_ACCEPT = ("application/topo+json", "application/vnd.topojson+json")
+
+# Zoom máximo que cubre cada nivel. Por encima del último se sirve el archivo original.
+# (frontend/js/general_map.js usa los mismos cortes para no pedir URLs redundantes)
+LOD_ZOOMS = (9, 11, 13, 15)
+
+
+def level_tolerance(level_zoom: int) -> float:
+    """Medio píxel al zoom del nivel: la simplificación no es visible."""
+    return pixel_size_degrees(level_zoom) / 2
+
+
+def select_level(zoom: Optional[float] = None, tolerance: Optional[float] = None) -> Optional[int]:
+    """
+    Devuelve el zoom del nivel a servir, o None para la geometría completa.
+    ``tolerance`` (en grados) elige el nivel más simple que no la supere.
+    """
+    if tolerance is not None:
+        candidates = [z for z in LOD_ZOOMS if level_tolerance(z) <= tolerance]
+        return min(candidates) if candidates else None
+    if zoom is not None:
+        for level_zoom in LOD_ZOOMS:
+            if zoom <= level_zoom:
+                return level_zoom
+    return None
+
+
+def get_topology(cache: GeoJSONFileCache) -> Topology:
+    return cache.derived("topology", Topology)
+
+
+def lod_geojson(cache: GeoJSONFileCache, level_zoom: Optional[int]) -> dict:
+    """FeatureCollection simplificado del nivel pedido (el original si es None)."""
+    if level_zoom is None:
+        return cache.data
+
+    def build(_data):
+        tolerance = level_tolerance(level_zoom)
+        return get_topology(cache).to_geojson(tolerance, decimals_for_tolerance(tolerance))
+
+    return cache.derived(f"lod-data:{level_zoom}", build)
+
+
+def lod_payload(cache: GeoJSONFileCache, level_zoom: Optional[int]) -> EncodedPayload:
+    """Payload (ya comprimido) del nivel pedido."""
+    if level_zoom is None:
+        return cache.payload
+    return cache.derived(
+        f"lod:{level_zoom}", lambda _data: EncodedPayload.from_json(lod_geojson(cache, level_zoom))
+    )
+
+
+def topojson_payload(cache: GeoJSONFileCache, level_zoom: Optional[int]) -> EncodedPayload:
+    """Mismo nivel de detalle, codificado como TopoJSON cuantizado."""
+    def build(_data):
+        topology = get_topology(cache)
+        x0, y0, x1, y1 = topology.bbox()
+        if level_zoom is None:
+            tolerance, quantization = 0.0, 1_000_000
+        else:
+            tolerance = level_tolerance(level_zoom)
+            quantization = quantization_for_tolerance(max(x1 - x0, y1 - y0), tolerance)
+        return EncodedPayload.from_json(
+            topology.to_topojson(tolerance, quantization), media_type=TOPOJSON_MEDIA_TYPE
+        )
+
+    return cache.derived(f"topojson:{level_zoom}", build)
+
+
+def wants_topojson(format: Optional[str], accept: str) -> bool:
+    """``?format=`` manda; si no, se negocia por la cabecera Accept."""
+    if format:
+        return format.lower() == "topojson"
+    accept = (accept or "").lower()
+    return any(media_type in accept for media_type in TOPOJSON_ACCEPT)
+
+
+def warm(cache: GeoJSONFileCache):
+    """Precalcula todos los niveles y codificaciones (se llama al arrancar la app)."""
+    for level_zoom in LOD_ZOOMS + (None,):
+        lod_payload(cache, level_zoom)
+        topojson_payload(cache, level_zoom)
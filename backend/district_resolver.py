@@ -0,0 +1,213 @@
+# backend/district_resolver.py
+"""
+Resolución de distritos a partir de la geometría de un dibujo.
+
+Los 50 polígonos se preparan una sola vez sobre una rejilla regular:
+- las celdas que no cruza ningún borde pertenecen enteras a un distrito (o a
+  ninguno) y se resuelven con una sola consulta al diccionario;
+- las celdas de borde guardan solo las aristas que pasan por ellas, y el
+  punto-en-polígono usa únicamente las aristas de la franja horizontal del punto.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.geometry import (
+    BBox, bbox_intersects, geometry_bbox, geometry_parts, iter_geometries, point_in_polygon,
+    segment_intersects_bbox,
+)
+
+GRID_SIZE = 256
+
+Edge = Tuple[float, float, float, float]
+
+
+def _segments_cross(a, b, c, d) -> bool:
+    """¿Se intersectan los segmentos a-b y c-d? (incluye contacto y colinealidad)."""
+    def orient(p, q, r):
+        v = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+        return (v > 0) - (v < 0)
+
+    def on_segment(p, q, r):
+        return min(p[0], r[0]) <= q[0] <= max(p[0], r[0]) and min(p[1], r[1]) <= q[1] <= max(p[1], r[1])
+
+    o1, o2, o3, o4 = orient(a, b, c), orient(a, b, d), orient(c, d, a), orient(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+    return ((o1 == 0 and on_segment(a, c, b)) or (o2 == 0 and on_segment(a, d, b))
+            or (o3 == 0 and on_segment(c, a, d)) or (o4 == 0 and on_segment(c, b, d)))
+
+
+class PreparedDistrict:
+    def __init__(self, name: str, geometry: dict):
+        self.name = name
+        self.polygons = geometry_parts(geometry)[2]
+        self.bbox: BBox = geometry_bbox(geometry)
+        self.edges: List[Edge] = [
+            (a[0], a[1], b[0], b[1])
+            for poly in self.polygons for ring in poly for a, b in zip(ring, ring[1:])
+        ]
+        self.row_edges: Dict[int, List[Edge]] = {}
+        # Un vértice cualquiera: si cae dentro de un dibujo sin cruzar bordes, el distrito está dentro.
+        self.sample_point = self.polygons[0][0][0]
+
+
+class DistrictResolver:
+    """Índice de rejilla sobre los polígonos de distrito."""
+
+    def __init__(self, feature_collection: dict, grid_size: int = GRID_SIZE, name_property: str = "distrito"):
+        self.districts = [
+            PreparedDistrict(f["properties"][name_property], f["geometry"])
+            for f in feature_collection["features"]
+        ]
+        self.n = grid_size
+        x0 = min(d.bbox[0] for d in self.districts)
+        y0 = min(d.bbox[1] for d in self.districts)
+        x1 = max(d.bbox[2] for d in self.districts)
+        y1 = max(d.bbox[3] for d in self.districts)
+        self.bbox: BBox = (x0, y0, x1, y1)
+        self.cw = (x1 - x0) / grid_size
+        self.ch = (y1 - y0) / grid_size
+
+        # celda -> [(índice de distrito, arista)] para las celdas que cruza algún borde
+        self.cell_edges: Dict[Tuple[int, int], List[Tuple[int, Edge]]] = defaultdict(list)
+        for idx, district in enumerate(self.districts):
+            rows = defaultdict(list)
+            for edge in district.edges:
+                c0, r0 = self._cell(min(edge[0], edge[2]), min(edge[1], edge[3]))
+                c1, r1 = self._cell(max(edge[0], edge[2]), max(edge[1], edge[3]))
+                for r in range(r0, r1 + 1):
+                    rows[r].append(edge)
+                    for c in range(c0, c1 + 1):
+                        self.cell_edges[(c, r)].append((idx, edge))
+            district.row_edges = dict(rows)
+
+        # celda interior -> índice de distrito (ausente = fuera de todos o celda de borde)
+        self.interior: Dict[Tuple[int, int], int] = {}
+        self._classify_interior_cells()
+
+    # ---------------------------------------------
+    # REJILLA
+    # ---------------------------------------------
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        c = int((x - self.bbox[0]) / self.cw) if self.cw else 0
+        r = int((y - self.bbox[1]) / self.ch) if self.ch else 0
+        return min(self.n - 1, max(0, c)), min(self.n - 1, max(0, r))
+
+    def _cell_bbox(self, c: int, r: int) -> BBox:
+        x = self.bbox[0] + c * self.cw
+        y = self.bbox[1] + r * self.ch
+        return (x, y, x + self.cw, y + self.ch)
+
+    def _classify_interior_cells(self):
+        # En cada fila, una racha de celdas sin bordes pertenece toda al mismo distrito:
+        # basta un punto-en-polígono por racha.
+        for r in range(self.n):
+            c = 0
+            while c < self.n:
+                if (c, r) in self.cell_edges:
+                    c += 1
+                    continue
+                start = c
+                while c < self.n and (c, r) not in self.cell_edges:
+                    c += 1
+                x0, y0, x1, y1 = self._cell_bbox(start, r)
+                owner = self._locate((x0 + x1) / 2, (y0 + y1) / 2)
+                if owner is not None:
+                    for cc in range(start, c):
+                        self.interior[(cc, r)] = owner
+
+    def _inside(self, idx: int, x: float, y: float) -> bool:
+        """Punto-en-polígono par-impar usando solo las aristas de la franja del punto."""
+        district = self.districts[idx]
+        if not (district.bbox[0] <= x <= district.bbox[2] and district.bbox[1] <= y <= district.bbox[3]):
+            return False
+        inside = False
+        for x1, y1, x2, y2 in district.row_edges.get(self._cell(x, y)[1], ()):
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1) + x1:
+                inside = not inside
+        return inside
+
+    def _locate(self, x: float, y: float) -> Optional[int]:
+        for idx, district in enumerate(self.districts):
+            if self._inside(idx, x, y):
+                return idx
+        return None
+
+    # ---------------------------------------------
+    # CONSULTAS
+    # ---------------------------------------------
+    def district_at(self, x: float, y: float) -> Optional[str]:
+        """Distrito que contiene el punto (o None si cae fuera de Lima/Callao)."""
+        if not (self.bbox[0] <= x <= self.bbox[2] and self.bbox[1] <= y <= self.bbox[3]):
+            return None
+        cell = self._cell(x, y)
+        if cell in self.interior:
+            return self.districts[self.interior[cell]].name
+        for idx in {idx for idx, _ in self.cell_edges.get(cell, ())}:
+            if self._inside(idx, x, y):
+                return self.districts[idx].name
+        return None
+
+    def _point_hits(self, x: float, y: float, found: Set[int]):
+        if not (self.bbox[0] <= x <= self.bbox[2] and self.bbox[1] <= y <= self.bbox[3]):
+            return
+        cell = self._cell(x, y)
+        if cell in self.interior:
+            found.add(self.interior[cell])
+            return
+        for idx in {idx for idx, _ in self.cell_edges.get(cell, ())} - found:
+            if self._inside(idx, x, y):
+                found.add(idx)
+
+    def _segment_hits(self, a, b, found: Set[int]):
+        """Distritos cuyo borde cruza el segmento, o cuyas celdas interiores atraviesa."""
+        c0, r0 = self._cell(min(a[0], b[0]), min(a[1], b[1]))
+        c1, r1 = self._cell(max(a[0], b[0]), max(a[1], b[1]))
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                cell = (c, r)
+                if cell in self.interior:
+                    if self.interior[cell] not in found and segment_intersects_bbox(a, b, self._cell_bbox(c, r)):
+                        found.add(self.interior[cell])
+                    continue
+                for idx, (x1, y1, x2, y2) in self.cell_edges.get(cell, ()):
+                    if idx not in found and _segments_cross(a, b, (x1, y1), (x2, y2)):
+                        found.add(idx)
+
+    def resolve(self, geojson: dict) -> List[str]:
+        """Nombres de los distritos que intersecta la geometría (ordenados)."""
+        bbox = geometry_bbox(geojson)
+        if bbox is None or not bbox_intersects(bbox, self.bbox):
+            return []
+
+        found: Set[int] = set()
+        drawing_polygons = []
+        for geom in iter_geometries(geojson):
+            points, lines, polygons = geometry_parts(geom)
+            drawing_polygons.extend(polygons)
+            for p in points:
+                self._point_hits(p[0], p[1], found)
+            for line in lines + [ring for poly in polygons for ring in poly]:
+                for p in line:
+                    self._point_hits(p[0], p[1], found)
+                for a, b in zip(line, line[1:]):
+                    self._segment_hits(a, b, found)
+
+        # Distritos enteros dentro de un polígono dibujado (sin cruzar bordes ni vértices)
+        if drawing_polygons:
+            for idx, district in enumerate(self.districts):
+                if idx in found or not bbox_intersects(district.bbox, bbox):
+                    continue
+                x, y = district.sample_point[0], district.sample_point[1]
+                if any(point_in_polygon(x, y, poly) for poly in drawing_polygons):
+                    found.add(idx)
+
+        return sorted(self.districts[idx].name for idx in found)
+
+    def resolve_many(self, geojsons: Iterable[dict]) -> List[List[str]]:
+        return [self.resolve(g) for g in geojsons]
+
+
+def get_resolver(cache) -> DistrictResolver:
+    """Resolver memoizado junto al GeoJSON cargado (se reconstruye si cambia el archivo)."""
+    return cache.derived("district-resolver", DistrictResolver)
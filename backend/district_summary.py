@@ -0,0 +1,206 @@
+# backend/district_summary.py
+"""
+Resumen materializado por distrito (tabla ``district_summaries``).
+
+Cada fila guarda, para un distrito y un estado, cuántos proyectos hay, cuántos
+dibujos tienen y la última actualización. Las escrituras de proyectos y dibujos
+recalculan solo los distritos afectados dentro de su misma transacción, así que
+las lecturas de estadísticas son consultas directas sobre unas pocas filas.
+
+Las filas se agrupan por distrito canónico (``district_id``, reportado con el
+nombre del GeoJSON); los nombres que no se reconocen van por su forma
+normalizada. Escrituras y lecturas resuelven con ``summary_keys``.
+
+Reconstrucción completa (reparación):
+    python -m backend.district_summary
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend import districts, models
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# (id del distrito o None, nombre con que se reporta)
+SummaryKey = Tuple[Optional[int], str]
+
+# id -> nombre canónico (``properties.distrito``); los distritos casi no cambian
+_district_names: Dict[int, str] = {}
+
+
+def _names_query(ids: Iterable[int]):
+    missing = [i for i in ids if i not in _district_names]
+    if missing:
+        return select(models.District.id, models.District.name).where(models.District.id.in_(missing))
+    return None
+
+
+def _cached_names(ids: Set[int]) -> Dict[int, str]:
+    return {i: _district_names[i] for i in ids if i in _district_names}
+
+
+def _names_by_id(db: Session, ids: Set[int]) -> Dict[int, str]:
+    query = _names_query(ids)
+    if query is not None:
+        _district_names.update(db.execute(query).all())
+    return _cached_names(ids)
+
+
+def _key(district_id: Optional[int], name: str, labels: Dict[int, str]) -> SummaryKey:
+    if district_id is not None and district_id in labels:
+        return district_id, labels[district_id]
+    return None, districts.normalize_name(name)
+
+
+def summary_keys(db: Session, names: Iterable[str]) -> Dict[str, SummaryKey]:
+    """
+    Nombre escrito -> clave del resumen: el distrito canónico si el nombre (o un
+    alias) se reconoce y, si no, el nombre normalizado.
+    """
+    names = [n for n in names if n]
+    ids = districts.resolve_ids(db, names)
+    labels = _names_by_id(db, set(ids.values()))
+    return {name: _key(ids.get(name), name, labels) for name in names}
+
+
+async def summary_keys_async(db: "AsyncSession", names: Iterable[str]) -> Dict[str, SummaryKey]:
+    names = [n for n in names if n]
+    ids = await districts.resolve_ids_async(db, names)
+    query = _names_query(set(ids.values()))
+    if query is not None:
+        _district_names.update((await db.execute(query)).all())
+    labels = _cached_names(set(ids.values()))
+    return {name: _key(ids.get(name), name, labels) for name in names}
+
+
+def _summary_filter(keys: Iterable[SummaryKey]):
+    ids = {district_id for district_id, _ in keys if district_id is not None}
+    unknown = {label for district_id, label in keys if district_id is None}
+    return or_(
+        models.DistrictSummary.district_id.in_(ids),
+        and_(models.DistrictSummary.district_id.is_(None), models.DistrictSummary.district.in_(unknown)),
+    )
+
+
+def _aggregate(db: Session, keys: Optional[Iterable[SummaryKey]] = None) -> List[models.DistrictSummary]:
+    """Calcula las filas del resumen (para todos los distritos o solo esas claves)."""
+    drawing_counts = db.query(
+        models.Drawing.project_id.label("project_id"),
+        func.count(models.Drawing.id).label("drawings"),
+    ).group_by(models.Drawing.project_id).subquery()
+
+    query = db.query(
+        models.ProjectDistrict.district_id,
+        models.ProjectDistrict.distrito_name,
+        models.Project.id,
+        models.Project.status,
+        models.Project.updated_at,
+        func.coalesce(drawing_counts.c.drawings, 0),
+    ).join(models.Project, models.Project.id == models.ProjectDistrict.project_id).outerjoin(
+        drawing_counts, drawing_counts.c.project_id == models.Project.id
+    )
+    if keys is not None:
+        keys = list(keys)
+        ids = {district_id for district_id, _ in keys if district_id is not None}
+        raw_names = districts.unresolved_variants(db, {label for district_id, label in keys if district_id is None})
+        query = query.filter(or_(
+            models.ProjectDistrict.district_id.in_(ids),
+            and_(models.ProjectDistrict.district_id.is_(None),
+                 models.ProjectDistrict.distrito_name.in_(raw_names)),
+        ))
+    found = query.all()
+    labels = _names_by_id(db, {row[0] for row in found if row[0] is not None})
+
+    # Un proyecto con dos variantes del mismo distrito cuenta una sola vez
+    projects: Dict[tuple, Dict[int, tuple]] = defaultdict(dict)
+    for district_id, name, project_id, status, updated_at, drawings in found:
+        projects[(_key(district_id, name, labels), status)][project_id] = (updated_at, drawings)
+
+    rows = []
+    for ((district_id, district), status), members in projects.items():
+        updated = [u for u, _ in members.values() if u is not None]
+        rows.append(models.DistrictSummary(
+            district_id=district_id,
+            district=district,
+            status=status,
+            project_count=len(members),
+            drawing_count=sum(d for _, d in members.values()),
+            last_updated=max(updated) if updated else None,
+        ))
+    return rows
+
+
+def refresh_districts(db: Session, names: Iterable[str]):
+    """
+    Recalcula las filas de esos distritos. Llamar dentro de la transacción de
+    la escritura (después de ``flush``) y antes del ``commit``.
+    """
+    keys = set(summary_keys(db, names).values())
+    if not keys:
+        return
+    db.flush()
+    db.query(models.DistrictSummary).filter(_summary_filter(keys)).delete(synchronize_session=False)
+    db.add_all(_aggregate(db, keys))
+
+
+def refresh_project(db: Session, project_id: int, previous: Iterable[str] = ()):
+    """Recalcula los distritos actuales del proyecto más los que tenía antes."""
+    # La sesión no hace autoflush: los distritos recién agregados deben verse
+    db.flush()
+    current = [name for (name,) in db.query(models.ProjectDistrict.distrito_name).filter(
+        models.ProjectDistrict.project_id == project_id
+    )]
+    refresh_districts(db, list(previous) + current)
+
+
+def rebuild(db: Session) -> int:
+    """Reconstruye la tabla completa. Devuelve el número de filas escritas."""
+    db.query(models.DistrictSummary).delete(synchronize_session=False)
+    rows = _aggregate(db)
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+
+# ---------------------------------------------
+# LECTURAS
+# ---------------------------------------------
+def summary_rows(db: Session, names: Optional[Iterable[str]] = None) -> List[models.DistrictSummary]:
+    """Filas del resumen (todas o las de esos nombres, resueltos con ``summary_keys``)."""
+    query = select(models.DistrictSummary)
+    if names is not None:
+        query = query.where(_summary_filter(summary_keys(db, names).values()))
+    return list(db.execute(query).scalars())
+
+
+async def summary_rows_async(db: "AsyncSession", names: Iterable[str]) -> List[models.DistrictSummary]:
+    keys = await summary_keys_async(db, names)
+    query = select(models.DistrictSummary).where(_summary_filter(keys.values()))
+    return list((await db.execute(query)).scalars())
+
+
+def summarize(rows: Iterable[models.DistrictSummary]) -> dict:
+    """Conteos por estado, dibujos y última actualización de un conjunto de filas."""
+    counts: Dict[str, int] = {}
+    drawings = 0
+    last_updated: Optional[datetime] = None
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + row.project_count
+        drawings += row.drawing_count
+        if row.last_updated and (last_updated is None or row.last_updated > last_updated):
+            last_updated = row.last_updated
+    return {"counts": counts, "drawings": drawings, "last_updated": last_updated}
+
+
+if __name__ == "__main__":
+    from backend.database import get_engine, new_session
+    from backend.migrations import run_migrations
+
+    run_migrations(get_engine())
+    with new_session() as session:
+        print(f"district_summaries: {rebuild(session)} filas")
@@ -0,0 +1,207 @@
+# backend/districts.py
+"""
+Dimensión de distritos: tabla ``districts`` sembrada desde el GeoJSON y
+``district_aliases`` con las variantes de escritura normalizadas.
+
+``project_districts.distrito_name`` sigue guardando el texto escrito; la
+columna ``district_id`` lo enlaza al distrito canónico y es la que usan los
+filtros (búsqueda por entero indexado en lugar de ``lower(nombre)``).
+"""
+import unicodedata
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from backend import models
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Nombres de uso común que no salen del GeoJSON (id del distrito -> alias)
+EXTRA_ALIASES: Dict[int, List[str]] = {
+    31: ["MI PERU", "MI PERÚ"],                       # el GeoJSON trae "MI PERÃz" (mal codificado)
+    34: ["CERCADO DE LIMA", "LIMA CERCADO"],
+    32: ["SURCO"],
+    14: ["CARMEN DE LA LEGUA", "CARMEN DE LA LEGUA-REYNOSO"],
+    42: ["SMP"],
+    46: ["SJL"],
+    27: ["SJM"],
+    17: ["VES"],
+    28: ["VMT"],
+    49: ["MAGDALENA"],
+}
+
+DISPLAY_NAMES: Dict[int, str] = {
+    31: "Mi Perú",
+}
+
+# Alias normalizado -> id (None = no reconocido). Los alias solo cambian al
+# sembrar, así que las búsquedas repetidas no vuelven a la BD.
+_alias_ids: Dict[str, Optional[int]] = {}
+ALIAS_CACHE_SIZE = 4096
+
+
+def normalize_name(name: str) -> str:
+    """Clave de comparación: sin tildes, en mayúsculas y con espacios simples."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(plain.upper().split())
+
+
+# ---------------------------------------------
+# SIEMBRA
+# ---------------------------------------------
+def seed(db: Session, feature_collection: dict) -> int:
+    """Inserta/actualiza los distritos del GeoJSON y sus alias. Idempotente."""
+    existing = {d.id: d for d in db.query(models.District)}
+    aliases = {a.alias_key for a in db.query(models.DistrictAlias)}
+    added = 0
+
+    for feature in feature_collection.get("features", []):
+        props = feature.get("properties") or {}
+        district_id, name = props.get("id"), props.get("distrito")
+        if district_id is None or not name:
+            continue
+        display_name = DISPLAY_NAMES.get(district_id) or props.get("distrito2") or name.title()
+
+        district = existing.get(district_id)
+        if district is None:
+            district = models.District(id=district_id)
+            db.add(district)
+            added += 1
+        district.name = name
+        district.display_name = display_name
+        district.province = props.get("provincia")
+
+        for alias in [name, props.get("distrito2"), display_name] + EXTRA_ALIASES.get(district_id, []):
+            if not alias:
+                continue
+            key = normalize_name(alias)
+            if key not in aliases:
+                db.add(models.DistrictAlias(alias_key=key, district_id=district_id))
+                aliases.add(key)
+
+    db.commit()
+    _alias_ids.clear()
+    return added
+
+
+def backfill_project_districts(db: Session) -> int:
+    """Enlaza los ``project_districts`` sin ``district_id`` a partir del nombre escrito."""
+    rows = db.query(models.ProjectDistrict.distrito_name).filter(
+        models.ProjectDistrict.district_id.is_(None)
+    ).distinct().all()
+    ids = resolve_ids(db, [name for (name,) in rows])
+    updated = 0
+    for name, district_id in ids.items():
+        updated += db.query(models.ProjectDistrict).filter(
+            models.ProjectDistrict.district_id.is_(None),
+            models.ProjectDistrict.distrito_name == name,
+        ).update({"district_id": district_id}, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+# ---------------------------------------------
+# BÚSQUEDA
+# ---------------------------------------------
+def _alias_keys(names: Iterable[str]) -> Dict[str, List[str]]:
+    keys: Dict[str, List[str]] = {}
+    for name in names:
+        if name:
+            keys.setdefault(normalize_name(name), []).append(name)
+    return keys
+
+
+def _uncached(keys: Dict[str, List[str]]) -> List[str]:
+    missing = [key for key in keys if key not in _alias_ids]
+    if missing and len(_alias_ids) + len(missing) > ALIAS_CACHE_SIZE:
+        _alias_ids.clear()
+    return missing
+
+
+def _alias_query(missing: List[str]):
+    return select(models.DistrictAlias.alias_key, models.DistrictAlias.district_id).where(
+        models.DistrictAlias.alias_key.in_(missing)
+    )
+
+
+def _resolved(keys: Dict[str, List[str]], missing: List[str], found: Dict[str, int]) -> Dict[str, int]:
+    for key in missing:
+        _alias_ids[key] = found.get(key)
+    return {
+        name: _alias_ids[key]
+        for key, names in keys.items() if _alias_ids.get(key) is not None
+        for name in names
+    }
+
+
+def resolve_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Nombre escrito -> id de distrito (solo los que se reconocen)."""
+    keys = _alias_keys(names)
+    missing = _uncached(keys)
+    found = dict(db.execute(_alias_query(missing)).all()) if missing else {}
+    return _resolved(keys, missing, found)
+
+
+async def resolve_ids_async(db: "AsyncSession", names: Iterable[str]) -> Dict[str, int]:
+    """``resolve_ids`` sobre una sesión asíncrona (misma caché de alias)."""
+    keys = _alias_keys(names)
+    missing = _uncached(keys)
+    found = dict((await db.execute(_alias_query(missing))).all()) if missing else {}
+    return _resolved(keys, missing, found)
+
+
+def project_district_rows(db: Session, project_id: int, names: Iterable[str]) -> List[dict]:
+    """Filas de ``project_districts`` (sin repetidos) con su ``district_id`` ya resuelto."""
+    names = list(dict.fromkeys(names))
+    ids = resolve_ids(db, names)
+    return [
+        {"project_id": project_id, "distrito_name": name, "district_id": ids.get(name)}
+        for name in names
+    ]
+
+
+_VARIANTS_QUERY = select(models.ProjectDistrict.distrito_name).where(
+    models.ProjectDistrict.district_id.is_(None)
+).distinct()
+
+
+def unresolved_variants(db: Session, keys: Iterable[str]) -> List[str]:
+    """Nombres escritos sin distrito reconocido cuya forma normalizada está en ``keys``."""
+    keys = set(keys)
+    return [name for (name,) in db.execute(_VARIANTS_QUERY) if normalize_name(name) in keys]
+
+
+async def unresolved_variants_async(db: "AsyncSession", keys: Iterable[str]) -> List[str]:
+    keys = set(keys)
+    return [name for (name,) in await db.execute(_VARIANTS_QUERY) if normalize_name(name) in keys]
+
+
+def _district_clause(ids: Dict[str, int], variants: Optional[List[str]]):
+    clauses = []
+    if ids:
+        clauses.append(models.ProjectDistrict.district_id.in_(set(ids.values())))
+    if variants is not None:
+        clauses.append(models.ProjectDistrict.distrito_name.in_(variants))
+    return or_(*clauses) if clauses else models.ProjectDistrict.id.is_(None)
+
+
+def district_filter(db: Session, names: Iterable[str]):
+    """
+    Condición sobre ``ProjectDistrict`` para esos nombres: ``district_id IN (...)``
+    y, solo para nombres que no corresponden a ningún distrito, las variantes
+    escritas que se normalizan igual.
+    """
+    names = [n for n in names if n]
+    ids = resolve_ids(db, names)
+    unknown = {normalize_name(n) for n in names if n not in ids}
+    return _district_clause(ids, unresolved_variants(db, unknown) if unknown else None)
+
+
+async def district_filter_async(db: "AsyncSession", names: Iterable[str]):
+    names = [n for n in names if n]
+    ids = await resolve_ids_async(db, names)
+    unknown = {normalize_name(n) for n in names if n not in ids}
+    return _district_clause(ids, await unresolved_variants_async(db, unknown) if unknown else None)
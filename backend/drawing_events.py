@@ -0,0 +1,53 @@
+# backend/drawing_events.py
+"""
+Efectos en memoria de las escrituras de dibujos y proyectos, aplicados después
+del commit: mantener el índice espacial y el de clusters, y descartar las
+teselas afectadas.
+"""
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend import models, tiles
+from backend.clusters import cluster_index
+from backend.geometry import BBox
+from backend.spatial_index import drawing_index
+
+RemovedDrawing = Tuple[int, Optional[BBox]]        # (drawing_id, bbox)
+AddedDrawing = Tuple[int, int, Optional[BBox]]      # (drawing_id, project_id, bbox)
+
+
+def removed_rows(query) -> list:
+    """(id, bbox) de los dibujos que devuelve ``query``, antes de borrarlos."""
+    return [
+        (r.id, None if r.min_lon is None else (r.min_lon, r.min_lat, r.max_lon, r.max_lat))
+        for r in query.with_entities(
+            models.Drawing.id,
+            models.Drawing.min_lon, models.Drawing.min_lat,
+            models.Drawing.max_lon, models.Drawing.max_lat,
+        )
+    ]
+
+
+def added_rows(drawings: Iterable[models.Drawing]) -> list:
+    """(id, project_id, bbox) de dibujos recién insertados; llamar tras ``flush`` y antes del commit."""
+    return [(d.id, d.project_id, d.bbox) for d in drawings]
+
+
+def drawings_committed(added: Iterable[AddedDrawing] = (),
+                       removed: Iterable[RemovedDrawing] = ()):
+    added, removed = list(added), list(removed)
+    for drawing_id, bbox in removed:
+        drawing_index.remove(drawing_id)
+        tiles.invalidate_bboxes([bbox])
+
+    for drawing_id, project_id, bbox in added:
+        drawing_index.add(drawing_id, project_id, bbox)
+        tiles.invalidate_bboxes([bbox])
+
+    cluster_index.drawings_changed(added, removed)
+
+
+def projects_committed(db: Session, project_ids: Iterable[int]):
+    """Proyectos creados, borrados o con otro estado o distritos: se reubican en los clusters."""
+    cluster_index.refresh_projects(db, project_ids)
@@ -0,0 +1,161 @@
+# backend/geojson_cache.py
+"""
+Caché en memoria del GeoJSON de distritos.
+
+El archivo se lee una sola vez, se re-serializa en forma compacta y se guardan
+sus variantes gzip/brotli junto con un ETag fuerte. Si cambia el mtime del
+archivo, la caché se recarga en la siguiente petición.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se sirve gzip/identity
+    brotli = None
+
+# Los límites de distritos casi nunca cambian: el navegador revalida cada hora
+# y la CDN puede servir la copia vieja mientras revalida en segundo plano.
+CACHE_CONTROL = "public, max-age=3600, s-maxage=86400, stale-while-revalidate=604800"
+
+# quality=11 reduce ~40% más pero tarda segundos por MB: demasiado para un arranque en frío.
+BROTLI_QUALITY = 9
+
+
+class EncodedPayload:
+    """Cuerpo JSON ya serializado con sus variantes comprimidas."""
+
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.encodings: Dict[Optional[str], bytes] = {None: body}
+        self.encodings["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    @classmethod
+    def from_json(cls, data, media_type: str = "application/json") -> "EncodedPayload":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body, media_type)
+
+    def etag(self, encoding: Optional[str]) -> str:
+        # Cada codificación es una representación distinta: su ETag también.
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def all_etags(self):
+        return {self.etag(enc) for enc in self.encodings}
+
+    def negotiate(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """Elige la mejor codificación que el cliente acepta (br > gzip > identity)."""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            token, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+                continue
+            accepted.add(token.strip().lower())
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and (encoding in accepted or "*" in accepted):
+                return encoding, self.encodings[encoding]
+        return None, self.encodings[None]
+
+
+def conditional_response(request: Request, payload: EncodedPayload,
+                         cache_control: str = CACHE_CONTROL,
+                         vary: str = "Accept-Encoding") -> Response:
+    """Construye la respuesta (o un 304) para un payload precomprimido."""
+    encoding, body = payload.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": payload.etag(encoding),
+        "Cache-Control": cache_control,
+        "Vary": vary,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or candidates & payload.all_etags():
+            return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=payload.media_type, headers=headers)
+
+
+class GeoJSONFileCache:
+    """Mantiene el archivo GeoJSON parseado y serializado mientras no cambie su mtime."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._mtime: Optional[int] = None
+        self._data: Optional[dict] = None
+        self._payload: Optional[EncodedPayload] = None
+        self._derived: Dict[str, object] = {}
+
+    def _current_mtime(self) -> int:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="GeoJSON file not found")
+
+    def _ensure_fresh(self):
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error reading GeoJSON file: {e}")
+
+            self._data = data
+            self._payload = EncodedPayload.from_json(data)
+            self._derived = {}
+            self._mtime = mtime
+
+    def load(self):
+        """Carga (o recarga) el archivo si es necesario. Pensado para el arranque."""
+        self._ensure_fresh()
+
+    @property
+    def data(self) -> dict:
+        self._ensure_fresh()
+        return self._data
+
+    @property
+    def payload(self) -> EncodedPayload:
+        self._ensure_fresh()
+        return self._payload
+
+    def derived(self, key: str, builder: Callable[[dict], object]):
+        """
+        Memoiza un valor calculado a partir del GeoJSON (niveles de detalle,
+        otras codificaciones...). Se descarta junto con la recarga del archivo.
+        """
+        self._ensure_fresh()
+        derived = self._derived
+        if key not in derived:
+            with self._lock:
+                if key not in derived:
+                    derived[key] = builder(self._data)
+        return derived[key]
+
+
+# ---------------------------------------------
+# INSTANCIA COMPARTIDA: DISTRITOS DE LIMA Y CALLAO
+# ---------------------------------------------
+BASE_DIR = Path(__file__).resolve().parent.parent
+DISTRICTS_GEOJSON_PATH = BASE_DIR / "data" / "geojson" / "lima_callao_distritos.geojson"
+
+districts_geojson = GeoJSONFileCache(DISTRICTS_GEOJSON_PATH)
@@ -0,0 +1,249 @@
+# backend/geometry.py
+"""
+Utilidades geométricas en Python puro sobre coordenadas GeoJSON [lon, lat].
+"""
+import math
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+BBox = Tuple[float, float, float, float]   # (min_lon, min_lat, max_lon, max_lat)
+
+
+def _segment_distance_sq(p, a, b) -> float:
+    """Distancia al cuadrado del punto p al segmento a-b."""
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    if dx == 0 and dy == 0:
+        return (p[0] - ax) ** 2 + (p[1] - ay) ** 2
+    t = ((p[0] - ax) * dx + (p[1] - ay) * dy) / (dx * dx + dy * dy)
+    t = max(0.0, min(1.0, t))
+    px, py = ax + t * dx, ay + t * dy
+    return (p[0] - px) ** 2 + (p[1] - py) ** 2
+
+
+def simplify_line(points: Sequence, tolerance: float) -> List:
+    """
+    Douglas-Peucker iterativo. Conserva siempre el primer y último punto, por lo
+    que dos arcos idénticos se simplifican exactamente igual.
+    """
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return list(points)
+
+    tol_sq = tolerance * tolerance
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, 0
+        a, b = points[first], points[last]
+        for i in range(first + 1, last):
+            dist = _segment_distance_sq(points[i], a, b)
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if max_dist > tol_sq:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify_closed_line(points: Sequence, tolerance: float) -> List:
+    """Simplifica un anillo cerrado (primer punto == último) partiéndolo en su punto más lejano."""
+    if len(points) <= 4 or tolerance <= 0:
+        return list(points)
+    start = points[0]
+    far = max(range(1, len(points) - 1),
+              key=lambda i: (points[i][0] - start[0]) ** 2 + (points[i][1] - start[1]) ** 2)
+    head = simplify_line(points[:far + 1], tolerance)
+    tail = simplify_line(points[far:], tolerance)
+    return head[:-1] + tail
+
+
+def round_line(points: Sequence, decimals: int) -> List:
+    """Redondea coordenadas y elimina los puntos consecutivos repetidos."""
+    out = []
+    for x, y in points:
+        p = (round(x, decimals), round(y, decimals))
+        if not out or out[-1] != p:
+            out.append(p)
+    return out
+
+
+def pixel_size_degrees(zoom: float, tile_size: int = 256) -> float:
+    """Tamaño aproximado (en grados de longitud) de un píxel Web Mercator a ese zoom."""
+    return 360.0 / (tile_size * 2 ** zoom)
+
+
+def decimals_for_tolerance(tolerance: float) -> int:
+    """Decimales suficientes para que el redondeo no supere la tolerancia."""
+    return max(1, min(6, math.ceil(-math.log10(tolerance))))
+
+
+# ---------------------------------------------
+# GEOMETRÍAS DE DIBUJOS
+# ---------------------------------------------
+def iter_geometries(geojson: Optional[dict]) -> Iterable[dict]:
+    """Recorre las geometrías simples de un Feature, FeatureCollection o GeometryCollection."""
+    if not geojson:
+        return
+    gtype = geojson.get("type")
+    if gtype == "Feature":
+        yield from iter_geometries(geojson.get("geometry"))
+    elif gtype == "FeatureCollection":
+        for feature in geojson.get("features", []):
+            yield from iter_geometries(feature)
+    elif gtype == "GeometryCollection":
+        for child in geojson.get("geometries", []):
+            yield from iter_geometries(child)
+    elif gtype:
+        yield geojson
+
+
+def _iter_positions(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        yield coords
+    else:
+        for c in coords or ():
+            yield from _iter_positions(c)
+
+
+def values_bbox(values: Mapping[str, Any]) -> Optional[BBox]:
+    """BBox de una fila o de valores de INSERT con ``min_lon``…``max_lat``."""
+    if values["min_lon"] is None:
+        return None
+    return (values["min_lon"], values["min_lat"], values["max_lon"], values["max_lat"])
+
+
+def geometry_bbox(geojson: Optional[dict]) -> Optional[BBox]:
+    """Bounding box de cualquier GeoJSON, o None si no tiene coordenadas."""
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for geom in iter_geometries(geojson):
+        for x, y, *_ in _iter_positions(geom.get("coordinates")):
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+    if min_x == math.inf:
+        return None
+    return (min_x, min_y, max_x, max_y)
+
+
+def geometry_centroid(geojson: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """Centroide ponderado por área de los anillos exteriores (centro del bbox si no hay polígonos)."""
+    area_sum = cx = cy = 0.0
+    for geom in iter_geometries(geojson):
+        for polygon in geometry_parts(geom)[2]:
+            ring = polygon[0] if polygon else []
+            for (x0, y0, *_), (x1, y1, *_) in zip(ring, ring[1:]):
+                cross = x0 * y1 - x1 * y0
+                area_sum += cross
+                cx += (x0 + x1) * cross
+                cy += (y0 + y1) * cross
+    if area_sum:
+        return (cx / (3 * area_sum), cy / (3 * area_sum))
+    bbox = geometry_bbox(geojson)
+    return None if bbox is None else ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+
+
+def bbox_intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+# ---------------------------------------------
+# PREDICADOS EXACTOS
+# ---------------------------------------------
+def point_in_ring(x: float, y: float, ring: Sequence) -> bool:
+    """Ray casting (par-impar) sobre un anillo cerrado."""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_polygon(x: float, y: float, polygon: Sequence) -> bool:
+    """Dentro del anillo exterior y fuera de todos los agujeros."""
+    if not polygon or not point_in_ring(x, y, polygon[0]):
+        return False
+    return not any(point_in_ring(x, y, hole) for hole in polygon[1:])
+
+
+def _segments(coords) -> Iterable[Tuple]:
+    for a, b in zip(coords, coords[1:]):
+        yield a, b
+
+
+def geometry_parts(geom: dict):
+    """(puntos, líneas, polígonos) de una geometría simple."""
+    gtype, coords = geom.get("type"), geom.get("coordinates") or []
+    if gtype == "Point":
+        return [coords], [], []
+    if gtype == "MultiPoint":
+        return coords, [], []
+    if gtype == "LineString":
+        return [], [coords], []
+    if gtype == "MultiLineString":
+        return [], coords, []
+    if gtype == "Polygon":
+        return [], [], [coords]
+    if gtype == "MultiPolygon":
+        return [], [], coords
+    return [], [], []
+
+
+def geometry_contains_point(geojson: dict, x: float, y: float, tolerance: float = 0.0) -> bool:
+    """El punto cae dentro de un polígono o a menos de ``tolerance`` de un punto/línea."""
+    tol_sq = tolerance * tolerance
+    for geom in iter_geometries(geojson):
+        points, lines, polygons = geometry_parts(geom)
+        if any(point_in_polygon(x, y, poly) for poly in polygons):
+            return True
+        if any((p[0] - x) ** 2 + (p[1] - y) ** 2 <= tol_sq for p in points):
+            return True
+        for line in lines + [ring for poly in polygons for ring in poly]:
+            if any(_segment_distance_sq((x, y), a, b) <= tol_sq for a, b in _segments(line)):
+                return True
+    return False
+
+
+def segment_intersects_bbox(a, b, bbox: BBox) -> bool:
+    """Liang-Barsky: ¿el segmento a-b cruza el rectángulo?"""
+    min_x, min_y, max_x, max_y = bbox
+    t0, t1 = 0.0, 1.0
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    for p, q in ((-dx, a[0] - min_x), (dx, max_x - a[0]), (-dy, a[1] - min_y), (dy, max_y - a[1])):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            r = q / p
+            if p < 0:
+                t0 = max(t0, r)
+            else:
+                t1 = min(t1, r)
+            if t0 > t1:
+                return False
+    return True
+
+
+def geometry_intersects_bbox(geojson: dict, bbox: BBox) -> bool:
+    """Intersección exacta entre una geometría y un rectángulo."""
+    min_x, min_y, max_x, max_y = bbox
+    for geom in iter_geometries(geojson):
+        points, lines, polygons = geometry_parts(geom)
+        if any(min_x <= p[0] <= max_x and min_y <= p[1] <= max_y for p in points):
+            return True
+        for line in lines + [ring for poly in polygons for ring in poly]:
+            if len(line) == 1 and min_x <= line[0][0] <= max_x and min_y <= line[0][1] <= max_y:
+                return True
+            if any(segment_intersects_bbox(a, b, bbox) for a, b in _segments(line)):
+                return True
+        # Rectángulo completamente dentro de un polígono
+        if any(point_in_polygon(min_x, min_y, poly) for poly in polygons):
+            return True
+    return False
@@ -1,20 +1,112 @@
 # backend/main.py
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from pathlib import Path
-import json
+import anyio.to_thread
+import os
+import sys
+import threading
 
-# Importar routers
-from backend.routers import projects, drawings, annotations, general_map 
-from backend.database import engine, get_db, Base 
+# Los routers, SQLAlchemy y jwt se importan con la primera petición que los
+# necesita (ver LazyRoutersMiddleware): el GeoJSON y los estáticos no los cargan
+from backend.geojson_cache import districts_geojson, conditional_response
+from backend import district_lod
+from backend.district_resolver import get_resolver
+from backend.response_cache import ResponseCacheMiddleware
+from backend import metrics
+from typing import Optional
+
+# ---------------------------------------------
+# PATH SETUP
+# ---------------------------------------------
+BASE_DIR = Path(__file__).resolve().parent.parent
+FRONTEND_DIR = BASE_DIR / "frontend"
+GEOJSON_PATH = districts_geojson.path
+
+# Hilos para los endpoints síncronos (anyio usa 40 por defecto); conviene que no
+# supere DB_POOL_SIZE + DB_MAX_OVERFLOW o los hilos quedan esperando conexión
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "0"))
+
+# Precálculo del GeoJSON al arrancar (~segundos): conviene en un servidor persistente;
+# en serverless (Vercel define VERCEL=1) cada arranque en frío lo pagaría entero, así
+# que ahí cada nivel se calcula con su primera petición
+PRELOAD_GEOJSON = os.getenv("PRELOAD_GEOJSON", "0" if os.getenv("VERCEL") else "1").lower() in ("1", "true", "yes")
+
+def auto_migrate_enabled() -> bool:
+    """AUTO_MIGRATE=1 corre las migraciones al arrancar (por defecto solo con SQLite local)."""
+    value = os.getenv("AUTO_MIGRATE")
+    if value is None:
+        from backend.database import DATABASE_URL
+
+        value = os.getenv("AUTO_MIGRATE", "0" if DATABASE_URL else "1")  # .env ya cargado
+    return value.lower() in ("1", "true", "yes")
 
 # ---------------------------------------------
 # INITIALIZE
 # ---------------------------------------------
-Base.metadata.create_all(bind=engine)
-app = FastAPI(title="Lima Project Mapping Dashboard")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Precargar el GeoJSON (parseo, niveles de detalle y compresión) antes de la primera petición
+    if PRELOAD_GEOJSON and GEOJSON_PATH.exists():
+        districts_geojson.load()
+        district_lod.warm(districts_geojson)
+        get_resolver(districts_geojson)
+    if THREADPOOL_SIZE:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # En producción el esquema se migra aparte: python -m backend.migrations
+    if auto_migrate_enabled():
+        from backend.database import get_engine
+        from backend.migrations import run_migrations
+
+        await anyio.to_thread.run_sync(run_migrations, get_engine())
+    yield
+    if "backend.database" in sys.modules:
+        from backend.database import dispose_async_engine
+
+        await dispose_async_engine()
+
+app = FastAPI(title="Lima Project Mapping Dashboard", lifespan=lifespan)
+
+# ---------------------------------------------
+# ROUTERS PEREZOSOS
+# ---------------------------------------------
+# Rutas que se sirven sin importar los routers de la API
+EAGER_PATHS = {"/", "/api/districts-geojson", "/metrics"}
+EAGER_PREFIXES = ("/static/",)
+
+_routers_loaded = False
+_routers_lock = threading.Lock()
+
+def load_routers():
+    """Importa y monta los routers de la API una sola vez (ver include_routers)."""
+    global _routers_loaded
+    if _routers_loaded:
+        return
+    with _routers_lock:
+        if not _routers_loaded:
+            include_routers(app)
+            _routers_loaded = True
+
+class LazyRoutersMiddleware:
+    """Monta los routers antes de la primera petición que no sea GeoJSON ni estática."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and not _routers_loaded:
+            path = scope["path"]
+            if path not in EAGER_PATHS and not path.startswith(EAGER_PREFIXES):
+                load_routers()
+        await self.app(scope, receive, send)
+
+app.add_middleware(LazyRoutersMiddleware)
+
+# Caché de respuestas de lectura; CORS queda por fuera para que los aciertos lleven sus cabeceras
+app.add_middleware(ResponseCacheMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,12 +116,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ---------------------------------------------
-# PATH SETUP
-# ---------------------------------------------
-BASE_DIR = Path(__file__).resolve().parent.parent
-FRONTEND_DIR = BASE_DIR / "frontend"
-GEOJSON_PATH = BASE_DIR / "data" / "geojson" / "lima_callao_distritos.geojson"
+# Por fuera de todo: mide también los aciertos de caché y agrega Server-Timing
+# (el flujo SSE queda fuera: su "latencia" es la vida de la conexión)
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware, skip_paths=("/metrics", "/api/changes/stream"))
 
 # ---------------------------------------------
 # STATIC FILES & ROOT
@@ -43,46 +133,119 @@ async def root():
         return {"error": f"Index not found at {index_path}"}
     return FileResponse(index_path)
 
+# ---------------------------------------------
+# MÉTRICAS (Prometheus)
+# ---------------------------------------------
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Latencias por ruta, consultas SQL y estado del pool en formato de texto Prometheus."""
+    if not metrics.METRICS_ENABLED:
+        return Response(status_code=404)
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # ---------------------------------------------
 # GEOJSON ENDPOINT (ÚNICO)
 # ---------------------------------------------
 @app.get("/api/districts-geojson")
-def get_districts_geojson():
-    """Serve the Lima districts GeoJSON file."""
-    if not GEOJSON_PATH.exists():
-        raise HTTPException(status_code=404, detail="GeoJSON file not found")
-    try:
-        with open(GEOJSON_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading GeoJSON file: {e}")
+def get_districts_geojson(
+    request: Request,
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Zoom del mapa: elige el nivel de detalle"),
+    tolerance: Optional[float] = Query(None, gt=0, description="Tolerancia de simplificación en grados"),
+    format: Optional[str] = Query(None, pattern="^(geojson|topojson)$", description="geojson (por defecto) o topojson"),
+):
+    """Serve the Lima districts GeoJSON file (precomprimido, con ETag).
+
+    Sin parámetros devuelve la geometría completa; con ``zoom`` o ``tolerance``
+    devuelve un nivel simplificado con menos decimales. Con ``format=topojson``
+    (o ``Accept: application/topo+json``) los bordes compartidos van una sola vez.
+    """
+    level = district_lod.select_level(zoom, tolerance)
+    if district_lod.wants_topojson(format, request.headers.get("accept", "")):
+        payload = district_lod.topojson_payload(districts_geojson, level)
+    else:
+        payload = district_lod.lod_payload(districts_geojson, level)
+    return conditional_response(request, payload, vary="Accept, Accept-Encoding")
 
 # ---------------------------------------------
 # ROUTERS - ORDEN CRÍTICO: MÁS ESPECÍFICO PRIMERO
 # ---------------------------------------------
+def include_router(app: FastAPI, router, prefix: str = "", tags=None):
+    app.include_router(router, prefix=prefix, tags=tags)
+    metrics.register_routes(router, prefix)  # plantillas completas para las métricas
 
-# 1️⃣ PRIMERO: Routers con rutas más específicas (/api/projects/...)
-app.include_router(
-    projects.router,
-    prefix="/api/projects",
-    tags=["projects"]
-)
+def include_routers(app: FastAPI):
+    """Se llama desde load_routers; el orden de inclusión define la prioridad de las rutas."""
+    from backend.routers import projects, drawings, annotations, general_map, tiles, spatial, export, search, changes
+    from backend.database import ASYNC_ENABLED
 
-app.include_router(
-    drawings.router,
-    prefix="/api/projects",
-    tags=["drawings"]
-)
+    # 0️⃣ Con DB_ASYNC=1 las lecturas asíncronas van antes y atienden las mismas rutas
+    if ASYNC_ENABLED:
+        from backend.routers import async_reads
 
-app.include_router(
-    annotations.router,
-    prefix="/api/projects",
-    tags=["annotations"]
-)
+        include_router(app, async_reads.projects_router, prefix="/api/projects", tags=["projects"])
+        include_router(app, async_reads.districts_router, prefix="/api", tags=["general_map"])
+
+    # 1️⃣ PRIMERO: Routers con rutas más específicas (/api/projects/...)
+    include_router(
+        app,
+        projects.router,
+        prefix="/api/projects",
+        tags=["projects"]
+    )
+
+    include_router(
+        app,
+        drawings.router,
+        prefix="/api/projects",
+        tags=["drawings"]
+    )
+
+    include_router(
+        app,
+        annotations.router,
+        prefix="/api/projects",
+        tags=["annotations"]
+    )
+
+    include_router(
+        app,
+        tiles.router,
+        prefix="/api/tiles",
+        tags=["tiles"]
+    )
+
+    include_router(
+        app,
+        spatial.router,
+        prefix="/api",
+        tags=["spatial"]
+    )
+
+    include_router(
+        app,
+        export.router,
+        prefix="/api",
+        tags=["export"]
+    )
+
+    include_router(
+        app,
+        search.router,
+        prefix="/api",
+        tags=["search"]
+    )
+
+    include_router(
+        app,
+        changes.router,
+        prefix="/api",
+        tags=["changes"]
+    )
 
-# 2️⃣ ÚLTIMO: Router general con /api (incluye GET /api/projects y /api/districts)
-app.include_router(
-    general_map.router,
-    prefix="/api",
-    tags=["general_map"]
-)
\ No newline at end of file
+    # 2️⃣ ÚLTIMO: Router general con /api (incluye GET /api/projects y /api/districts)
+    include_router(
+        app,
+        general_map.router,
+        prefix="/api",
+        tags=["general_map"]
+    )
@@ -0,0 +1,358 @@
+# backend/metrics.py
+"""
+Métricas de la API en formato Prometheus (``GET /metrics``).
+
+- ``MetricsMiddleware`` mide cada petición por plantilla de ruta
+  (``/api/projects/{project_id}``, no la URL): latencia, tamaño de respuesta y
+  estado. Agrega ``Server-Timing`` con el tiempo de BD, las consultas y las
+  filas de esa petición.
+- ``instrument_engine`` engancha eventos de SQLAlchemy: consultas, filas
+  leídas y tiempo de BD por petición, y log de consultas lentas
+  (``SLOW_QUERY_MS``, 0 = apagado).
+- ``timed_pool`` mide la espera por una conexión libre del pool.
+
+Todo vive en memoria del proceso: cada worker publica sus propias series.
+SQLAlchemy se importa solo al instrumentar un motor: el middleware se carga
+con la app sin arrastrar la BD.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from dotenv import load_dotenv
+from starlette.routing import compile_path
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ---------------------------------------------
+# SERIES
+# ---------------------------------------------
+def _labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{n}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {value:g}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [conteos por bucket (no acumulados)..., +Inf, suma]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield f"{self.name}_bucket{_labels(self.labels + ('le',), labels + (le,))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {series[-1]:g}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+ROUTE_LABELS = ("method", "route")
+
+http_requests = Counter("http_requests_total", "Peticiones atendidas", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "Latencia por ruta", LATENCY_BUCKETS, ROUTE_LABELS)
+http_size = Histogram("http_response_size_bytes", "Tamaño del cuerpo de la respuesta", SIZE_BUCKETS, ROUTE_LABELS)
+http_queries = Histogram("http_request_db_queries", "Consultas SQL por petición", QUERY_BUCKETS, ROUTE_LABELS)
+db_queries = Counter("db_queries_total", "Consultas SQL ejecutadas", ("route",))
+db_rows = Counter("db_rows_total", "Filas leídas de la BD", ("route",))
+db_seconds = Counter("db_query_seconds_total", "Tiempo en consultas SQL", ("route",))
+db_slow_queries = Counter("db_slow_queries_total", "Consultas sobre SLOW_QUERY_MS", ("route",))
+pool_wait = Histogram("db_pool_checkout_wait_seconds", "Espera por una conexión del pool", POOL_WAIT_BUCKETS)
+
+METRICS = (http_requests, http_latency, http_size, http_queries,
+           db_queries, db_rows, db_seconds, db_slow_queries, pool_wait)
+
+
+# ---------------------------------------------
+# ESTADÍSTICAS POR PETICIÓN
+# ---------------------------------------------
+class RequestStats:
+    """Acumulado de BD de una petición; el threadpool hereda el contexto, así que es el mismo objeto."""
+    __slots__ = ("scope", "queries", "rows", "db_time", "pool_wait")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+class _CountingCursor:
+    """Proxy del cursor DBAPI que suma las filas que realmente se leen."""
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# ---------------------------------------------
+# SQLALCHEMY
+# ---------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if context is not None and cursor.description is not None:
+            context.cursor = _CountingCursor(cursor, stats)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        route = _route_template(stats.scope) if stats is not None else "background"
+        db_slow_queries.inc(1, route)
+        logger.warning("Consulta lenta (%.1f ms) en %s: %s", elapsed * 1000, route,
+                       " ".join(statement.split())[:500])
+
+
+_timed_pools: Dict[type, type] = {}
+
+
+def timed_pool(base: type) -> type:
+    """Subclase de ``base`` (QueuePool o AsyncAdaptedQueuePool) que registra la espera por conexión."""
+    if base not in _timed_pools:
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return base._do_get(self)
+            finally:
+                _record_pool_wait(time.perf_counter() - start)
+
+        _timed_pools[base] = type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+    return _timed_pools[base]
+
+
+def _record_pool_wait(elapsed: float):
+    pool_wait.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += elapsed
+
+
+_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def instrument_engine(engine):
+    """Engancha los contadores de consultas a un Engine (o al sync_engine de un AsyncEngine)."""
+    from sqlalchemy import event
+
+    engine = getattr(engine, "sync_engine", engine)
+    if engine in _engines:
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _engines.add(engine)
+    return engine
+
+
+def _pool_gauges():
+    """Estado actual de los pools instrumentados (se calcula al publicar)."""
+    if not _engines:
+        return
+    from sqlalchemy.pool import QueuePool
+
+    rows = []
+    for engine in list(_engines):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        name = engine.url.drivername
+        rows.append((name, pool.size(), pool.checkedout(), pool.overflow()))
+    if not rows:
+        return
+    for metric, index, help in (("db_pool_size", 1, "Conexiones del pool"),
+                                ("db_pool_checked_out", 2, "Conexiones en uso"),
+                                ("db_pool_overflow", 3, "Conexiones por encima de pool_size")):
+        yield f"# HELP {metric} {help}"
+        yield f"# TYPE {metric} gauge"
+        for row in rows:
+            yield f'{metric}{{driver="{row[0]}"}} {row[index]}'
+
+
+def render() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(_pool_gauges())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------
+# MIDDLEWARE
+# ---------------------------------------------
+# Plantillas completas (prefijo + ruta) de los routers incluidos: la ruta que
+# queda en scope["route"] solo conoce su parte, sin el prefijo del include
+_route_templates: Dict[int, str] = {}
+_route_patterns: List[Tuple[Pattern, str]] = []
+
+
+def register_routes(router, prefix: str = ""):
+    """Registra las rutas de un router incluido con ``prefix`` (en el mismo orden que la app)."""
+    for route in router.routes:
+        path = getattr(route, "path", None)
+        if path is None:
+            continue
+        template = prefix + path
+        _route_templates[id(route)] = template
+        _route_patterns.append((compile_path(template)[0], template))
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        template = _route_templates.get(id(route)) or getattr(route, "path_format", None)
+        if template:
+            return template
+    # Respuestas que no pasan por el router (aciertos de caché): se busca la plantilla
+    path = scope["path"]
+    for regex, template in _route_patterns:
+        if regex.match(path):
+            return template
+    return "unmatched"
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return (f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+            f"pool;dur={stats.pool_wait * 1000:.2f}, total;dur={total * 1000:.2f}")
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: métricas por ruta y cabecera ``Server-Timing``."""
+
+    def __init__(self, app, skip_paths: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing(stats, time.perf_counter() - start).encode("latin-1")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing)]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            route = _route_template(scope)
+            method = scope["method"]
+            http_requests.inc(1, method, route, str(status))
+            http_latency.observe(elapsed, method, route)
+            http_size.observe(size, method, route)
+            http_queries.observe(stats.queries, method, route)
+            if stats.queries:
+                db_queries.inc(stats.queries, route)
+                db_rows.inc(stats.rows, route)
+                db_seconds.inc(stats.db_time, route)
@@ -0,0 +1,155 @@
+# backend/migrations.py
+"""
+Migraciones ligeras e idempotentes.
+
+``create_all`` crea las tablas nuevas pero no altera las existentes; aquí se
+agregan las columnas que faltan y se rellenan los datos derivados.
+
+Es un paso explícito del despliegue (``python -m backend.migrations``); la app
+solo las corre al arrancar con ``AUTO_MIGRATE=1`` (por defecto en SQLite local).
+"""
+import json
+
+from sqlalchemy import inspect, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import Base
+from backend.geometry import geometry_bbox
+
+# (tabla, columna, tipo SQL) agregadas después de la primera versión del esquema
+ADDED_COLUMNS = [
+    ("drawings", "min_lon", "FLOAT"),
+    ("drawings", "min_lat", "FLOAT"),
+    ("drawings", "max_lon", "FLOAT"),
+    ("drawings", "max_lat", "FLOAT"),
+    ("drawings", "content_hash", "VARCHAR(64)"),
+    ("project_districts", "district_id", "INTEGER REFERENCES districts(id)"),
+    ("district_summaries", "district_id", "INTEGER REFERENCES districts(id)"),
+]
+
+# (nombre, tabla, columnas) de índices agregados sobre tablas ya existentes
+ADDED_INDEXES = [
+    ("ix_projects_created_at_id", "projects", "created_at, id"),
+    ("ix_projects_source_url", "projects", "source_url"),
+    ("ix_project_districts_district_id", "project_districts", "district_id"),
+    ("ix_project_districts_lower_name", "project_districts", "lower(distrito_name)"),
+    ("ix_district_summaries_district_id", "district_summaries", "district_id"),
+    ("ix_change_log_changed_at", "change_log", "changed_at"),
+    ("ix_change_log_entity", "change_log", "entity, entity_id"),
+]
+
+
+def _add_missing_columns(engine: Engine):
+    inspector = inspect(engine)
+    existing = {}
+    with engine.begin() as conn:
+        for table, column, sql_type in ADDED_COLUMNS:
+            if table not in existing:
+                existing[table] = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing[table]:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}"))
+                existing[table].add(column)
+
+
+def _add_missing_indexes(engine: Engine):
+    with engine.begin() as conn:
+        for name, table, columns in ADDED_INDEXES:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+def _convert_drawing_geojson(engine: Engine):
+    """En Postgres, ``drawings.geojson`` pasa de TEXT a JSONB (SQLite guarda JSON como texto)."""
+    if engine.dialect.name != "postgresql":
+        return
+    columns = {c["name"]: c["type"] for c in inspect(engine).get_columns("drawings")}
+    if type(columns["geojson"]).__name__.upper() == "JSONB":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE drawings ALTER COLUMN geojson TYPE JSONB USING geojson::jsonb"))
+
+
+def _backfill_drawing_bboxes(engine: Engine, batch_size: int = 500):
+    """Rellena bbox y content_hash de los dibujos guardados antes de esas columnas."""
+    last_id = 0
+    with Session(engine) as db:
+        while True:
+            drawings = db.query(models.Drawing).filter(
+                or_(models.Drawing.min_lon.is_(None), models.Drawing.content_hash.is_(None)),
+                models.Drawing.id > last_id,
+            ).order_by(models.Drawing.id).limit(batch_size).all()
+            if not drawings:
+                break
+            for drawing in drawings:
+                drawing.content_hash = models.Drawing.compute_hash(drawing.geojson, drawing.drawing_type)
+                try:
+                    drawing.bbox = geometry_bbox(drawing.geojson)
+                except (AttributeError, TypeError, ValueError):
+                    pass  # GeoJSON inválido: queda sin bbox y fuera del índice
+                last_id = drawing.id
+            db.commit()
+
+
+def _seed_districts(engine: Engine):
+    """Tabla ``districts`` desde el GeoJSON y enlace de los nombres ya guardados."""
+    from backend import districts
+    from backend.geojson_cache import DISTRICTS_GEOJSON_PATH
+
+    if not DISTRICTS_GEOJSON_PATH.exists():
+        return
+    with open(DISTRICTS_GEOJSON_PATH, encoding="utf-8") as f:
+        feature_collection = json.load(f)
+    with Session(engine) as db:
+        districts.seed(db, feature_collection)
+        districts.backfill_project_districts(db)
+
+
+def _backfill_district_summaries(engine: Engine):
+    """Reconstruye el resumen si está vacío o tiene filas por nombre de un distrito reconocido."""
+    from backend import district_summary, districts
+
+    with Session(engine) as db:
+        if db.query(models.DistrictSummary.id).first() is None:
+            stale = db.query(models.ProjectDistrict.id).first() is not None
+        else:
+            by_name = [name for (name,) in db.query(models.DistrictSummary.district).filter(
+                models.DistrictSummary.district_id.is_(None)
+            ).distinct()]
+            stale = bool(districts.resolve_ids(db, by_name))
+        if stale:
+            district_summary.rebuild(db)
+
+
+def _setup_search_index(engine: Engine):
+    """Índice de texto completo del motor y documentos de los datos ya existentes."""
+    from backend import search
+
+    search.setup_index(engine)
+    with Session(engine) as db:
+        if db.query(models.SearchDocument.id).first() is None and \
+                db.query(models.Project.id).first() is not None:
+            search.rebuild(db)
+
+
+def run_migrations(engine: Engine):
+    """Crea tablas, agrega columnas nuevas y rellena datos derivados."""
+    Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _add_missing_indexes(engine)
+    _convert_drawing_geojson(engine)
+    _backfill_drawing_bboxes(engine)
+    _seed_districts(engine)
+    _backfill_district_summaries(engine)
+    _setup_search_index(engine)
+
+
+if __name__ == "__main__":
+    import time
+
+    from backend.database import describe, get_engine
+
+    print(describe())
+    start = time.perf_counter()
+    run_migrations(get_engine())
+    print(f"Migraciones aplicadas en {time.perf_counter() - start:.2f}s")
@@ -1,9 +1,13 @@
 # backend/models.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, Boolean, JSON, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, Boolean, JSON, Enum, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
+import hashlib
+import json
 from .database import Base
+from .geometry import geometry_bbox
 
 class UserRole(enum.Enum):
     VIEWER = "viewer"
@@ -28,10 +32,15 @@ class Project(Base):
     verified = Column(Boolean, default=False)
     verified_by = Column(String, ForeignKey('users.id'), nullable=True)
     created_by = Column(String, ForeignKey('users.id'), nullable=True)
-    source_url = Column(String, nullable=True)
+    source_url = Column(String, nullable=True, index=True)   # deduplicación de importaciones
     scraped_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Paginación por cursor: ORDER BY created_at DESC, id DESC
+    __table_args__ = (
+        Index('ix_projects_created_at_id', 'created_at', 'id'),
+    )
     
     # Relationships
     districts = relationship("ProjectDistrict", back_populates="project", cascade="all, delete-orphan")
@@ -40,15 +49,42 @@ class Project(Base):
     edit_history = relationship("EditHistory", back_populates="project", cascade="all, delete-orphan")
     edit_suggestions = relationship("EditSuggestion", back_populates="project", cascade="all, delete-orphan")
 
+    def touch(self):
+        """Marca el proyecto como modificado al cambiar sus dibujos o anotaciones (ETag)."""
+        self.updated_at = datetime.utcnow()
+
+class District(Base):
+    """Distrito canónico, sembrado desde lima_callao_distritos.geojson (id = propiedad ``id``)."""
+    __tablename__ = "districts"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, unique=True)      # propiedad "distrito" del GeoJSON
+    display_name = Column(String, nullable=True)           # "distrito2" o nombre legible
+    province = Column(String, nullable=True)
+
+    aliases = relationship("DistrictAlias", back_populates="district", cascade="all, delete-orphan")
+
+class DistrictAlias(Base):
+    """Variantes de escritura normalizadas (sin tildes, mayúsculas) que apuntan a un distrito."""
+    __tablename__ = "district_aliases"
+
+    alias_key = Column(String, primary_key=True)
+    district_id = Column(Integer, ForeignKey("districts.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    district = relationship("District", back_populates="aliases")
+
 class ProjectDistrict(Base):
     __tablename__ = "project_districts"
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
     distrito_name = Column(String, nullable=False, index=True)
+    # Distrito canónico (NULL si el nombre escrito no corresponde a ninguno)
+    district_id = Column(Integer, ForeignKey("districts.id"), nullable=True, index=True)
     notes = Column(Text, nullable=True)
 
     project = relationship("Project", back_populates="districts")
+    district = relationship("District")
 
     __table_args__ = (
         UniqueConstraint('project_id', 'distrito_name', name='_project_district_uc'),
@@ -59,12 +95,105 @@ class Drawing(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), index=True)
-    geojson = Column(Text, nullable=False)
+    # JSONB en Postgres, JSON (texto) en SQLite: se lee y escribe como dict
+    geojson = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
     drawing_type = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Bounding box calculado al guardar (alimenta el índice espacial y las teselas)
+    min_lon = Column(Float, nullable=True)
+    min_lat = Column(Float, nullable=True)
+    max_lon = Column(Float, nullable=True)
+    max_lat = Column(Float, nullable=True)
+
+    # sha256 de (geojson, drawing_type): el guardado por lotes solo reescribe lo que cambió
+    content_hash = Column(String(64), nullable=True)
+
     project = relationship("Project", back_populates="drawings")
 
+    @staticmethod
+    def compute_hash(geojson, drawing_type) -> str:
+        canonical = json.dumps([geojson, drawing_type], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def row_values(cls, project_id: int, geojson: dict, drawing_type: str) -> dict:
+        """Columnas de un dibujo: GeoJSON, bbox y hash de contenido ya calculados."""
+        min_lon, min_lat, max_lon, max_lat = geometry_bbox(geojson) or (None, None, None, None)
+        return {
+            "project_id": project_id,
+            "geojson": geojson,
+            "drawing_type": drawing_type,
+            "content_hash": cls.compute_hash(geojson, drawing_type),
+            "min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat,
+        }
+
+    @property
+    def bbox(self):
+        if self.min_lon is None:
+            return None
+        return (self.min_lon, self.min_lat, self.max_lon, self.max_lat)
+
+    @bbox.setter
+    def bbox(self, value):
+        self.min_lon, self.min_lat, self.max_lon, self.max_lat = value or (None, None, None, None)
+
+class DistrictSummary(Base):
+    """Conteos materializados por distrito y estado (ver backend/district_summary.py)."""
+    __tablename__ = "district_summaries"
+
+    id = Column(Integer, primary_key=True)
+    district_id = Column(Integer, ForeignKey("districts.id"), nullable=True, index=True)
+    district = Column(String, nullable=False, index=True)   # nombre canónico o normalizado
+    status = Column(String, nullable=True)
+    project_count = Column(Integer, nullable=False, default=0)
+    drawing_count = Column(Integer, nullable=False, default=0)
+    last_updated = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('district', 'status', name='_district_status_uc'),
+    )
+
+class SearchDocument(Base):
+    """Texto indexable de proyectos y anotaciones (ver backend/search.py)."""
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)        # "project" | "annotation"
+    ref_id = Column(Integer, nullable=False)         # id del proyecto o de la anotación
+    project_id = Column(Integer, nullable=False, index=True)
+    title = Column(String, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+
+    __table_args__ = (
+        UniqueConstraint('kind', 'ref_id', name='_search_kind_ref_uc'),
+    )
+
+class ChangeLog(Base):
+    """Cambios de proyectos, dibujos y anotaciones (ver backend/change_log.py); el id es el cursor."""
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)      # "project" | "drawing" | "annotation"
+    entity_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    op = Column(String(8), nullable=False)           # "upsert" | "delete" (lápida)
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)   # retención por antigüedad
+
+    __table_args__ = (
+        # Compactación: la última entrada de cada entidad
+        Index('ix_change_log_entity', 'entity', 'entity_id'),
+        # AUTOINCREMENT en SQLite: los ids nunca se reutilizan (el cursor es monótono)
+        {"sqlite_autoincrement": True},
+    )
+
+class ChangeLogHorizon(Base):
+    """Último cursor podado de ``change_log``: con uno anterior el cliente debe recargar todo."""
+    __tablename__ = "change_log_horizon"
+
+    id = Column(Integer, primary_key=True)           # una sola fila (id = 1)
+    cursor = Column(Integer, nullable=False, default=0)
+
 class Annotation(Base):
     __tablename__ = "annotations"
 
@@ -0,0 +1,345 @@
+# backend/mvt.py
+"""
+Codificador mínimo de Mapbox Vector Tiles (spec 2.1) en Python puro.
+
+Proyecta geometrías GeoJSON [lon, lat] a coordenadas de tesela, las recorta al
+borde de la tesela (más un margen) y las serializa en protobuf a mano.
+"""
+import math
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from backend.geometry import iter_geometries
+
+EXTENT = 4096
+BUFFER = 64   # margen en unidades de tesela para que los trazos no se corten en el borde
+
+GEOM_POINT, GEOM_LINESTRING, GEOM_POLYGON = 1, 2, 3
+CMD_MOVE_TO, CMD_LINE_TO, CMD_CLOSE_PATH = 1, 2, 7
+
+MAX_LATITUDE = 85.0511287798
+
+
+# ---------------------------------------------
+# COORDENADAS DE TESELA
+# ---------------------------------------------
+def tile_bounds(z: int, x: int, y: int, buffer: float = 0.0) -> Tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) de la tesela, ampliada ``buffer`` unidades."""
+    n = 2 ** z
+    pad = buffer / EXTENT
+
+    def lon(tx):
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lon(x - pad), lat(y + 1 + pad), lon(x + 1 + pad), lat(y - pad)
+
+
+def tiles_for_bbox(z: int, bbox: Tuple[float, float, float, float]):
+    """Rango (x0, y0, x1, y1) inclusivo de teselas que cubren un bbox a ese zoom."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    n = 2 ** z
+
+    def tx(lon):
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def ty(lat):
+        lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+        rad = math.radians(lat)
+        return min(n - 1, max(0, int((1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n)))
+
+    return tx(min_lon), ty(max_lat), tx(max_lon), ty(min_lat)
+
+
+class TileProjection:
+    """Convierte [lon, lat] a coordenadas enteras dentro de la tesela z/x/y."""
+
+    def __init__(self, z: int, x: int, y: int, extent: int = EXTENT):
+        self.scale = 2 ** z * extent
+        self.ox = x * extent
+        self.oy = y * extent
+
+    def __call__(self, point) -> Tuple[float, float]:
+        lon, lat = point[0], max(-MAX_LATITUDE, min(MAX_LATITUDE, point[1]))
+        px = (lon + 180.0) / 360.0 * self.scale
+        rad = math.radians(lat)
+        py = (1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * self.scale
+        return px - self.ox, py - self.oy
+
+
+# ---------------------------------------------
+# RECORTE
+# ---------------------------------------------
+def clip_ring(ring: List[Tuple[float, float]], lo: float, hi: float) -> List[Tuple[float, float]]:
+    """Sutherland-Hodgman contra el cuadrado [lo, hi]²."""
+    def clip(points, inside, intersect):
+        out = []
+        if not points:
+            return out
+        prev = points[-1]
+        for cur in points:
+            if inside(cur):
+                if not inside(prev):
+                    out.append(intersect(prev, cur))
+                out.append(cur)
+            elif inside(prev):
+                out.append(intersect(prev, cur))
+            prev = cur
+        return out
+
+    def at_x(xv):
+        return lambda a, b: (xv, a[1] + (b[1] - a[1]) * (xv - a[0]) / (b[0] - a[0]))
+
+    def at_y(yv):
+        return lambda a, b: (a[0] + (b[0] - a[0]) * (yv - a[1]) / (b[1] - a[1]), yv)
+
+    points = ring
+    points = clip(points, lambda p: p[0] >= lo, at_x(lo))
+    points = clip(points, lambda p: p[0] <= hi, at_x(hi))
+    points = clip(points, lambda p: p[1] >= lo, at_y(lo))
+    points = clip(points, lambda p: p[1] <= hi, at_y(hi))
+    return points
+
+
+def clip_line(line: List[Tuple[float, float]], lo: float, hi: float) -> List[List[Tuple[float, float]]]:
+    """Liang-Barsky por segmento; devuelve los tramos que quedan dentro."""
+    parts: List[List[Tuple[float, float]]] = []
+    current: List[Tuple[float, float]] = []
+    for a, b in zip(line, line[1:]):
+        t0, t1 = 0.0, 1.0
+        dx, dy = b[0] - a[0], b[1] - a[1]
+        visible = True
+        for p, q in ((-dx, a[0] - lo), (dx, hi - a[0]), (-dy, a[1] - lo), (dy, hi - a[1])):
+            if p == 0:
+                if q < 0:
+                    visible = False
+                    break
+            else:
+                r = q / p
+                if p < 0:
+                    t0 = max(t0, r)
+                else:
+                    t1 = min(t1, r)
+                if t0 > t1:
+                    visible = False
+                    break
+        if not visible:
+            if current:
+                parts.append(current)
+                current = []
+            continue
+        start = (a[0] + t0 * dx, a[1] + t0 * dy)
+        end = (a[0] + t1 * dx, a[1] + t1 * dy)
+        if not current:
+            current = [start]
+        current.append(end)
+        if t1 < 1.0:
+            parts.append(current)
+            current = []
+    if current:
+        parts.append(current)
+    return parts
+
+
+# ---------------------------------------------
+# GEOMETRÍA -> COMANDOS MVT
+# ---------------------------------------------
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _command(cmd: int, count: int) -> int:
+    return (cmd & 0x7) | (count << 3)
+
+
+def _snap(points) -> List[Tuple[int, int]]:
+    out: List[Tuple[int, int]] = []
+    for x, y in points:
+        p = (int(round(x)), int(round(y)))
+        if not out or out[-1] != p:
+            out.append(p)
+    return out
+
+
+def _ring_area(ring: List[Tuple[int, int]]) -> float:
+    area = 0
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+class _Cursor:
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+        self.out: List[int] = []
+
+    def path(self, points: List[Tuple[int, int]], close: bool = False):
+        self.out.append(_command(CMD_MOVE_TO, 1))
+        self._params(points[:1])
+        if len(points) > 1:
+            self.out.append(_command(CMD_LINE_TO, len(points) - 1))
+            self._params(points[1:])
+        if close:
+            self.out.append(_command(CMD_CLOSE_PATH, 1))
+
+    def points(self, points: List[Tuple[int, int]]):
+        self.out.append(_command(CMD_MOVE_TO, len(points)))
+        self._params(points)
+
+    def _params(self, points):
+        for x, y in points:
+            self.out.append(_zigzag(x - self.x))
+            self.out.append(_zigzag(y - self.y))
+            self.x, self.y = x, y
+
+
+def encode_geometry(geometry: dict, project: TileProjection, buffer: int = BUFFER,
+                    extent: int = EXTENT) -> Optional[Tuple[int, List[int]]]:
+    """
+    Proyecta, recorta y codifica una geometría GeoJSON.
+    Devuelve (tipo MVT, comandos) o None si no queda nada dentro de la tesela.
+    Geometrías de tipos distintos se reducen al tipo de mayor dimensión.
+    """
+    lo, hi = -buffer, extent + buffer
+    points, lines, polygons = [], [], []
+
+    for geom in iter_geometries(geometry):
+        gtype, coords = geom.get("type"), geom.get("coordinates")
+        if not coords:
+            continue
+        if gtype == "Point":
+            coords = [coords]
+        if gtype in ("Point", "MultiPoint"):
+            for c in coords:
+                x, y = project(c)
+                if lo <= x <= hi and lo <= y <= hi:
+                    points.append((int(round(x)), int(round(y))))
+        elif gtype in ("LineString", "MultiLineString"):
+            for line in ([coords] if gtype == "LineString" else coords):
+                for part in clip_line([project(c) for c in line], lo, hi):
+                    snapped = _snap(part)
+                    if len(snapped) >= 2:
+                        lines.append(snapped)
+        elif gtype in ("Polygon", "MultiPolygon"):
+            for poly in ([coords] if gtype == "Polygon" else coords):
+                rings = []
+                for i, ring in enumerate(poly):
+                    clipped = _snap(clip_ring([project(c) for c in ring[:-1]], lo, hi))
+                    if len(clipped) > 1 and clipped[0] == clipped[-1]:
+                        clipped.pop()
+                    if len(clipped) < 3 or _ring_area(clipped) == 0:
+                        if i == 0:
+                            break
+                        continue
+                    # Exterior con área positiva (horario con y hacia abajo), agujeros negativa.
+                    if (_ring_area(clipped) > 0) != (i == 0):
+                        clipped.reverse()
+                    rings.append(clipped)
+                polygons.extend(rings)
+
+    cursor = _Cursor()
+    if polygons:
+        for ring in polygons:
+            cursor.path(ring, close=True)
+        return GEOM_POLYGON, cursor.out
+    if lines:
+        for line in lines:
+            cursor.path(line)
+        return GEOM_LINESTRING, cursor.out
+    if points:
+        cursor.points(points)
+        return GEOM_POINT, cursor.out
+    return None
+
+
+# ---------------------------------------------
+# PROTOBUF
+# ---------------------------------------------
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field(number: int, wire_type: int) -> bytes:
+    return _varint((number << 3) | wire_type)
+
+
+def _bytes_field(number: int, payload: bytes) -> bytes:
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number: int, values: List[int]) -> bytes:
+    return _bytes_field(number, b"".join(_varint(v) for v in values))
+
+
+def _value(value) -> bytes:
+    if isinstance(value, bool):
+        return _field(7, 0) + _varint(int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _field(5, 0) + _varint(value)
+        return _field(6, 0) + _varint(_zigzag(value))
+    if isinstance(value, float):
+        return _field(3, 1) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode("utf-8"))
+
+
+class Layer:
+    """Acumula features de una capa con sus diccionarios de claves/valores."""
+
+    def __init__(self, name: str, extent: int = EXTENT):
+        self.name = name
+        self.extent = extent
+        self.keys: Dict[str, int] = {}
+        self.values: Dict[tuple, int] = {}
+        self.features: List[bytes] = []
+
+    def add_feature(self, geometry: dict, properties: dict, project: TileProjection,
+                    feature_id: Optional[int] = None) -> bool:
+        encoded = encode_geometry(geometry, project, extent=self.extent)
+        if encoded is None:
+            return False
+        geom_type, commands = encoded
+
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(self.keys.setdefault(key, len(self.keys)))
+            tags.append(self.values.setdefault((type(value).__name__, value), len(self.values)))
+
+        feature = b""
+        if feature_id is not None and feature_id >= 0:
+            feature += _field(1, 0) + _varint(feature_id)
+        if tags:
+            feature += _packed(2, tags)
+        feature += _field(3, 0) + _varint(geom_type)
+        feature += _packed(4, commands)
+        self.features.append(feature)
+        return True
+
+    def encode(self) -> bytes:
+        body = _bytes_field(1, self.name.encode("utf-8"))
+        for feature in self.features:
+            body += _bytes_field(2, feature)
+        for key in self.keys:
+            body += _bytes_field(3, key.encode("utf-8"))
+        for (_, value) in self.values:
+            body += _bytes_field(4, _value(value))
+        body += _field(5, 0) + _varint(self.extent)
+        body += _field(15, 0) + _varint(2)
+        return body
+
+
+def encode_tile(layers: List[Layer]) -> bytes:
+    return b"".join(_bytes_field(3, layer.encode()) for layer in layers if layer.features)
@@ -0,0 +1,336 @@
+# backend/response_cache.py
+"""
+Caché de respuestas de lectura (bytes JSON ya serializados).
+
+``ResponseCacheMiddleware`` atiende los GET de las rutas en ``CACHED_PREFIXES``:
+si la URL está en caché responde sin tocar la BD ni Pydantic; si no, deja pasar
+la petición y guarda el cuerpo solo si el endpoint lo marcó con ``tag()``.
+
+Cada entrada lleva etiquetas (``project:<id>``, ``district:<id>``,
+``projects:list``) y las escrituras invalidan exactamente esas etiquetas tras
+el commit. Backend configurable con ``RESPONSE_CACHE_URL``:
+- ``memory`` (por defecto): LRU en proceso con TTL y tope de bytes;
+- ``redis://...``: compartido entre procesos (requiere el paquete ``redis``);
+- ``off``: sin caché.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+from backend import conditional
+
+if TYPE_CHECKING:  # SQLAlchemy se carga con los routers, no con el middleware
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+try:
+    import redis
+except ImportError:  # redis es opcional: sin él solo hay caché en memoria
+    redis = None
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "memory")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+CACHED_PREFIXES = ("/api/projects", "/api/districts/")
+
+# Cabeceras de la respuesta original que se guardan junto al cuerpo
+KEPT_HEADERS = ("content-type", "x-next-cursor", "link", "etag", "last-modified", "cache-control")
+
+LIST_TAG = "projects:list"
+
+Entry = Tuple[Dict[str, str], bytes]      # (cabeceras, cuerpo)
+
+
+def project_tag(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+def _district_tags(names: List[str], ids: Dict[str, int]) -> List[str]:
+    from backend import districts
+
+    return sorted({
+        f"district:{ids[n]}" if n in ids else f"district:{districts.normalize_name(n)}"
+        for n in names
+    })
+
+
+def district_tags(db: "Session", names: Iterable[str]) -> List[str]:
+    """Etiqueta por distrito canónico (o por nombre normalizado si no se reconoce)."""
+    from backend import districts
+
+    names = [n for n in names if n]
+    return _district_tags(names, districts.resolve_ids(db, names))
+
+
+async def district_tags_async(db: "AsyncSession", names: Iterable[str]) -> List[str]:
+    from backend import districts
+
+    names = [n for n in names if n]
+    return _district_tags(names, await districts.resolve_ids_async(db, names))
+
+
+# ---------------------------------------------
+# BACKENDS
+# ---------------------------------------------
+def encode_entry(headers: Dict[str, str], body: bytes) -> bytes:
+    return json.dumps(headers).encode("utf-8") + b"\n" + body
+
+
+def decode_entry(raw: bytes) -> Entry:
+    head, _, body = raw.partition(b"\n")
+    return json.loads(head), body
+
+
+class MemoryBackend:
+    """LRU en proceso con TTL por entrada y tope total de bytes."""
+
+    blocking = False
+
+    def __init__(self, ttl: int = RESPONSE_CACHE_TTL, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Cambia en cada invalidación: una respuesta calculada antes no se guarda.
+        self._generation = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def put(self, key: str, raw: bytes, tags: Iterable[str], generation: int):
+        if len(raw) > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._drop(key)
+            tags = set(tags)
+            self._entries[key] = (time.monotonic() + self.ttl, raw, tags)
+            self._bytes += len(raw)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            self._generation += 1
+            keys = set().union(*(self._tags.pop(tag, set()) for tag in tags))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        self._bytes -= len(item[1])
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Mismo contrato sobre Redis: una clave por respuesta (con TTL) y un SET por
+    etiqueta con las claves que la llevan. ``client`` puede ser cualquier objeto
+    con la API de redis-py (p. ej. ``fakeredis.FakeRedis()`` en pruebas).
+    """
+
+    blocking = True
+
+    def __init__(self, client, ttl: int = RESPONSE_CACHE_TTL, prefix: str = "rc:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_URL apunta a Redis pero el paquete 'redis' no está instalado")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def generation(self) -> int:
+        return int(self.client.get(self.prefix + "generation") or 0)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + "r:" + key)
+
+    def put(self, key: str, raw: bytes, tags: Iterable[str], generation: int):
+        if generation != self.generation():
+            return
+        self.client.set(self.prefix + "r:" + key, raw, ex=self.ttl)
+        for tag in tags:
+            self.client.sadd(self.prefix + "t:" + tag, key)
+            self.client.expire(self.prefix + "t:" + tag, self.ttl)
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        self.client.incr(self.prefix + "generation")
+        keys = set()
+        for tag in tags:
+            tag_key = self.prefix + "t:" + tag
+            keys.update(k.decode() if isinstance(k, bytes) else k for k in self.client.smembers(tag_key))
+            self.client.delete(tag_key)
+        if keys:
+            self.client.delete(*(self.prefix + "r:" + k for k in keys))
+        return len(keys)
+
+    def clear(self):
+        self.client.incr(self.prefix + "generation")
+        for key in self.client.scan_iter(self.prefix + "[rt]:*"):
+            self.client.delete(key)
+
+
+def create_backend(url: str = RESPONSE_CACHE_URL):
+    if url == "off":
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url)
+    return MemoryBackend()
+
+
+# Instancia compartida (``None`` = caché desactivada)
+response_cache = create_backend()
+
+
+def invalidate(*tags: str) -> int:
+    """Descarta las respuestas con cualquiera de esas etiquetas. Llamar después del commit."""
+    if response_cache is None or not tags:
+        return 0
+    return response_cache.invalidate(tags)
+
+
+def invalidate_project(db: "Session", project_id: Optional[int], district_names: Iterable[str] = (),
+                       lists: bool = False) -> int:
+    """Respuestas de un proyecto y de sus distritos (y de las listas si cambió la pertenencia)."""
+    if response_cache is None:
+        return 0
+    tags = district_tags(db, district_names)
+    if project_id is not None:
+        tags.append(project_tag(project_id))
+    if lists:
+        tags.append(LIST_TAG)
+    return invalidate(*tags)
+
+
+def tag(request: Request, *tags: str):
+    """Marca la respuesta en curso como cacheable bajo esas etiquetas."""
+    request.state.response_cache_tags = set(tags)
+
+
+# ---------------------------------------------
+# MIDDLEWARE
+# ---------------------------------------------
+def cache_key(scope) -> str:
+    query = scope.get("query_string", b"").decode("latin-1")
+    return scope["path"] + ("?" + "&".join(sorted(query.split("&"))) if query else "")
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI: sirve aciertos desde la caché y guarda los fallos etiquetados."""
+
+    def __init__(self, app, prefixes: Tuple[str, ...] = CACHED_PREFIXES):
+        self.app = app
+        self.prefixes = prefixes
+
+    async def _call(self, backend, method, *args):
+        fn = getattr(backend, method)
+        return await run_in_threadpool(fn, *args) if backend.blocking else fn(*args)
+
+    @staticmethod
+    def _not_modified(scope, headers: Dict[str, str]) -> bool:
+        """Validación condicional contra el ETag/Last-Modified guardados con la entrada."""
+        request_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        last_modified = None
+        if "last-modified" in headers:
+            last_modified = parsedate_to_datetime(headers["last-modified"]).replace(tzinfo=None)
+        return conditional.is_not_modified(request_headers, headers["etag"], last_modified)
+
+    async def __call__(self, scope, receive, send):
+        backend = response_cache
+        if (backend is None or scope["type"] != "http" or scope["method"] != "GET"
+                or not scope["path"].startswith(self.prefixes)):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        raw = await self._call(backend, "get", key)
+        if raw is not None:
+            headers, body = decode_entry(raw)
+            if "etag" in headers and self._not_modified(scope, headers):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k.encode(), v.encode()) for k, v in headers.items() if k != "content-type"]
+                    + [(b"x-cache", b"HIT")],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(k.encode(), v.encode()) for k, v in headers.items()] + [
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-cache", b"HIT"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        generation = await self._call(backend, "generation")
+        state = scope.setdefault("state", {})
+        captured = {"status": None, "headers": {}, "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = {
+                    k.decode().lower(): v.decode() for k, v in message.get("headers", [])
+                    if k.decode().lower() in KEPT_HEADERS
+                }
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        tags = state.get("response_cache_tags")
+        if tags is not None and captured["status"] == 200:
+            raw = encode_entry(captured["headers"], b"".join(captured["body"]))
+            await self._call(backend, "put", key, raw, tags, generation)
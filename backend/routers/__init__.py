@@ -2,4 +2,9 @@
 from . import projects
 from . import drawings
 from . import annotations
-from . import general_map
\ No newline at end of file
+from . import general_map
+from . import tiles
+from . import spatial
+from . import export
+from . import search
+from . import changes
@@ -1,7 +1,7 @@
 # backend/routers/annotations.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from backend import models, schemas
+from backend import models, schemas, search, response_cache, conditional, change_log, district_summary
 from backend.database import get_db
 from backend.routers.auth import editor_permission
 from typing import List
@@ -9,8 +9,16 @@ from typing import List
 router = APIRouter(tags=["Annotations"])
 
 @router.get("/{project_id}/annotations", response_model=List[schemas.AnnotationResponse])
-def get_annotations(project_id: int, db: Session = Depends(get_db)):
-    """Obtiene todas las anotaciones de un proyecto."""
+def get_annotations(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Obtiene todas las anotaciones de un proyecto (304 si no cambiaron)."""
+    updated_at = db.query(models.Project.updated_at).filter(models.Project.id == project_id).scalar()
+    if updated_at is not None:
+        not_modified = conditional.check(
+            request, response, conditional.resource_etag("annotations", project_id, updated_at), updated_at
+        )
+        if not_modified:
+            return not_modified
+
     return db.query(models.Annotation).filter(
         models.Annotation.project_id == project_id
     ).all()
@@ -24,8 +32,17 @@ def add_annotation(project_id: int, annotation: schemas.AnnotationCreate, db: Se
 
     db_annotation = models.Annotation(project_id=project_id, **annotation.dict())
     db.add(db_annotation)
+    # touch() cambia updated_at, que el resumen usa como last_updated
+    project.touch()
+    district_summary.refresh_project(db, project_id)
+    search.reindex_projects(db, [project_id])
+    db.flush()
+    change_log.record(db, change_log.ANNOTATION, [(db_annotation.id, project_id)])
+    change_log.record_project(db, project_id)
     db.commit()
     db.refresh(db_annotation)
+    # Los conteos de sus distritos traen last_updated
+    response_cache.invalidate_project(db, project_id, [d.distrito_name for d in project.districts])
     return db_annotation
 
 @router.delete("/{project_id}/annotations/{annotation_id}", dependencies=[Depends(editor_permission)])
@@ -39,6 +56,14 @@ def delete_annotation(project_id: int, annotation_id: int, db: Session = Depends
     if not annotation:
         raise HTTPException(404, "Annotation not found")
 
+    project = annotation.project
+    project.touch()
     db.delete(annotation)
+    district_summary.refresh_project(db, project_id)
+    search.reindex_projects(db, [project_id])
+    change_log.record(db, change_log.ANNOTATION, [(annotation_id, project_id)], deleted=True)
+    change_log.record_project(db, project_id)
     db.commit()
+    # Los conteos de sus distritos traen last_updated
+    response_cache.invalidate_project(db, project_id, [d.distrito_name for d in project.districts])
     return {"message": "Annotation deleted"}
\ No newline at end of file
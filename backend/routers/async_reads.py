@@ -0,0 +1,106 @@
+# backend/routers/async_reads.py
+"""
+Versiones asíncronas de los endpoints de lectura más usados (con ``DB_ASYNC=1``).
+
+Se montan antes que los routers síncronos y atienden las mismas rutas sin
+ocupar un hilo del threadpool: cada consulta es un ``await db.execute(...)``
+sobre el ``AsyncEngine`` (asyncpg / aiosqlite). Las sentencias, el ETag y la
+paginación son los mismos de los routers síncronos; solo cambia la ejecución.
+"""
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import get_async_db
+from backend import models, schemas, district_summary, districts, response_cache, serialization
+from backend.routers import general_map, projects
+from typing import Any, Dict, List, Optional
+
+# Prefijo /api/projects
+projects_router = APIRouter(tags=["Projects"])
+# Prefijo /api
+districts_router = APIRouter(tags=["Districts"])
+
+# -------------------------------------------------------------
+# Proyectos
+# -------------------------------------------------------------
+
+@projects_router.get("", response_model=List[schemas.ProjectResponse])
+async def get_all_projects(
+    request: Request,
+    response: Response,
+    limit: int = Query(projects.DEFAULT_PAGE_SIZE, ge=1, le=projects.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    status: Optional[str] = Query(None, description="Uno o más estados separados por coma"),
+    verified: Optional[bool] = Query(None),
+    district: Optional[str] = Query(None, description="Uno o más distritos separados por coma"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, p. ej. id,name,status"),
+    include: str = Query("districts", description="Relaciones: districts, drawings"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Lista proyectos por páginas (más recientes primero)."""
+    selected_fields, relations = projects.list_selection(fields, include)
+    district_clause = None
+    if district:
+        district_clause = await districts.district_filter_async(db, projects.split_param(district))
+
+    result = await db.execute(projects.list_query(selected_fields, limit, cursor, status, verified, district_clause))
+    rows = projects.paginate(request, response, result.all(), limit)
+
+    items = await serialization.project_dicts_async(
+        db, rows, fields=selected_fields | relations, relations=relations
+    )
+    return serialization.json_response(items, response)
+
+# ``:int`` para no capturar /clusters ni otras rutas del router síncrono
+@projects_router.get("/{project_id:int}", response_model=schemas.ProjectResponse)
+async def get_project(project_id: int, request: Request, response: Response,
+                      db: AsyncSession = Depends(get_async_db)):
+    """Obtiene un proyecto por ID (304 si el cliente ya tiene esta versión)."""
+    row = (await db.execute(projects.project_query(project_id))).first()
+    not_modified = projects.check_project(request, response, project_id, row)
+    if not_modified:
+        return not_modified
+
+    response_cache.tag(request, response_cache.project_tag(project_id))
+    items = await serialization.project_dicts_async(db, [row])
+    return serialization.json_response(items[0], response)
+
+# -------------------------------------------------------------
+# Distritos
+# -------------------------------------------------------------
+
+@districts_router.get("/districts/{district_name}/projects", response_model=List[schemas.ProjectResponse])
+async def get_district_projects(district_name: str, request: Request, response: Response,
+                                db: AsyncSession = Depends(get_async_db)):
+    """Obtiene todos los proyectos de uno o más distritos (304 si no cambiaron)."""
+    district_list = general_map.get_district_list_from_param(district_name)
+    in_districts = models.Project.districts.any(await districts.district_filter_async(db, district_list))
+
+    watermark = (await db.execute(general_map.watermark_query(in_districts))).one()
+    not_modified = general_map.check_district_projects(request, response, district_list, watermark)
+    if not_modified:
+        return not_modified
+
+    rows = (await db.execute(general_map.district_projects_query(in_districts))).all()
+    response_cache.tag(
+        request,
+        *await response_cache.district_tags_async(db, district_list),
+        *(response_cache.project_tag(row.id) for row in rows)
+    )
+    items = await serialization.project_dicts_async(db, rows)
+    return serialization.json_response(items, response)
+
+@districts_router.get("/districts/{district_name}/stats", response_model=Dict[str, Any])
+async def get_district_stats(district_name: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Obtiene estadísticas de proyectos por distrito(s)."""
+    district_list = general_map.get_district_list_from_param(district_name)
+    keys = set((await district_summary.summary_keys_async(db, district_list)).values())
+
+    if len(keys) == 1:
+        summary = district_summary.summarize(await district_summary.summary_rows_async(db, district_list))
+    else:
+        clause = await districts.district_filter_async(db, district_list)
+        summary = general_map.fold_totals(await db.execute(general_map.totals_query(clause)))
+    stats = general_map.stats_payload(summary["counts"], summary)
+
+    response_cache.tag(request, *await response_cache.district_tags_async(db, district_list))
+    return {"district": ', '.join(district_list), **stats}
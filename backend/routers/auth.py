@@ -1,30 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Header
 from typing import Optional, List
 import jwt
-import os
 from backend.models import UserRole
+from backend.token_verifier import get_verifier
 
 router = APIRouter()
 
-# For local development if env not set
-CLIENT_KEY = os.getenv("NEXT_PUBLIC_STACK_PUBLISHABLE_CLIENT_KEY", "your-fallback-public-key")
-
 def verify_token(authorization: Optional[str] = Header(None)):
-    """Verifies the JWT token and returns the payload."""
+    """Verifies the JWT token and returns the payload (memoizado hasta su exp)."""
     if not authorization:
         raise HTTPException(status_code=401, detail="No token provided")
-    
+
+    token = authorization.removeprefix("Bearer ").strip()
     try:
-        token = authorization.replace("Bearer ", "")
-        # In production, verify with Neon Auth public key/JWKS
-        # For now, we decode to extract metadata. RS256 requires the public key.
-        payload = jwt.decode(
-            token, 
-            CLIENT_KEY,
-            algorithms=["RS256"],
-            options={"verify_signature": False} # Set to True once public key is confirmed
-        )
-        return payload
+        return get_verifier().verify(token)
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
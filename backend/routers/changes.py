@@ -0,0 +1,106 @@
+# backend/routers/changes.py
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from backend.database import get_db, new_session
+from backend import change_log, serialization
+from typing import AsyncIterator, Optional
+import asyncio
+import os
+import time
+
+router = APIRouter(tags=["Changes"])
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Sin avisos en proceso (otro worker escribió), el flujo consulta el registro cada tanto;
+# el mismo intervalo sirve de latido para proxies que cortan conexiones ociosas
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "15"))
+# Vida máxima de un flujo: el navegador se reconecta solo con Last-Event-ID
+CHANGES_STREAM_MAX_SECONDS = float(os.getenv("CHANGES_STREAM_MAX_SECONDS", "300"))
+# Espera que sugiere el servidor antes de reconectar (ms)
+CHANGES_RETRY_MS = 3000
+
+# -------------------------------------------------------------
+# Delta desde un cursor
+# -------------------------------------------------------------
+
+@router.get("/changes")
+def get_changes(
+    since: Optional[int] = Query(None, ge=0, description="Cursor de la respuesta anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Proyectos, dibujos y anotaciones que cambiaron después de ``since``, y lápidas de los borrados.
+
+    Sin ``since`` solo devuelve el cursor actual (para empezar a sincronizar
+    después de la carga inicial). Con ``has_more`` hay que volver a pedir con el
+    nuevo ``cursor``; con ``reset`` (p. ej. ``since`` anterior a lo podado del
+    registro) el cliente debe recargar todo.
+    """
+    if since is None:
+        since = change_log.latest_cursor(db)
+    return serialization.json_response(change_log.read_changes(db, since, limit))
+
+# -------------------------------------------------------------
+# Flujo SSE
+# -------------------------------------------------------------
+
+def current_cursor() -> int:
+    with new_session() as db:
+        return change_log.latest_cursor(db)
+
+def read_delta(since: int) -> dict:
+    with new_session() as db:
+        return change_log.read_changes(db, since, DEFAULT_PAGE_SIZE)
+
+def format_event(delta: dict) -> bytes:
+    name = "reset" if delta["reset"] else "changes"
+    return (f"id: {delta['cursor']}\nevent: {name}\ndata: ".encode()
+            + serialization.dumps(delta) + b"\n\n")
+
+async def event_stream(request: Request, since: Optional[int]) -> AsyncIterator[bytes]:
+    # Suscribirse antes de la primera lectura: un commit entre ambas no se pierde
+    wakeup = change_log.broker.subscribe()
+    deadline = time.monotonic() + CHANGES_STREAM_MAX_SECONDS
+    try:
+        cursor = since if since is not None else await run_in_threadpool(current_cursor)
+        # ``id`` inicial: una reconexión sigue desde aquí aunque no haya llegado ningún cambio
+        yield f"retry: {CHANGES_RETRY_MS}\nid: {cursor}\n\n".encode()
+        while time.monotonic() < deadline:
+            wakeup.clear()
+            delta = await run_in_threadpool(read_delta, cursor)
+            if not change_log.is_empty(delta):
+                yield format_event(delta)
+            cursor = delta["cursor"]
+            if delta["has_more"]:
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), CHANGES_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+    finally:
+        change_log.broker.unsubscribe(wakeup)
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Cursor desde el que empezar")
+):
+    """Server-Sent Events con los mismos deltas que ``/changes``, al confirmarse cada escritura.
+
+    Cada evento ``changes`` lleva el cursor como ``id``: al reconectar, el
+    navegador lo envía en ``Last-Event-ID`` y el flujo sigue desde ahí.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        event_stream(request, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
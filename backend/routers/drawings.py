@@ -1,60 +1,190 @@
 # backend/routers/drawings.py
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-import json
 from backend.database import get_db
-from backend import models, schemas
+from backend import models, schemas, district_summary, districts, response_cache, conditional, change_log
+from backend.district_resolver import get_resolver
+from backend.drawing_events import added_rows, drawings_committed
+from backend.geojson_cache import districts_geojson
+from backend.geometry import values_bbox
 from backend.routers.auth import editor_permission
+from collections import defaultdict
 from typing import List
 
 router = APIRouter(tags=["Drawings"])
 
+def build_drawing(project_id: int, data: schemas.DrawingCreate) -> models.Drawing:
+    """Crea el modelo con su GeoJSON y el bbox ya calculado."""
+    return models.Drawing(**models.Drawing.row_values(project_id, data.geojson, data.drawing_type))
+
+def assign_districts(db: Session, project: models.Project, geojsons: List[dict]) -> List[str]:
+    """Agrega al proyecto los distritos que tocan los dibujos y que aún no tiene."""
+    if not districts_geojson.path.exists():
+        return []
+    resolved = set()
+    for names in get_resolver(districts_geojson).resolve_many(geojsons):
+        resolved.update(names)
+
+    existing = {d.distrito_name.upper() for d in project.districts}
+    added = sorted(name for name in resolved if name.upper() not in existing)
+    for row in districts.project_district_rows(db, project.id, added):
+        db.add(models.ProjectDistrict(**row))
+    return added
+
+def invalidate_cached_project(db: Session, project: models.Project, lists: bool = False):
+    """Respuestas cacheadas del proyecto y de sus distritos (los conteos incluyen dibujos)."""
+    response_cache.invalidate_project(db, project.id, [d.distrito_name for d in project.districts], lists)
+
 @router.get("/{project_id}/drawings", response_model=List[schemas.DrawingResponse])
-def get_drawings(project_id: int, db: Session = Depends(get_db)):
-    """Obtiene todos los dibujos de un proyecto."""
+def get_drawings(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Obtiene todos los dibujos de un proyecto (304 si no cambiaron)."""
+    updated_at = db.query(models.Project.updated_at).filter(models.Project.id == project_id).scalar()
+    if updated_at is not None:
+        not_modified = conditional.check(
+            request, response, conditional.resource_etag("drawings", project_id, updated_at), updated_at
+        )
+        if not_modified:
+            return not_modified
+
     return db.query(models.Drawing).filter(
         models.Drawing.project_id == project_id
     ).all()
 
-@router.post("/{project_id}/drawings", dependencies=[Depends(editor_permission)])
-def add_drawing(project_id: int, drawing: schemas.DrawingCreate, db: Session = Depends(get_db)):
+@router.post("/{project_id}/drawings", response_model=schemas.DrawingResponse, dependencies=[Depends(editor_permission)])
+def add_drawing(
+    project_id: int,
+    drawing: schemas.DrawingCreate,
+    auto_assign_districts: bool = Query(False, description="Asigna al proyecto los distritos que toca el dibujo"),
+    db: Session = Depends(get_db)
+):
     """Agrega un nuevo dibujo a un proyecto."""
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(404, "Project not found")
 
-    new_drawing = models.Drawing(
-        project_id=project_id,
-        geojson=json.dumps(drawing.geojson),
-        drawing_type=drawing.drawing_type
-    )
+    new_drawing = build_drawing(project_id, drawing)
     db.add(new_drawing)
+    project.touch()
+    if auto_assign_districts:
+        assign_districts(db, project, [drawing.geojson])
+    district_summary.refresh_project(db, project_id)
+    db.flush()
+    change_log.record(db, change_log.DRAWING, [(new_drawing.id, project_id)])
+    change_log.record_project(db, project_id)
     db.commit()
     db.refresh(new_drawing)
+    drawings_committed(added=added_rows([new_drawing]))
+    invalidate_cached_project(db, project, lists=auto_assign_districts)
     return new_drawing
 
 @router.post("/{project_id}/drawings/batch", dependencies=[Depends(editor_permission)])
-def save_drawings_batch(project_id: int, batch: schemas.DrawingBatch, db: Session = Depends(get_db)):
-    """Reemplaza todos los dibujos de un proyecto con un nuevo set (Batch)."""
+def save_drawings_batch(
+    project_id: int,
+    batch: schemas.DrawingBatch,
+    auto_assign_districts: bool = Query(False, description="Asigna al proyecto los distritos que tocan los dibujos"),
+    db: Session = Depends(get_db)
+):
+    """Reemplaza los dibujos de un proyecto con un nuevo set (Batch).
+
+    Compara contra lo guardado por ``id`` (si viene) o por hash de contenido:
+    solo se borra, inserta o actualiza lo que cambió, y los dibujos intactos
+    conservan su id. Devuelve los ids en el mismo orden del lote.
+    """
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(404, "Project not found")
 
     try:
-        # 1. Limpiar dibujos anteriores del proyecto
-        db.query(models.Drawing).filter(models.Drawing.project_id == project_id).delete()
-
-        # 2. Insertar los nuevos
-        for drawing_data in batch.drawings:
-            new_drawing = models.Drawing(
-                project_id=project_id,
-                geojson=json.dumps(drawing_data.geojson),
-                drawing_type=drawing_data.drawing_type
-            )
-            db.add(new_drawing)
+        # 1. Estado guardado (sin cargar el GeoJSON)
+        stored = {
+            row.id: row for row in db.query(
+                models.Drawing.id, models.Drawing.content_hash,
+                models.Drawing.min_lon, models.Drawing.min_lat,
+                models.Drawing.max_lon, models.Drawing.max_lat,
+            ).filter(models.Drawing.project_id == project_id)
+        }
+        incoming = [models.Drawing.row_values(project_id, d.geojson, d.drawing_type) for d in batch.drawings]
+        ids = [None] * len(incoming)
+        matched = set()
+        updates = []
+
+        # 2. Emparejar: primero por id explícito, luego por contenido idéntico
+        for i, (data, values) in enumerate(zip(batch.drawings, incoming)):
+            if data.id in stored and data.id not in matched:
+                matched.add(data.id)
+                ids[i] = data.id
+                if stored[data.id].content_hash != values["content_hash"]:
+                    updates.append(i)
+
+        by_hash = defaultdict(list)
+        for row in stored.values():
+            if row.id not in matched:
+                by_hash[row.content_hash].append(row.id)
+        inserts = []
+        for i, values in enumerate(incoming):
+            if ids[i] is not None:
+                continue
+            candidates = by_hash.get(values["content_hash"])
+            if candidates:
+                ids[i] = candidates.pop()
+                matched.add(ids[i])
+            else:
+                inserts.append(i)
+
+        deleted = [drawing_id for drawing_id in stored if drawing_id not in matched]
+
+        def old_bbox(drawing_id):
+            row = stored[drawing_id]
+            return None if row.min_lon is None else (row.min_lon, row.min_lat, row.max_lon, row.max_lat)
+
+        # 3. Escribir solo la diferencia
+        if deleted:
+            db.query(models.Drawing).filter(models.Drawing.id.in_(deleted)).delete(synchronize_session=False)
+        if updates:
+            db.execute(update(models.Drawing), [{"id": ids[i], **incoming[i]} for i in updates])
+        if inserts:
+            # INSERT multi-fila (executemany con RETURNING). El orden de RETURNING
+            # no está garantizado en todos los motores: se asignan los ids por
+            # hash (dos dibujos con el mismo hash son idénticos).
+            new_ids = defaultdict(list)
+            for drawing_id, content_hash in db.execute(
+                insert(models.Drawing).returning(models.Drawing.id, models.Drawing.content_hash),
+                [incoming[i] for i in inserts]
+            ):
+                new_ids[content_hash].append(drawing_id)
+            for i in inserts:
+                ids[i] = new_ids[incoming[i]["content_hash"]].pop()
+
+        changed = updates + inserts
+        assigned = []
+        if auto_assign_districts and changed:
+            assigned = assign_districts(db, project, [incoming[i]["geojson"] for i in changed])
+        if changed or deleted:
+            # touch() cambia updated_at, que el resumen usa como last_updated
+            project.touch()
+            district_summary.refresh_project(db, project_id)
+            change_log.record(db, change_log.DRAWING, [(ids[i], project_id) for i in changed])
+            change_log.record(db, change_log.DRAWING, [(d, project_id) for d in deleted], deleted=True)
+            change_log.record_project(db, project_id)
 
         db.commit()
-        return {"message": f"Successfully saved {len(batch.drawings)} drawings"}
+
+        removed = [(drawing_id, old_bbox(drawing_id)) for drawing_id in deleted]
+        removed += [(ids[i], old_bbox(ids[i])) for i in updates]
+        added = [(ids[i], project_id, values_bbox(incoming[i])) for i in changed]
+        drawings_committed(added=added, removed=removed)
+        if changed or deleted:
+            invalidate_cached_project(db, project, lists=bool(assigned))
+        return {
+            "message": f"Successfully saved {len(batch.drawings)} drawings",
+            "ids": ids,
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": len(deleted),
+            "unchanged": len(incoming) - len(changed),
+            "assigned_districts": assigned
+        }
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error saving batch: {str(e)}")
@@ -70,6 +200,14 @@ def delete_drawing(project_id: int, drawing_id: int, db: Session = Depends(get_d
     if not drawing:
         raise HTTPException(404, "Drawing not found")
 
+    removed = [(drawing.id, drawing.bbox)]
+    project = drawing.project
     db.delete(drawing)
+    project.touch()
+    district_summary.refresh_project(db, project_id)
+    change_log.record(db, change_log.DRAWING, [(drawing_id, project_id)], deleted=True)
+    change_log.record_project(db, project_id)
     db.commit()
+    drawings_committed(removed=removed)
+    invalidate_cached_project(db, project)
     return {"message": "Drawing deleted"}
\ No newline at end of file
@@ -0,0 +1,144 @@
+# backend/routers/export.py
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from backend.database import new_session
+from backend import models
+from backend.geometry import iter_geometries
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List
+import csv
+import io
+import json
+
+router = APIRouter(tags=["Export"])
+
+# Proyectos leídos por tanda desde el cursor del servidor
+EXPORT_BATCH_SIZE = 500
+
+PROJECT_COLUMNS = [
+    "id", "name", "description", "status", "verified", "verified_by", "created_by",
+    "source_url", "scraped_at", "created_at", "updated_at",
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "geojson": "application/geo+json",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# -------------------------------------------------------------
+# Lectura por tandas
+# -------------------------------------------------------------
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def iter_projects() -> Iterator[dict]:
+    """
+    Recorre todos los proyectos con ``yield_per``: por cada tanda se cargan sus
+    distritos y dibujos con dos consultas, así la memoria no depende del total.
+    La sesión es propia porque la respuesta se envía después de cerrar ``get_db``.
+    """
+    columns = [getattr(models.Project, c) for c in PROJECT_COLUMNS]
+    with new_session() as db:
+        result = db.execute(
+            select(*columns).order_by(models.Project.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for batch in result.partitions():
+            ids = [row.id for row in batch]
+
+            districts: Dict[int, List[str]] = defaultdict(list)
+            for project_id, name in db.execute(
+                select(models.ProjectDistrict.project_id, models.ProjectDistrict.distrito_name)
+                .where(models.ProjectDistrict.project_id.in_(ids))
+                .order_by(models.ProjectDistrict.id)
+            ):
+                districts[project_id].append(name)
+
+            drawings: Dict[int, List[dict]] = defaultdict(list)
+            for drawing in db.execute(
+                select(models.Drawing.project_id, models.Drawing.id, models.Drawing.drawing_type, models.Drawing.geojson)
+                .where(models.Drawing.project_id.in_(ids))
+                .order_by(models.Drawing.id)
+            ):
+                drawings[drawing.project_id].append(
+                    {"id": drawing.id, "drawing_type": drawing.drawing_type, "geojson": drawing.geojson}
+                )
+
+            for row in batch:
+                record = {c: _plain(getattr(row, c)) for c in PROJECT_COLUMNS}
+                record["districts"] = districts.get(row.id, [])
+                record["drawings"] = drawings.get(row.id, [])
+                yield record
+
+def project_geometry(record: dict):
+    """Todas las geometrías de los dibujos del proyecto en una GeometryCollection."""
+    geometries = [g for d in record["drawings"] for g in iter_geometries(d["geojson"])]
+    if not geometries:
+        return None
+    return {"type": "GeometryCollection", "geometries": geometries}
+
+# -------------------------------------------------------------
+# Formatos
+# -------------------------------------------------------------
+def ndjson_lines() -> Iterator[str]:
+    for record in iter_projects():
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+def geojson_chunks() -> Iterator[str]:
+    yield '{"type":"FeatureCollection","features":[\n'
+    separator = ""
+    for record in iter_projects():
+        feature = {
+            "type": "Feature",
+            "id": record["id"],
+            "geometry": project_geometry(record),
+            "properties": {
+                **{c: record[c] for c in PROJECT_COLUMNS},
+                "districts": record["districts"],
+                "drawing_ids": [d["id"] for d in record["drawings"]],
+            },
+        }
+        yield separator + json.dumps(feature, ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]}\n"
+
+def csv_lines() -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(PROJECT_COLUMNS + ["districts", "drawing_count", "geometry"])
+    yield flush()
+    for record in iter_projects():
+        geometry = project_geometry(record)
+        writer.writerow(
+            [record[c] for c in PROJECT_COLUMNS]
+            + [";".join(record["districts"]), len(record["drawings"]),
+               json.dumps(geometry, ensure_ascii=False) if geometry else ""]
+        )
+        yield flush()
+
+STREAMS = {"ndjson": ndjson_lines, "geojson": geojson_chunks, "csv": csv_lines}
+
+# -------------------------------------------------------------
+# Exportación
+# -------------------------------------------------------------
+
+@router.get("/export")
+def export_projects(
+    format: str = Query("ndjson", pattern="^(ndjson|geojson|csv)$", description="ndjson, geojson o csv")
+):
+    """Exporta todos los proyectos con sus distritos y geometría, en streaming."""
+    extension = "json" if format == "geojson" else format
+    return StreamingResponse(
+        STREAMS[format](),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="lima_projects.{extension}"'}
+    )
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend import models, schemas
-from typing import List, Dict, Any
+from backend import models, schemas, district_summary, districts, response_cache, conditional, serialization
+from backend.geojson_cache import districts_geojson
+from typing import List, Dict, Any, Optional
 from urllib.parse import unquote
 
+# Estados que el frontend siempre muestra (aunque estén en cero)
+KNOWN_STATUSES = ("active", "inactive", "completed", "archived")
+
 router = APIRouter(tags=["General Map & Districts"])
 
 # -------------------------------------------------------------
@@ -15,48 +20,136 @@ def get_district_list_from_param(district_param: str) -> List[str]:
     decoded_param = unquote(district_param)
     return [d.strip() for d in decoded_param.split(',')]
 
+def totals_query(district_clause):
+    """Estado, proyectos, dibujos y última actualización de los proyectos que cumplen la condición."""
+    drawing_counts = select(
+        models.Drawing.project_id.label("project_id"),
+        func.count(models.Drawing.id).label("drawings"),
+    ).group_by(models.Drawing.project_id).subquery()
+    # EXISTS: un proyecto en varios de los distritos se cuenta una vez
+    return select(
+        models.Project.status,
+        func.count(models.Project.id),
+        func.coalesce(func.sum(drawing_counts.c.drawings), 0),
+        func.max(models.Project.updated_at),
+    ).outerjoin(drawing_counts, drawing_counts.c.project_id == models.Project.id).where(
+        models.Project.districts.any(district_clause)
+    ).group_by(models.Project.status)
+
+def fold_totals(result) -> Dict[str, Any]:
+    """Filas de ``totals_query`` como ``district_summary.summarize``."""
+    counts: Dict[str, int] = {}
+    drawings = 0
+    last_updated = None
+    for status, count, drawing_count, updated_at in result:
+        counts[status] = count
+        drawings += drawing_count
+        if updated_at and (last_updated is None or updated_at > last_updated):
+            last_updated = updated_at
+    return {"counts": counts, "drawings": drawings, "last_updated": last_updated}
+
+def summarize_projects(db: Session, district_list: List[str]) -> Dict[str, Any]:
+    """
+    Conteos por estado, dibujos y última actualización de los proyectos distintos
+    de esos distritos (misma forma que ``district_summary.summarize``).
+    """
+    return fold_totals(db.execute(totals_query(districts.district_filter(db, district_list))))
+
+def stats_payload(counts: Dict[str, int], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Total, estados conocidos como claves propias, todos los estados vistos, dibujos y última actualización."""
+    payload: Dict[str, Any] = {"total": sum(counts.values())}
+    payload.update({status: counts.get(status, 0) for status in KNOWN_STATUSES})
+    payload["statuses"] = dict(sorted(counts.items(), key=lambda item: str(item[0])))
+    payload["drawings"] = summary["drawings"]
+    payload["last_updated"] = summary["last_updated"]
+    return payload
+
+def watermark_query(in_districts):
+    """Marca de agua: cualquier alta, baja o cambio de un proyecto del conjunto la mueve."""
+    return select(
+        func.count(models.Project.id).label("count"),
+        func.max(models.Project.updated_at).label("last_modified"),
+        func.max(models.Project.id).label("max_id"),
+    ).where(in_districts)
+
+def check_district_projects(request: Request, response: Response, district_list: List[str],
+                            watermark) -> Optional[Response]:
+    """304 si el conjunto de proyectos de esos distritos no cambió."""
+    etag = conditional.collection_etag(
+        "district-projects",
+        [*sorted(districts.normalize_name(d) for d in district_list), *watermark]
+    )
+    return conditional.check(request, response, etag, watermark.last_modified)
+
+def district_projects_query(in_districts):
+    return select(*serialization.project_columns()).where(in_districts).order_by(models.Project.created_at.desc())
+
 # -------------------------------------------------------------
 # Rutas de distritos
 # -------------------------------------------------------------
 
+@router.get("/districts", response_model=List[schemas.DistrictInfo])
+def list_districts(db: Session = Depends(get_db)):
+    """Distritos canónicos (sembrados desde el GeoJSON)."""
+    return db.query(models.District).order_by(models.District.name).all()
+
 @router.get("/districts/{district_name}/projects", response_model=List[schemas.ProjectResponse])
-def get_district_projects(district_name: str, db: Session = Depends(get_db)):
-    """Obtiene todos los proyectos de uno o más distritos."""
+def get_district_projects(district_name: str, request: Request, response: Response,
+                          db: Session = Depends(get_db)):
+    """Obtiene todos los proyectos de uno o más distritos (304 si no cambiaron)."""
     district_list = get_district_list_from_param(district_name)
-    
-    from sqlalchemy import func
-    projects = db.query(models.Project).options(
-        joinedload(models.Project.districts),
-        joinedload(models.Project.drawings)
-    ).join(models.ProjectDistrict).filter(
-        func.lower(models.ProjectDistrict.distrito_name).in_([d.lower() for d in district_list])
-    ).distinct().order_by(models.Project.created_at.desc()).all()
-    
-    return projects
+    # EXISTS en lugar de JOIN + DISTINCT para no duplicar proyectos.
+    in_districts = models.Project.districts.any(districts.district_filter(db, district_list))
+
+    watermark = db.execute(watermark_query(in_districts)).one()
+    not_modified = check_district_projects(request, response, district_list, watermark)
+    if not_modified:
+        return not_modified
+
+    # Filas proyectadas: una consulta por colección, sin producto districts × drawings
+    rows = db.execute(district_projects_query(in_districts)).all()
+
+    response_cache.tag(
+        request,
+        *response_cache.district_tags(db, district_list),
+        *(response_cache.project_tag(row.id) for row in rows)
+    )
+    return serialization.json_response(serialization.project_dicts(db, rows), response)
+
+@router.get("/districts/stats", response_model=Dict[str, Any])
+def get_all_district_stats(db: Session = Depends(get_db)):
+    """Conteos por distrito y estado para todos los distritos (tabla de resumen)."""
+    rows_by_district: Dict[str, list] = {}
+    if districts_geojson.path.exists():
+        names = [feature["properties"]["distrito"] for feature in districts_geojson.data["features"]]
+        for _, label in district_summary.summary_keys(db, names).values():
+            rows_by_district[label] = []
+
+    seen = set()
+    for row in district_summary.summary_rows(db):
+        rows_by_district.setdefault(row.district, []).append(row)
+        seen.add(row.status)
+
+    districts = {}
+    for name, rows in sorted(rows_by_district.items()):
+        summary = district_summary.summarize(rows)
+        districts[name] = stats_payload(summary["counts"], summary)
+
+    return {"statuses": sorted(seen, key=str), "districts": districts}
 
 @router.get("/districts/{district_name}/stats", response_model=Dict[str, Any])
-def get_district_stats(district_name: str, db: Session = Depends(get_db)):
+def get_district_stats(district_name: str, request: Request, db: Session = Depends(get_db)):
     """Obtiene estadísticas de proyectos por distrito(s)."""
     district_list = get_district_list_from_param(district_name)
-    
-    from sqlalchemy import func
-    projects = db.query(models.Project).join(models.ProjectDistrict).filter(
-        func.lower(models.ProjectDistrict.distrito_name).in_([d.lower() for d in district_list])
-    ).distinct().all()
-    
-    total = len(projects)
-    active = sum(1 for p in projects if p.status == 'active')
-    inactive = sum(1 for p in projects if p.status == 'inactive')
-    completed = sum(1 for p in projects if p.status == 'completed')
-    archived = sum(1 for p in projects if p.status == 'archived')
-    
-    display_name = ', '.join(district_list)
-    
-    return {
-        "district": display_name,
-        "total": total,
-        "active": active,
-        "inactive": inactive,
-        "completed": completed,
-        "archived": archived
-    }
+    keys = set(district_summary.summary_keys(db, district_list).values())
+
+    if len(keys) == 1:
+        # Un distrito (con cualquiera de sus nombres): lectura directa del resumen materializado
+        summary = district_summary.summarize(district_summary.summary_rows(db, district_list))
+    else:
+        # Varios: un proyecto puede estar en más de uno, se cuenta una vez en la BD
+        summary = summarize_projects(db, district_list)
+    stats = stats_payload(summary["counts"], summary)
+
+    response_cache.tag(request, *response_cache.district_tags(db, district_list))
+    return {"district": ', '.join(district_list), **stats}
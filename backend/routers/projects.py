@@ -1,27 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
 from backend.database import get_db
-from backend import models, schemas
+from backend import models, schemas, tiles, district_summary, bulk_import, districts, search, response_cache, conditional, serialization, change_log
+from backend.drawing_events import drawings_committed, projects_committed, removed_rows
 from backend.routers.auth import editor_permission
+from backend.routers.spatial import parse_coordinates
+from backend.clusters import cluster_index
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Projects"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Campos simples de ProjectResponse seleccionables con ``fields=``
+PROJECT_FIELDS = {
+    "id", "name", "description", "status", "verified", "verified_by", "created_by",
+    "source_url", "scraped_at", "created_at", "updated_at",
+}
+PROJECT_RELATIONS = {"districts", "drawings"}
+
+# -------------------------------------------------------------
+# Helper functions (paginación y selección de campos)
+# -------------------------------------------------------------
+def split_param(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+def parse_fields(fields: Optional[str]) -> Set[str]:
+    if not fields:
+        return set(PROJECT_FIELDS)
+    selected = set(split_param(fields))
+    unknown = selected - PROJECT_FIELDS - PROJECT_RELATIONS
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    return (selected - PROJECT_RELATIONS) | {"id"}
+
+def parse_include(include: str) -> Set[str]:
+    relations = set(split_param(include))
+    unknown = relations - PROJECT_RELATIONS
+    if unknown:
+        raise HTTPException(400, f"Unknown include: {', '.join(sorted(unknown))}")
+    return relations
+
+def encode_cursor(project) -> str:
+    """Cursor opaco con la clave de orden (created_at, id) del último proyecto."""
+    raw = json.dumps([project.created_at.isoformat(), project.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, project_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(project_id)
+    except (ValueError, TypeError):
+        raise HTTPException(400, "Invalid cursor")
+
+def list_selection(fields: Optional[str], include: str) -> Tuple[Set[str], Set[str]]:
+    """Campos simples y relaciones pedidos con ``fields`` e ``include``."""
+    relations = parse_include(include) | (set(split_param(fields or "")) & PROJECT_RELATIONS)
+    return parse_fields(fields), relations
+
+def list_query(selected_fields: Set[str], limit: int, cursor: Optional[str], status: Optional[str],
+               verified: Optional[bool], district_clause=None):
+    """Columnas pedidas (sin hidratar objetos ORM) de la página, con una fila extra."""
+    query = select(*serialization.project_columns(selected_fields))
+    if status:
+        query = query.where(models.Project.status.in_(split_param(status)))
+    if verified is not None:
+        query = query.where(models.Project.verified == verified)
+    if district_clause is not None:
+        query = query.where(models.Project.districts.any(district_clause))
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(or_(
+            models.Project.created_at < created_at,
+            and_(models.Project.created_at == created_at, models.Project.id < last_id)
+        ))
+    return query.order_by(models.Project.created_at.desc(), models.Project.id.desc()).limit(limit + 1)
+
+def paginate(request: Request, response: Response, rows: List, limit: int) -> List:
+    """Recorta la fila extra, agrega los encabezados de la página siguiente y las etiquetas de caché."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    response_cache.tag(
+        request, response_cache.LIST_TAG, *(response_cache.project_tag(row.id) for row in rows)
+    )
+    return rows
+
 # -------------------------------------------------------------
 # LIST ALL PROJECTS
 # -------------------------------------------------------------
 
 @router.get("", response_model=List[schemas.ProjectResponse])
-def get_all_projects(db: Session = Depends(get_db)):
-    """Obtiene todos los proyectos."""
-    # Use joinedload to fetch districts in a single query
-    projects = db.query(models.Project).options(
-        joinedload(models.Project.districts),
-        joinedload(models.Project.drawings)
-    ).all()
-    
-    return projects
+def get_all_projects(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    status: Optional[str] = Query(None, description="Uno o más estados separados por coma"),
+    verified: Optional[bool] = Query(None),
+    district: Optional[str] = Query(None, description="Uno o más distritos separados por coma"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, p. ej. id,name,status"),
+    include: str = Query("districts", description="Relaciones: districts, drawings"),
+    db: Session = Depends(get_db)
+):
+    """Lista proyectos por páginas (más recientes primero).
+
+    El cursor de la página siguiente viaja en ``X-Next-Cursor`` (y en ``Link``);
+    los dibujos solo se cargan con ``include=drawings`` (sin él la clave no
+    viene). Con ``fields`` cada proyecto trae solo esas claves (subconjunto de
+    ``ProjectResponse``).
+    """
+    selected_fields, relations = list_selection(fields, include)
+    district_clause = districts.district_filter(db, split_param(district)) if district else None
+
+    # Una fila extra indica si hay página siguiente
+    rows = db.execute(list_query(selected_fields, limit, cursor, status, verified, district_clause)).all()
+    rows = paginate(request, response, rows, limit)
+
+    # Respuesta directa (orjson): ``response_model`` solo documenta la forma en OpenAPI
+    items = serialization.project_dicts(db, rows, fields=selected_fields | relations, relations=relations)
+    return serialization.json_response(items, response)
 
 # -------------------------------------------------------------
 # CREATE PROJECT
@@ -36,33 +148,121 @@ def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)
         status=project.status
     )
     db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
+    db.flush()
 
-    # Add districts
-    for distrito in project.districts:
-        db.add(models.ProjectDistrict(project_id=new_project.id, distrito_name=distrito))
+    # Add districts (enlazados al distrito canónico)
+    for row in districts.project_district_rows(db, new_project.id, project.districts):
+        db.add(models.ProjectDistrict(**row))
 
+    district_summary.refresh_districts(db, project.districts)
+    search.reindex_projects(db, [new_project.id])
+    change_log.record_project(db, new_project.id)
     db.commit()
     db.refresh(new_project)
-    
+    projects_committed(db, [new_project.id])
+
+    response_cache.invalidate_project(db, None, project.districts, lists=True)
     return new_project
 
+# -------------------------------------------------------------
+# BULK IMPORT
+# -------------------------------------------------------------
+
+@router.post("/bulk", dependencies=[Depends(editor_permission)])
+async def bulk_import_projects(
+    request: Request,
+    batch_size: int = Query(bulk_import.DEFAULT_BATCH_SIZE, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """Importa proyectos desde NDJSON o un arreglo JSON (con distritos, dibujos y anotaciones).
+
+    Cada fila se valida por separado; las válidas se insertan por tandas de
+    ``batch_size`` y las que repiten un ``source_url`` existente se omiten.
+    """
+    results = []
+    batch = []
+    seen_urls = set()
+    touched_districts = set()
+    row_number = 0
+
+    async for record, error in bulk_import.iter_json_records(request.stream()):
+        row_number += 1
+        if error is None:
+            project, error = bulk_import.validate(record)
+        if error is not None:
+            results.append({"row": row_number, "status": "error", "error": error})
+            continue
+        batch.append((row_number, project))
+        touched_districts.update(project.districts)
+        if len(batch) >= batch_size:
+            results.extend(await run_in_threadpool(bulk_import.import_batch, db, batch, seen_urls))
+            batch = []
+    if batch:
+        results.extend(await run_in_threadpool(bulk_import.import_batch, db, batch, seen_urls))
+
+    await run_in_threadpool(response_cache.invalidate_project, db, None, touched_districts, True)
+
+    results.sort(key=lambda r: r["row"])
+    counts = {status: sum(1 for r in results if r["status"] == status)
+              for status in ("created", "duplicate", "error")}
+    return {"rows": len(results), **counts, "results": results}
+
+# -------------------------------------------------------------
+# CLUSTERS (antes de /{project_id})
+# -------------------------------------------------------------
+
+@router.get("/clusters", response_model=Dict[str, Any])
+def get_project_clusters(
+    zoom: int = Query(..., ge=0, le=tiles.MAX_ZOOM),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat (viewport)"),
+    db: Session = Depends(get_db)
+):
+    """Proyectos agrupados por celdas de la rejilla del zoom, con conteos por estado.
+
+    Cada proyecto cuenta una vez, en el centro de sus dibujos (o de su primer
+    distrito si no tiene dibujos). Un cluster de un solo proyecto trae su ``project_id``.
+    """
+    query_bbox = None
+    if bbox is not None:
+        query_bbox = parse_coordinates(bbox, 4, "bbox")
+        if query_bbox[0] > query_bbox[2] or query_bbox[1] > query_bbox[3]:
+            raise HTTPException(400, "'bbox' must be min_lon,min_lat,max_lon,max_lat")
+
+    found = cluster_index.clusters(db, zoom, query_bbox)
+    return serialization.json_response({
+        "zoom": zoom,
+        "total": sum(c["count"] for c in found),
+        "clusters": found,
+    })
+
 # -------------------------------------------------------------
 # GET SINGLE PROJECT
 # -------------------------------------------------------------
 
-@router.get("/{project_id}", response_model=schemas.ProjectResponse)
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    """Obtiene un proyecto por ID."""
-    project = db.query(models.Project).options(
-        joinedload(models.Project.districts),
-        joinedload(models.Project.drawings)
-    ).filter(models.Project.id == project_id).first()
-    if not project:
+def project_query(project_id: int):
+    return select(*serialization.project_columns()).where(models.Project.id == project_id)
+
+def check_project(request: Request, response: Response, project_id: int, row) -> Optional[Response]:
+    """404 si no existe; 304 si el cliente ya tiene esta versión."""
+    if not row:
         raise HTTPException(404, "Project not found")
-    
-    return project
+    return conditional.check(
+        request, response,
+        conditional.resource_etag("project", project_id, row.updated_at), row.updated_at
+    )
+
+@router.get("/{project_id}", response_model=schemas.ProjectResponse)
+def get_project(project_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Obtiene un proyecto por ID (304 si el cliente ya tiene esta versión)."""
+    row = db.execute(project_query(project_id)).first()
+    not_modified = check_project(request, response, project_id, row)
+    if not_modified:
+        return not_modified
+
+    # Distritos y dibujos se leen solo si hay cuerpo que enviar (una consulta por
+    # colección, sin producto districts × drawings)
+    response_cache.tag(request, response_cache.project_tag(project_id))
+    return serialization.json_response(serialization.project_dicts(db, [row])[0], response)
 
 # -------------------------------------------------------------
 # UPDATE PROJECT
@@ -75,6 +275,10 @@ def update_project(project_id: int, project: schemas.ProjectCreate, db: Session
     if not db_project:
         raise HTTPException(404, "Project not found")
 
+    # Nombre y estado viajan como atributos en las teselas de sus dibujos
+    retag_tiles = (db_project.name, db_project.status) != (project.name, project.status)
+    previous_districts = [d.distrito_name for d in db_project.districts]
+
     db_project.name = project.name
     db_project.description = project.description
     db_project.status = project.status
@@ -85,12 +289,20 @@ def update_project(project_id: int, project: schemas.ProjectCreate, db: Session
         models.ProjectDistrict.project_id == project_id
     ).delete()
 
-    # Add new districts
-    for distrito in project.districts:
-        db.add(models.ProjectDistrict(project_id=project_id, distrito_name=distrito))
+    # Add new districts (enlazados al distrito canónico)
+    for row in districts.project_district_rows(db, project_id, project.districts):
+        db.add(models.ProjectDistrict(**row))
 
+    district_summary.refresh_districts(db, previous_districts + project.districts)
+    search.reindex_projects(db, [project_id])
+    change_log.record_project(db, project_id)
     db.commit()
     db.refresh(db_project)
+    projects_committed(db, [project_id])
+
+    if retag_tiles:
+        tiles.invalidate_bboxes(d.bbox for d in db_project.drawings)
+    response_cache.invalidate_project(db, project_id, previous_districts + project.districts, lists=True)
     
     return db_project
 
@@ -105,6 +317,16 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     if not project:
         raise HTTPException(404, "Project not found")
 
+    removed_drawings = removed_rows(
+        db.query(models.Drawing).filter(models.Drawing.project_id == project_id)
+    )
+    removed_annotations = [a for (a,) in db.query(models.Annotation.id).filter(models.Annotation.project_id == project_id)]
+    # Por columna: cargar ``project.districts`` haría que el cascade de ``db.delete``
+    # vuelva a borrar filas que el borrado manual ya eliminó
+    previous_districts = [name for (name,) in db.query(models.ProjectDistrict.distrito_name).filter(
+        models.ProjectDistrict.project_id == project_id
+    )]
+
     try:
         # 1. Pruning manual (Garantiza borrado incluso si falla el cascade de SQLAlchemy)
         db.query(models.ProjectDistrict).filter(models.ProjectDistrict.project_id == project_id).delete()
@@ -115,11 +337,20 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
 
         # 2. Borrar proyecto padre
         db.delete(project)
+        district_summary.refresh_districts(db, previous_districts)
+        search.reindex_projects(db, [project_id])
+        # Lápidas también para los hijos: el id del proyecto podría reutilizarse
+        change_log.record_project(db, project_id, deleted=True)
+        change_log.record(db, change_log.DRAWING, [(d, project_id) for d, _ in removed_drawings], deleted=True)
+        change_log.record(db, change_log.ANNOTATION, [(a, project_id) for a in removed_annotations], deleted=True)
         db.commit()
+        drawings_committed(removed=removed_drawings)
+        projects_committed(db, [project_id])
+        response_cache.invalidate_project(db, project_id, previous_districts, lists=True)
         return {"message": f"Project {project_id} deleted successfully"}
     except Exception as e:
         db.rollback()
-        print(f"ERROR deleting project {project_id}: {str(e)}")
+        logger.exception("Error deleting project %s", project_id)
         raise HTTPException(
             status_code=500, 
             detail=f"Database error during deletion: {str(e)}"
@@ -0,0 +1,33 @@
+# backend/routers/search.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend import search
+from typing import Any, Dict, Optional
+
+router = APIRouter(tags=["Search"])
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# -------------------------------------------------------------
+# Búsqueda de texto completo
+# -------------------------------------------------------------
+
+@router.get("/search", response_model=Dict[str, Any])
+def search_text(
+    q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar (todas, por prefijo)"),
+    kind: Optional[str] = Query(None, pattern="^(project|annotation)$", description="project o annotation"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Busca en nombre y descripción de proyectos y en título y contenido de anotaciones.
+
+    Resultados ordenados por relevancia; ``title_html`` y ``snippet_html`` vienen
+    escapados con las coincidencias en ``<mark>``.
+    """
+    # Una fila extra indica si hay página siguiente
+    results = search.search(db, q, limit + 1, offset, kind)
+    next_offset = offset + limit if len(results) > limit else None
+    return {"query": q, "results": results[:limit], "next_offset": next_offset}
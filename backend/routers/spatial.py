@@ -0,0 +1,91 @@
+# backend/routers/spatial.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend import models, schemas
+from backend.district_resolver import get_resolver
+from backend.geojson_cache import districts_geojson
+from backend.geometry import geometry_contains_point, geometry_intersects_bbox
+from backend.spatial_index import drawing_index
+from typing import Any, Dict, List, Optional, Tuple
+
+router = APIRouter(tags=["Spatial"])
+
+# -------------------------------------------------------------
+# Helper function
+# -------------------------------------------------------------
+def parse_coordinates(value: str, count: int, name: str) -> Tuple[float, ...]:
+    """Convierte 'a,b,...' en una tupla de floats, o responde 400."""
+    try:
+        numbers = tuple(float(v) for v in value.split(","))
+    except ValueError:
+        numbers = ()
+    if len(numbers) != count:
+        raise HTTPException(400, f"'{name}' must be {count} comma-separated numbers")
+    return numbers
+
+# -------------------------------------------------------------
+# Búsqueda espacial de dibujos
+# -------------------------------------------------------------
+
+@router.get("/drawings/search", response_model=Dict[str, Any])
+def search_drawings(
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    point: Optional[str] = Query(None, description="lon,lat"),
+    tolerance: float = Query(0.0002, ge=0, le=1, description="Radio (grados) para puntos y líneas al buscar por punto"),
+    db: Session = Depends(get_db)
+):
+    """Proyectos con dibujos dentro de un bbox (viewport) o que tocan un punto (clic)."""
+    if (bbox is None) == (point is None):
+        raise HTTPException(400, "Provide exactly one of 'bbox' or 'point'")
+
+    if bbox is not None:
+        query_bbox = parse_coordinates(bbox, 4, "bbox")
+        if query_bbox[0] > query_bbox[2] or query_bbox[1] > query_bbox[3]:
+            raise HTTPException(400, "'bbox' must be min_lon,min_lat,max_lon,max_lat")
+        matches = lambda geo: geometry_intersects_bbox(geo, query_bbox)
+    else:
+        x, y = parse_coordinates(point, 2, "point")
+        query_bbox = (x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+        matches = lambda geo: geometry_contains_point(geo, x, y, tolerance)
+
+    # 1. Candidatos por bbox desde el índice; 2. test exacto solo sobre ellos
+    candidates = [drawing_id for _, drawing_id, _ in drawing_index.search(db, query_bbox)]
+    drawing_ids: Dict[int, List[int]] = {}
+    if candidates:
+        rows = db.query(models.Drawing.id, models.Drawing.project_id, models.Drawing.geojson).filter(
+            models.Drawing.id.in_(candidates)
+        ).all()
+        for row in rows:
+            if matches(row.geojson):
+                drawing_ids.setdefault(row.project_id, []).append(row.id)
+
+    projects = []
+    if drawing_ids:
+        projects = db.query(models.Project.id, models.Project.name, models.Project.status).filter(
+            models.Project.id.in_(drawing_ids)
+        ).order_by(models.Project.id).all()
+
+    return {
+        "count": len(projects),
+        "projects": [
+            {"id": p.id, "name": p.name, "status": p.status, "drawing_ids": sorted(drawing_ids[p.id])}
+            for p in projects
+        ]
+    }
+
+# -------------------------------------------------------------
+# Distritos que toca una geometría
+# -------------------------------------------------------------
+
+@router.post("/districts/resolve", response_model=Dict[str, Any])
+def resolve_districts(body: schemas.DistrictResolveRequest):
+    """Distritos que intersecta cada geometría (Feature, FeatureCollection o geometría simple)."""
+    if not districts_geojson.path.exists():
+        raise HTTPException(503, "District boundaries not available")
+
+    results = get_resolver(districts_geojson).resolve_many(body.geometries)
+    return {
+        "results": results,
+        "districts": sorted({name for names in results for name in names})
+    }
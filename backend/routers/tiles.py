@@ -0,0 +1,20 @@
+# backend/routers/tiles.py
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend.geojson_cache import conditional_response
+from backend import tiles
+
+router = APIRouter(tags=["Tiles"])
+
+# Los dibujos cambian: el navegador siempre revalida (304 barato gracias al ETag)
+TILE_CACHE_CONTROL = "public, no-cache"
+
+@router.get("/{z}/{x}/{y}.mvt")
+def get_tile(z: int, x: int, y: int, request: Request, db: Session = Depends(get_db)):
+    """Tesela vectorial con las capas `districts` y `drawings`."""
+    if not (0 <= z <= tiles.MAX_ZOOM) or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+        raise HTTPException(404, "Tile out of range")
+
+    payload = tiles.render_tile(db, z, x, y)
+    return conditional_response(request, payload, cache_control=TILE_CACHE_CONTROL)
@@ -11,13 +11,26 @@ class DistrictCreate(BaseModel):
 class DrawingCreate(BaseModel):
     geojson: dict
     drawing_type: str
+    id: Optional[int] = None   # en el guardado por lotes: dibujo existente a actualizar
 
 class DrawingBatch(BaseModel):
     drawings: List[DrawingCreate]
 
+class DistrictResolveRequest(BaseModel):
+    geometries: List[dict] = Field(max_length=50000)
+
+class DistrictInfo(BaseModel):
+    id: int
+    name: str
+    display_name: Optional[str] = None
+    province: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class DrawingResponse(BaseModel):
     id: int
-    geojson: str
+    geojson: dict
     drawing_type: str
     created_at: datetime
     
@@ -47,6 +60,14 @@ class ProjectCreate(BaseModel):
     status: str = "active"
     districts: List[str] = Field(min_length=1)
 
+class ProjectImport(ProjectCreate):
+    """Una fila de POST /api/projects/bulk."""
+    verified: bool = False
+    source_url: Optional[str] = None
+    scraped_at: Optional[datetime] = None
+    drawings: List[DrawingCreate] = []
+    annotations: List[AnnotationCreate] = []
+
 class ProjectResponse(BaseModel):
     id: int
     name: str
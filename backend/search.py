@@ -0,0 +1,198 @@
+# backend/search.py
+"""
+Búsqueda de texto completo sobre proyectos y anotaciones.
+
+``search_documents`` guarda una fila por proyecto (nombre, descripción) y una
+por anotación (título, contenido). El índice invertido depende del motor:
+- SQLite: tabla virtual FTS5 ``search_fts`` con contenido externo, mantenida
+  por triggers sobre ``search_documents`` (sin tildes, búsqueda por prefijo);
+- Postgres: columna generada ``tsv`` con ``to_tsvector('spanish', unaccent(...))``
+  e índice GIN (raíces en español, sin tildes).
+
+Las escrituras llaman a ``reindex_projects`` dentro de su propia transacción.
+"""
+import html
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend import models
+
+# Marcas de resaltado: caracteres de control que no aparecen en el texto. El
+# resultado se escapa como HTML y después las marcas pasan a <mark>.
+HL_START, HL_END = "\x02", "\x03"
+SNIPPET_WORDS = 16
+
+TERM_RE = re.compile(r"\w+")
+MAX_TERMS = 8
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, body,
+        content='search_documents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    # El título pesa más que el cuerpo; así ``ORDER BY rank`` usa el atajo de FTS5
+    "INSERT INTO search_fts(search_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() no es IMMUTABLE; el envoltorio permite usarlo en la columna generada
+    """CREATE OR REPLACE FUNCTION search_unaccent(text) RETURNS text AS
+        $$ SELECT public.unaccent('public.unaccent', $1) $$
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT""",
+    """ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS tsv tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('spanish', search_unaccent(title)), 'A') ||
+            setweight(to_tsvector('spanish', search_unaccent(body)), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING GIN (tsv)",
+]
+
+
+# ---------------------------------------------
+# ÍNDICE
+# ---------------------------------------------
+def setup_index(engine: Engine):
+    """Crea el índice invertido propio del motor. Idempotente."""
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_fts'"
+            )).first()
+            for statement in SQLITE_DDL if not exists else SQLITE_DDL[2:]:
+                conn.execute(text(statement))
+    elif engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for statement in POSTGRES_DDL:
+                conn.execute(text(statement))
+
+
+def reindex_projects(db: Session, project_ids: Iterable[int]):
+    """Vuelve a escribir los documentos de esos proyectos y sus anotaciones (sin commit)."""
+    ids = list(set(project_ids))
+    if not ids:
+        return
+    db.flush()
+    db.execute(delete(models.SearchDocument).where(models.SearchDocument.project_id.in_(ids)))
+    _insert_documents(db, ids)
+
+
+def rebuild(db: Session):
+    """Regenera todos los documentos desde cero."""
+    db.execute(delete(models.SearchDocument))
+    _insert_documents(db, None)
+    db.commit()
+
+
+def _insert_documents(db: Session, ids: Optional[List[int]]):
+    columns = ["kind", "ref_id", "project_id", "title", "body"]
+    P, A = models.Project, models.Annotation
+
+    projects = select(
+        literal("project"), P.id, P.id, P.name, func.coalesce(P.description, "")
+    )
+    annotations = select(
+        literal("annotation"), A.id, A.project_id, A.title, A.content
+    ).where(A.project_id.is_not(None))
+    if ids is not None:
+        projects = projects.where(P.id.in_(ids))
+        annotations = annotations.where(A.project_id.in_(ids))
+
+    db.execute(insert(models.SearchDocument).from_select(columns, projects))
+    db.execute(insert(models.SearchDocument).from_select(columns, annotations))
+
+
+# ---------------------------------------------
+# CONSULTA
+# ---------------------------------------------
+def search_terms(q: str) -> List[str]:
+    """Palabras de la consulta (solo caracteres de palabra, sin operadores)."""
+    return TERM_RE.findall(q.lower())[:MAX_TERMS]
+
+
+def mark_html(value: Optional[str]) -> str:
+    """Escapa el texto como HTML y cambia las marcas de resaltado por <mark>."""
+    return html.escape(value or "").replace(HL_START, "<mark>").replace(HL_END, "</mark>")
+
+
+def search(db: Session, q: str, limit: int, offset: int = 0, kind: Optional[str] = None) -> List[dict]:
+    """Documentos que contienen todas las palabras (por prefijo), del más relevante al menos."""
+    terms = search_terms(q)
+    if not terms:
+        return []
+    params = {"limit": limit, "offset": offset, "kind": kind, "start": HL_START, "end": HL_END}
+
+    if db.get_bind().dialect.name == "postgresql":
+        sql = _POSTGRES_QUERY
+        params.update(
+            tsquery=" & ".join(f"{t}:*" for t in terms),
+            title_opts=f"StartSel={HL_START}, StopSel={HL_END}, HighlightAll=true",
+            body_opts=f"StartSel={HL_START}, StopSel={HL_END}, MaxWords={SNIPPET_WORDS}, "
+                      f"MinWords={SNIPPET_WORDS // 2}, ShortWord=2",
+        )
+    else:
+        sql = _SQLITE_QUERY
+        params.update(match=" ".join(f'"{t}"*' for t in terms), words=SNIPPET_WORDS)
+
+    return [
+        {
+            "kind": row.kind,
+            "id": row.ref_id,
+            "project_id": row.project_id,
+            "project_name": row.project_name,
+            "title_html": mark_html(row.title),
+            "snippet_html": mark_html(row.snippet),
+            "score": round(float(row.score), 6),
+        }
+        for row in db.execute(text(sql), params)
+    ]
+
+
+_SQLITE_QUERY = """
+SELECT d.kind, d.ref_id, d.project_id, p.name AS project_name,
+       highlight(search_fts, 0, :start, :end) AS title,
+       snippet(search_fts, 1, :start, :end, '…', :words) AS snippet,
+       -search_fts.rank AS score
+FROM search_fts
+JOIN search_documents d ON d.id = search_fts.rowid
+JOIN projects p ON p.id = d.project_id
+WHERE search_fts MATCH :match AND (:kind IS NULL OR d.kind = :kind)
+ORDER BY search_fts.rank
+LIMIT :limit OFFSET :offset
+"""
+
+# El resaltado se calcula solo para la página ya recortada
+_POSTGRES_QUERY = """
+WITH q AS (SELECT to_tsquery('spanish', search_unaccent(:tsquery)) AS query),
+page AS (
+    SELECT d.id, ts_rank_cd(d.tsv, q.query) AS score
+    FROM search_documents d, q
+    WHERE d.tsv @@ q.query AND (CAST(:kind AS text) IS NULL OR d.kind = :kind)
+    ORDER BY score DESC, d.id
+    LIMIT :limit OFFSET :offset
+)
+SELECT d.kind, d.ref_id, d.project_id, p.name AS project_name,
+       ts_headline('spanish', d.title, q.query, :title_opts) AS title,
+       ts_headline('spanish', d.body, q.query, :body_opts) AS snippet,
+       page.score
+FROM page
+JOIN search_documents d ON d.id = page.id
+JOIN projects p ON p.id = d.project_id
+CROSS JOIN q
+ORDER BY page.score DESC, d.id
+"""
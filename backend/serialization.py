@@ -0,0 +1,156 @@
+# backend/serialization.py
+"""
+Serialización rápida de las lecturas de proyectos.
+
+Las salidas de la BD ya son confiables: en lugar de hidratar objetos ORM y
+validarlos con ``ProjectResponse`` uno por uno, se seleccionan las columnas
+y se arman los dicts directamente (misma forma JSON que el esquema), y la
+respuesta se codifica con orjson si está instalado.
+"""
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend import models
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+# Mismo orden que schemas.ProjectResponse (el JSON queda idéntico)
+PROJECT_COLUMNS = (
+    "id", "name", "description", "status", "verified", "verified_by", "created_by",
+    "source_url", "scraped_at", "created_at", "updated_at",
+)
+DRAWING_COLUMNS = ("id", "geojson", "drawing_type", "created_at")
+
+
+# ---------------------------------------------
+# CODIFICACIÓN
+# ---------------------------------------------
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto en bytes; las fechas van en ISO 8601 como en Pydantic."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """Respuesta ya serializada, con las cabeceras puestas en el ``Response`` inyectado."""
+    fast = FastJSONResponse(content)
+    if response is not None:
+        for key, value in response.headers.items():
+            if key not in ("content-length", "content-type"):
+                fast.headers[key] = value
+    return fast
+
+
+# ---------------------------------------------
+# PROYECCIÓN DE FILAS
+# ---------------------------------------------
+def project_columns(fields: Optional[Set[str]] = None):
+    """Columnas de ``projects`` a seleccionar (siempre id y la clave del cursor)."""
+    names = [c for c in PROJECT_COLUMNS if fields is None or c in fields or c in ("id", "created_at")]
+    return [getattr(models.Project, c) for c in names]
+
+
+def _district_names_query(ids: Sequence[int]):
+    return (
+        select(models.ProjectDistrict.project_id, models.ProjectDistrict.distrito_name)
+        .where(models.ProjectDistrict.project_id.in_(ids))
+        .order_by(models.ProjectDistrict.id)
+    )
+
+
+def _drawings_query(ids: Sequence[int]):
+    columns = [getattr(models.Drawing, c) for c in DRAWING_COLUMNS]
+    return (
+        select(models.Drawing.project_id, *columns)
+        .where(models.Drawing.project_id.in_(ids))
+        .order_by(models.Drawing.id)
+    )
+
+
+def _group_names(result) -> Dict[int, List[str]]:
+    names: Dict[int, List[str]] = defaultdict(list)
+    for project_id, name in result:
+        names[project_id].append(name)
+    return names
+
+
+def _group_drawings(result) -> Dict[int, List[dict]]:
+    drawings: Dict[int, List[dict]] = defaultdict(list)
+    for row in result:
+        drawings[row.project_id].append({c: getattr(row, c) for c in DRAWING_COLUMNS})
+    return drawings
+
+
+def district_names(db: Session, ids: Sequence[int]) -> Dict[int, List[str]]:
+    return _group_names(db.execute(_district_names_query(ids))) if ids else {}
+
+
+def drawing_dicts(db: Session, ids: Sequence[int]) -> Dict[int, List[dict]]:
+    return _group_drawings(db.execute(_drawings_query(ids))) if ids else {}
+
+
+def _assemble(rows: List, fields: Optional[Set[str]], names: Optional[Dict[int, List[str]]],
+              drawings: Optional[Dict[int, List[dict]]]) -> List[dict]:
+    result = []
+    for row in rows:
+        item = {c: getattr(row, c) for c in PROJECT_COLUMNS if c in row._fields and (fields is None or c in fields)}
+        if names is not None:
+            item["districts"] = names.get(row.id, [])
+        if drawings is not None:
+            item["drawings"] = drawings.get(row.id, [])
+        result.append(item)
+    return result
+
+
+def project_dicts(db: Session, rows: Iterable, fields: Optional[Set[str]] = None,
+                  relations: Iterable[str] = ("districts", "drawings")) -> List[dict]:
+    """
+    Dicts con la forma de ``ProjectResponse`` a partir de filas de ``project_columns``:
+    una consulta por relación pedida para todas las filas juntas.
+    """
+    rows = list(rows)
+    ids = [row.id for row in rows]
+    relations = set(relations)
+    names = district_names(db, ids) if "districts" in relations else None
+    drawings = drawing_dicts(db, ids) if "drawings" in relations else None
+    return _assemble(rows, fields, names, drawings)
+
+
+async def project_dicts_async(db: "AsyncSession", rows: Iterable, fields: Optional[Set[str]] = None,
+                              relations: Iterable[str] = ("districts", "drawings")) -> List[dict]:
+    """``project_dicts`` sobre una sesión asíncrona (mismas consultas)."""
+    rows = list(rows)
+    ids = [row.id for row in rows]
+    relations = set(relations)
+    names = drawings = None
+    if "districts" in relations:
+        names = _group_names(await db.execute(_district_names_query(ids))) if ids else {}
+    if "drawings" in relations:
+        drawings = _group_drawings(await db.execute(_drawings_query(ids))) if ids else {}
+    return _assemble(rows, fields, names, drawings)
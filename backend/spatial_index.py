@@ -0,0 +1,166 @@
+# backend/spatial_index.py
+"""
+Índice espacial en memoria sobre los bbox de los dibujos.
+
+Un R-tree empaquetado con STR (Sort-Tile-Recursive) se construye desde las
+columnas ``min_lon/min_lat/max_lon/max_lat`` de ``drawings``. Las escrituras
+se aplican como un pequeño delta (altas/bajas) que se consulta en lineal hasta
+que crece lo suficiente como para reempaquetar el árbol.
+"""
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.geometry import BBox, bbox_intersects
+
+NODE_CAPACITY = 16
+# Otras instancias (serverless) también escriben: se recarga desde la BD cada tanto.
+INDEX_TTL_SECONDS = float(os.getenv("SPATIAL_INDEX_TTL", "300"))
+
+Entry = Tuple[BBox, int, int]   # (bbox, drawing_id, project_id)
+
+
+def _union(boxes: Iterable[BBox]) -> BBox:
+    boxes = list(boxes)
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes),
+    )
+
+
+class STRTree:
+    """R-tree estático empaquetado con Sort-Tile-Recursive."""
+
+    def __init__(self, entries: List[Entry], capacity: int = NODE_CAPACITY):
+        self.capacity = capacity
+        self.size = len(entries)
+        # Cada nivel es una lista de nodos (bbox, hijos); las hojas guardan entradas.
+        self.root = self._pack([(e[0], e) for e in entries], leaf=True) if entries else None
+
+    def _pack(self, items, leaf: bool):
+        while True:
+            nodes = []
+            n = len(items)
+            leaves = math.ceil(n / self.capacity)
+            slices = math.ceil(math.sqrt(leaves))
+            per_slice = slices * self.capacity
+
+            by_x = sorted(items, key=lambda it: (it[0][0] + it[0][2]))
+            for i in range(0, n, per_slice):
+                column = sorted(by_x[i:i + per_slice], key=lambda it: (it[0][1] + it[0][3]))
+                for j in range(0, len(column), self.capacity):
+                    children = column[j:j + self.capacity]
+                    nodes.append((_union(c[0] for c in children), (leaf, children)))
+
+            if len(nodes) == 1:
+                return nodes[0]
+            items, leaf = nodes, False
+
+    def query(self, bbox: BBox) -> List[Entry]:
+        if self.root is None:
+            return []
+        out = []
+        stack = [self.root]
+        while stack:
+            node_bbox, (leaf, children) = stack.pop()
+            if not bbox_intersects(node_bbox, bbox):
+                continue
+            if leaf:
+                out.extend(entry for entry_bbox, entry in children if bbox_intersects(entry_bbox, bbox))
+            else:
+                stack.extend(children)
+        return out
+
+
+class DrawingIndex:
+    """R-tree STR + delta de escrituras, cargado perezosamente desde la BD."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tree: Optional[STRTree] = None
+        self._added: Dict[int, Entry] = {}
+        self._removed: set = set()
+        self._loaded_at = 0.0
+
+    # ---------------------------------------------
+    # CARGA
+    # ---------------------------------------------
+    def _is_fresh(self) -> bool:
+        return self._tree is not None and time.monotonic() - self._loaded_at < INDEX_TTL_SECONDS
+
+    def ensure_loaded(self, db: Session):
+        if self._is_fresh():
+            return
+        rows = db.query(
+            models.Drawing.id, models.Drawing.project_id,
+            models.Drawing.min_lon, models.Drawing.min_lat,
+            models.Drawing.max_lon, models.Drawing.max_lat,
+        ).filter(models.Drawing.min_lon.isnot(None)).all()
+        entries = [((r.min_lon, r.min_lat, r.max_lon, r.max_lat), r.id, r.project_id) for r in rows]
+        tree = STRTree(entries)
+        with self._lock:
+            self._tree = tree
+            self._added = {}
+            self._removed = set()
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        """Fuerza una recarga completa en la próxima consulta."""
+        with self._lock:
+            self._tree = None
+
+    def _maybe_repack(self):
+        # Reempaquetar cuando el delta pesa ~10% del árbol (o 256 escrituras)
+        delta = len(self._added) + len(self._removed)
+        if self._tree is None or delta < max(256, self._tree.size // 10):
+            return
+        entries = [e for e in self._tree.query((-math.inf, -math.inf, math.inf, math.inf))
+                   if e[1] not in self._removed and e[1] not in self._added]
+        entries.extend(self._added.values())
+        self._tree = STRTree(entries)
+        self._added = {}
+        self._removed = set()
+
+    # ---------------------------------------------
+    # ESCRITURAS
+    # ---------------------------------------------
+    def add(self, drawing_id: int, project_id: int, bbox: Optional[BBox]):
+        with self._lock:
+            if self._tree is None:
+                return  # se cargará completo desde la BD en la próxima consulta
+            self._removed.add(drawing_id)   # oculta una versión anterior del árbol
+            if bbox is not None:
+                self._added[drawing_id] = (bbox, drawing_id, project_id)
+            self._maybe_repack()
+
+    def remove(self, drawing_id: int):
+        with self._lock:
+            if self._tree is None:
+                return
+            self._added.pop(drawing_id, None)
+            self._removed.add(drawing_id)
+            self._maybe_repack()
+
+    # ---------------------------------------------
+    # CONSULTAS
+    # ---------------------------------------------
+    def search(self, db: Session, bbox: BBox) -> List[Entry]:
+        """Candidatos cuyo bbox toca ``bbox`` (sin test geométrico exacto)."""
+        # ``invalidate`` puede vaciar el árbol entre la carga y la consulta: se recarga una vez
+        for _ in range(2):
+            self.ensure_loaded(db)
+            with self._lock:
+                if self._tree is None:
+                    continue
+                found = [e for e in self._tree.query(bbox) if e[1] not in self._removed]
+                found.extend(e for e in self._added.values() if bbox_intersects(e[0], bbox))
+                return found
+        return []
+
+
+drawing_index = DrawingIndex()
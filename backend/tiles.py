@@ -0,0 +1,169 @@
+# backend/tiles.py
+"""
+Teselas vectoriales (MVT) de distritos y dibujos, memoizadas en una caché LRU.
+
+Cada escritura de dibujos invalida solo las teselas que tocan el bbox de los
+dibujos afectados (geometría vieja y nueva). Esa invalidación solo llega a la
+instancia que escribió: las demás descartan sus teselas al vencer el TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend import models, district_lod
+from backend.geojson_cache import EncodedPayload, districts_geojson
+from backend.geometry import BBox, bbox_intersects, geometry_bbox
+from backend.mvt import BUFFER, Layer, TileProjection, encode_tile, tile_bounds
+from backend.spatial_index import INDEX_TTL_SECONDS, drawing_index
+
+MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "2048"))
+# Mismo plazo que el índice espacial: una tesela no vive más que los datos de los que salió
+TILE_CACHE_TTL = float(os.getenv("TILE_CACHE_TTL", str(INDEX_TTL_SECONDS)))
+MAX_ZOOM = 22
+
+TileKey = Tuple[int, int, int]
+
+
+class TileCache:
+    """LRU de teselas ya codificadas (y comprimidas) por (z, x, y), con TTL por entrada."""
+
+    def __init__(self, max_size: int, ttl: float = TILE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._tiles: "OrderedDict[TileKey, Tuple[float, EncodedPayload]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Cambia en cada invalidación: una tesela renderizada antes no se guarda.
+        self.generation = 0
+
+    def get(self, key: TileKey) -> Optional[EncodedPayload]:
+        with self._lock:
+            item = self._tiles.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._tiles[key]
+                return None
+            self._tiles.move_to_end(key)
+            return item[1]
+
+    def put(self, key: TileKey, payload: EncodedPayload, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._tiles[key] = (time.monotonic() + self.ttl, payload)
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_size:
+                self._tiles.popitem(last=False)
+
+    def invalidate_bbox(self, bbox: BBox) -> int:
+        """Descarta las teselas (con su margen) que intersectan el bbox."""
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key in self._tiles
+                if bbox_intersects(bbox, tile_bounds(*key, buffer=BUFFER))
+            ]
+            for key in stale:
+                del self._tiles[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._tiles.clear()
+
+    def __len__(self):
+        return len(self._tiles)
+
+
+tile_cache = TileCache(TILE_CACHE_SIZE)
+
+
+# ---------------------------------------------
+# INVALIDACIÓN (llamada desde los routers de escritura)
+# ---------------------------------------------
+def invalidate_bboxes(bboxes: Iterable[Optional[BBox]]):
+    """Invalida las teselas que tocan cualquiera de estos bbox."""
+    for bbox in bboxes:
+        if bbox is not None:
+            tile_cache.invalidate_bbox(bbox)
+
+
+# ---------------------------------------------
+# RENDER
+# ---------------------------------------------
+def _district_features(level_zoom: Optional[int]) -> List[Tuple[BBox, dict]]:
+    """Features del nivel de detalle con su bbox precalculado (memoizado con el GeoJSON)."""
+    def build(_data):
+        fc = district_lod.lod_geojson(districts_geojson, level_zoom)
+        return [(geometry_bbox(f["geometry"]), f) for f in fc["features"]]
+
+    return districts_geojson.derived(f"tile-features:{level_zoom}", build)
+
+
+def _drawing_rows(db: Session, bounds: BBox):
+    """Dibujos (con estado y nombre de su proyecto) cuyo bbox toca la tesela."""
+    candidates = [drawing_id for _, drawing_id, _ in drawing_index.search(db, bounds)]
+    if not candidates:
+        return []
+
+    rows = db.query(
+        models.Drawing.id,
+        models.Drawing.project_id,
+        models.Drawing.geojson,
+        models.Drawing.drawing_type,
+        models.Project.status,
+        models.Project.name,
+    ).join(models.Project, models.Project.id == models.Drawing.project_id).filter(
+        models.Drawing.id.in_(candidates)
+    ).order_by(models.Drawing.id).all()
+
+    return rows
+
+
+def render_tile(db: Session, z: int, x: int, y: int) -> EncodedPayload:
+    key = (z, x, y)
+    cached = tile_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = tile_cache.generation
+    bounds = tile_bounds(z, x, y, buffer=BUFFER)
+    project = TileProjection(z, x, y)
+
+    districts = Layer("districts")
+    if districts_geojson.path.exists():
+        for bbox, feature in _district_features(district_lod.select_level(zoom=z)):
+            if bbox is None or not bbox_intersects(bbox, bounds):
+                continue
+            props = feature.get("properties") or {}
+            districts.add_feature(
+                feature["geometry"],
+                {"distrito": props.get("distrito"), "distrito2": props.get("distrito2")},
+                project,
+                feature_id=props.get("id"),
+            )
+
+    drawings = Layer("drawings")
+    for row in _drawing_rows(db, bounds):
+        drawings.add_feature(
+            row.geojson,
+            {
+                "drawing_id": row.id,
+                "project_id": row.project_id,
+                "status": row.status,
+                "name": row.name,
+                "drawing_type": row.drawing_type,
+            },
+            project,
+            feature_id=row.id,
+        )
+
+    payload = EncodedPayload(encode_tile([districts, drawings]), media_type=MEDIA_TYPE)
+    tile_cache.put(key, payload, generation)
+    return payload
@@ -0,0 +1,198 @@
+# backend/token_verifier.py
+"""
+Verificación de los JWT de las rutas protegidas.
+
+- Con ``AUTH_JWKS_URL`` (URL https o ruta/``file://`` a un JSON local) se
+  verifican tokens RS256/ES256 contra las claves públicas del JWKS. Las claves
+  se guardan por ``kid``; un ``kid`` desconocido recarga el JWKS (como mucho
+  una vez cada ``AUTH_JWKS_MIN_REFRESH`` segundos) para seguir rotaciones.
+- Sin JWKS se verifica HS256 con ``SECRET_KEY`` (la de ``generate_token.py``).
+  En local, sin ``POSTGRES_URL``, hay una clave de desarrollo por defecto.
+
+Los tokens ya verificados se memoizan en un LRU acotado (clave: sha256 del
+token) hasta su ``exp``: después del primer uso verificar cuesta una búsqueda
+en un dict en lugar de una operación de clave pública.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+# Clave HS256 de desarrollo (la misma que usaba generate_token.py)
+DEV_SECRET_KEY = "secret-dev-key"
+
+JWKS_ALGORITHMS = ["RS256", "ES256"]
+
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+# Tokens sin ``exp`` se recuerdan como mucho este tiempo (segundos)
+TOKEN_CACHE_MAX_TTL = float(os.getenv("AUTH_TOKEN_CACHE_MAX_TTL", "600"))
+
+
+# ---------------------------------------------
+# CLAVES: JWKS CON CACHÉ POR KID
+# ---------------------------------------------
+class JWKSKeySet:
+    """Claves públicas de un JWKS, indexadas por ``kid`` y recargadas ante un ``kid`` nuevo."""
+
+    def __init__(self, source: str, min_refresh_seconds: float = 30.0, timeout: float = 5.0):
+        self.source = source
+        self.min_refresh_seconds = min_refresh_seconds
+        self.timeout = timeout
+        self._keys: Dict[Optional[str], jwt.PyJWK] = {}
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        source = self.source
+        if source.startswith(("http://", "https://")):
+            with urllib.request.urlopen(source, timeout=self.timeout) as response:
+                return json.load(response)
+        path = Path(source.removeprefix("file://"))
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def refresh(self, force: bool = False) -> bool:
+        """Relee el JWKS; sin ``force`` respeta el intervalo mínimo entre lecturas."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_fetch and now - self._last_fetch < self.min_refresh_seconds:
+                return False
+            self._last_fetch = now
+            try:
+                data = self._read()
+            except (OSError, ValueError) as exc:
+                logger.warning("No se pudo leer el JWKS de %s: %s", self.source, exc)
+                return False
+
+            keys = {}
+            for jwk in data.get("keys", []):
+                if jwk.get("use", "sig") != "sig":
+                    continue
+                try:
+                    keys[jwk.get("kid")] = jwt.PyJWK(jwk)
+                except jwt.PyJWKError as exc:
+                    logger.warning("Clave %s del JWKS ignorada: %s", jwk.get("kid"), exc)
+            self._keys = keys
+            return True
+
+    def get(self, kid: Optional[str]) -> jwt.PyJWK:
+        key = self._lookup(kid)
+        if key is None and self.refresh():
+            key = self._lookup(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Clave desconocida: {kid}")
+        return key
+
+    def _lookup(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        keys = self._keys
+        if kid in keys:
+            return keys[kid]
+        # Un token sin kid solo es válido si el JWKS tiene una única clave
+        if kid is None and len(keys) == 1:
+            return next(iter(keys.values()))
+        return None
+
+
+# ---------------------------------------------
+# VERIFICADOR CON LRU DE TOKENS
+# ---------------------------------------------
+class TokenVerifier:
+    def __init__(self, keys: Optional[JWKSKeySet] = None, secret: Optional[str] = None,
+                 audience: Optional[str] = None, issuer: Optional[str] = None,
+                 cache_size: int = TOKEN_CACHE_SIZE):
+        if keys is None and not secret:
+            raise ValueError("Se necesita un JWKS o una clave HS256")
+        self.keys = keys
+        self.secret = secret
+        self.audience = audience
+        self.issuer = issuer
+        self.cache_size = cache_size
+        self._verified: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token: str) -> dict:
+        """Claims del token verificado; lanza ``jwt.InvalidTokenError`` si no es válido.
+
+        Las claims devueltas se comparten entre peticiones: no modificarlas.
+        """
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._verified.get(digest)
+            if entry is not None:
+                if entry[1] > now:
+                    self._verified.move_to_end(digest)
+                    return entry[0]
+                del self._verified[digest]
+
+        claims = self._decode(token)
+        expires = min(claims.get("exp", float("inf")), now + TOKEN_CACHE_MAX_TTL)
+        with self._lock:
+            self._verified[digest] = (claims, expires)
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return claims
+
+    def _decode(self, token: str) -> dict:
+        options = {"verify_aud": self.audience is not None}
+        if self.keys is not None:
+            header = jwt.get_unverified_header(token)
+            key = self.keys.get(header.get("kid"))
+            # El algoritmo lo fija la clave, no el encabezado del token
+            algorithms = [key.algorithm_name] if key.algorithm_name else JWKS_ALGORITHMS
+            return jwt.decode(token, key.key, algorithms=algorithms, audience=self.audience,
+                              issuer=self.issuer, options=options)
+        return jwt.decode(token, self.secret, algorithms=["HS256"], audience=self.audience,
+                          issuer=self.issuer, options=options)
+
+    def clear(self):
+        with self._lock:
+            self._verified.clear()
+
+
+def from_env() -> TokenVerifier:
+    """Verificador según AUTH_JWKS_URL / SECRET_KEY (ver el docstring del módulo)."""
+    audience = os.getenv("AUTH_AUDIENCE") or None
+    issuer = os.getenv("AUTH_ISSUER") or None
+    jwks_url = os.getenv("AUTH_JWKS_URL")
+    if jwks_url:
+        keys = JWKSKeySet(jwks_url, min_refresh_seconds=float(os.getenv("AUTH_JWKS_MIN_REFRESH", "30")))
+        keys.refresh(force=True)
+        return TokenVerifier(keys=keys, audience=audience, issuer=issuer)
+
+    secret = os.getenv("SECRET_KEY")
+    if not secret:
+        if os.getenv("POSTGRES_URL"):
+            raise RuntimeError("Configura AUTH_JWKS_URL o SECRET_KEY para verificar los tokens")
+        logger.warning("Sin AUTH_JWKS_URL ni SECRET_KEY: se usa la clave HS256 de desarrollo")
+        secret = DEV_SECRET_KEY
+    return TokenVerifier(secret=secret, audience=audience, issuer=issuer)
+
+
+_verifier: Optional[TokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_verifier() -> TokenVerifier:
+    """Verificador compartido, creado en el primer uso."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = from_env()
+    return _verifier
+
+
+def set_verifier(verifier: Optional[TokenVerifier]):
+    """Reemplaza el verificador compartido (pruebas, benchmarks)."""
+    global _verifier
+    _verifier = verifier
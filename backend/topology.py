@@ -0,0 +1,252 @@
+# backend/topology.py
+"""
+Topología de arcos compartidos para el FeatureCollection de distritos.
+
+Los anillos de cada polígono se cortan en los vértices donde cambia el conjunto
+de distritos vecinos (uniones), y cada tramo de borde se guarda una sola vez.
+Así un borde compartido se simplifica una única vez y los dos distritos que lo
+usan quedan sin huecos ni solapes a cualquier nivel de detalle.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from backend.geometry import round_line, simplify_closed_line, simplify_line
+
+Point = Tuple[float, float]
+
+
+def _edge(a: Point, b: Point):
+    return (a, b) if a <= b else (b, a)
+
+
+def _polygons(geometry: dict) -> List:
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    raise ValueError(f"Unsupported geometry type: {geometry['type']}")
+
+
+def _open_ring(ring) -> List[Point]:
+    """Anillo sin el punto de cierre ni vértices consecutivos repetidos."""
+    out: List[Point] = []
+    for x, y in ring:
+        p = (x, y)
+        if not out or out[-1] != p:
+            out.append(p)
+    while len(out) > 1 and out[0] == out[-1]:
+        out.pop()
+    return out
+
+
+class Topology:
+    """
+    Arcos únicos más, por cada feature, su geometría como listas de referencias
+    a arcos (``i`` o ``~i`` si el arco se recorre al revés, como en TopoJSON).
+    """
+
+    def __init__(self, feature_collection: dict):
+        self.arcs: List[List[Point]] = []
+        self.features: List[dict] = []   # {"properties", "type", "polygons": [[ [refs] ]]}
+        self._arc_index: Dict[tuple, int] = {}
+        self._build(feature_collection)
+
+    # ---------------------------------------------
+    # CONSTRUCCIÓN
+    # ---------------------------------------------
+    def _build(self, fc: dict):
+        rings = []          # anillos abiertos, en orden de aparición
+        structure = []      # por feature: [[indices de anillo por polígono]]
+        for feature in fc["features"]:
+            polys = []
+            for polygon in _polygons(feature["geometry"]):
+                idxs = []
+                for ring in polygon:
+                    opened = _open_ring(ring)
+                    if len(opened) < 3:
+                        continue
+                    idxs.append(len(rings))
+                    rings.append(opened)
+                if idxs:
+                    polys.append(idxs)
+            structure.append(polys)
+
+        # Qué anillos usan cada arista y cuántos vecinos tiene cada vértice
+        owners = defaultdict(set)
+        neighbors = defaultdict(set)
+        for r, ring in enumerate(rings):
+            n = len(ring)
+            for i in range(n):
+                a, b = ring[i], ring[(i + 1) % n]
+                owners[_edge(a, b)].add(r)
+                neighbors[a].add(b)
+                neighbors[b].add(a)
+
+        ring_arcs = []
+        for ring in rings:
+            n = len(ring)
+            junctions = [
+                i for i in range(n)
+                if len(neighbors[ring[i]]) > 2
+                or owners[_edge(ring[i - 1], ring[i])] != owners[_edge(ring[i], ring[(i + 1) % n])]
+            ]
+            ring_arcs.append(self._cut_ring(ring, junctions))
+
+        for feature, polys in zip(fc["features"], structure):
+            self.features.append({
+                "id": feature.get("id"),
+                "type": feature["geometry"]["type"],
+                "properties": feature.get("properties") or {},
+                "polygons": [[ring_arcs[r] for r in idxs] for idxs in polys],
+            })
+
+    def _cut_ring(self, ring: List[Point], junctions: List[int]) -> List[int]:
+        if not junctions:
+            return [self._add_closed_arc(ring)]
+
+        start = junctions[0]
+        rotated = ring[start:] + ring[:start]
+        cuts = [j - start for j in junctions] + [len(ring)]
+        rotated.append(rotated[0])
+        return [self._add_arc(rotated[a:b + 1]) for a, b in zip(cuts, cuts[1:])]
+
+    def _add_arc(self, points: List[Point]) -> int:
+        key = tuple(points)
+        if key in self._arc_index:
+            return self._arc_index[key]
+        reverse_key = key[::-1]
+        if reverse_key in self._arc_index:
+            return ~self._arc_index[reverse_key]
+        self._arc_index[key] = len(self.arcs)
+        self.arcs.append(points)
+        return len(self.arcs) - 1
+
+    def _add_closed_arc(self, ring: List[Point]) -> int:
+        # Un anillo sin uniones (isla o enclave completo) se rota a su punto
+        # mínimo para que ambos lados del enclave produzcan la misma clave.
+        start = ring.index(min(ring))
+        rotated = ring[start:] + ring[:start]
+        forward = rotated + [rotated[0]]
+        backward = [rotated[0]] + rotated[:0:-1] + [rotated[0]]
+        if tuple(backward) in self._arc_index:
+            return ~self._arc_index[tuple(backward)]
+        return self._add_arc(forward)
+
+    # ---------------------------------------------
+    # SALIDA GEOJSON
+    # ---------------------------------------------
+    def simplified_arcs(self, tolerance: float, decimals: Optional[int]) -> List[List[Point]]:
+        """Cada arco simplificado una sola vez (y redondeado si se indica)."""
+        out = []
+        for arc in self.arcs:
+            if arc[0] == arc[-1]:
+                simplified = simplify_closed_line(arc, tolerance)
+            else:
+                simplified = simplify_line(arc, tolerance)
+            out.append(round_line(simplified, decimals) if decimals is not None else simplified)
+        return out
+
+    @staticmethod
+    def _ring_from_arcs(refs: List[int], arcs: List[List[Point]]) -> List[Point]:
+        ring: List[Point] = []
+        for ref in refs:
+            points = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+            ring.extend(points if not ring else points[1:])
+        cleaned: List[Point] = []
+        for p in ring:
+            if not cleaned or cleaned[-1] != p:
+                cleaned.append(p)
+        return cleaned
+
+    def to_geojson(self, tolerance: float = 0.0, decimals: Optional[int] = None) -> dict:
+        """Reconstruye el FeatureCollection con todos los arcos simplificados a la vez."""
+        arcs = self.simplified_arcs(tolerance, decimals)
+        features = []
+        for feature in self.features:
+            polygons = []
+            for poly in feature["polygons"]:
+                rings = [self._ring_from_arcs(refs, arcs) for refs in poly]
+                if len(rings[0]) < 4:
+                    # El anillo exterior colapsó: a este nivel el polígono no se ve.
+                    continue
+                polygons.append([[list(p) for p in ring] for ring in rings if len(ring) >= 4])
+
+            if not polygons:
+                # Nunca dejamos un distrito sin geometría: usamos su parte más grande sin simplificar.
+                poly = max(feature["polygons"], key=lambda p: sum(len(self.arcs[r if r >= 0 else ~r]) for r in p[0]))
+                polygons = [[[list(p) for p in self._ring_from_arcs(refs, self.arcs)] for refs in poly]]
+
+            if feature["type"] == "Polygon" and len(polygons) == 1:
+                geometry = {"type": "Polygon", "coordinates": polygons[0]}
+            else:
+                geometry = {"type": "MultiPolygon", "coordinates": polygons}
+
+            out = {"type": "Feature", "properties": feature["properties"], "geometry": geometry}
+            if feature["id"] is not None:
+                out["id"] = feature["id"]
+            features.append(out)
+
+        return {"type": "FeatureCollection", "features": features}
+
+    # ---------------------------------------------
+    # SALIDA TOPOJSON
+    # ---------------------------------------------
+    def bbox(self) -> List[float]:
+        xs = [p[0] for arc in self.arcs for p in arc]
+        ys = [p[1] for arc in self.arcs for p in arc]
+        return [min(xs), min(ys), max(xs), max(ys)]
+
+    def to_topojson(self, tolerance: float = 0.0, quantization: int = 1_000_000,
+                    object_name: str = "distritos") -> dict:
+        """
+        Codifica la topología como TopoJSON: cada arco una sola vez, con
+        coordenadas enteras cuantizadas y codificadas como diferencias.
+        """
+        x0, y0, x1, y1 = self.bbox()
+        kx = (x1 - x0) / (quantization - 1) or 1.0
+        ky = (y1 - y0) / (quantization - 1) or 1.0
+
+        arcs = self.simplified_arcs(tolerance, None)
+        encoded = []
+        for arc in arcs:
+            out, px, py = [], 0, 0
+            for x, y in arc:
+                qx, qy = round((x - x0) / kx), round((y - y0) / ky)
+                if out and qx == px and qy == py:
+                    continue
+                out.append([qx - px, qy - py] if out else [qx, qy])
+                px, py = qx, qy
+            if len(out) == 1:
+                out.append([0, 0])
+            encoded.append(out)
+
+        geometries = []
+        for feature in self.features:
+            polygons = [
+                poly for poly in feature["polygons"]
+                if len(self._ring_from_arcs(poly[0], arcs)) >= 4
+            ] or feature["polygons"][:1]
+            if feature["type"] == "Polygon" and len(polygons) == 1:
+                geometry = {"type": "Polygon", "arcs": polygons[0]}
+            else:
+                geometry = {"type": "MultiPolygon", "arcs": polygons}
+            geometry["properties"] = feature["properties"]
+            if feature["id"] is not None:
+                geometry["id"] = feature["id"]
+            geometries.append(geometry)
+
+        return {
+            "type": "Topology",
+            "bbox": [x0, y0, x1, y1],
+            "transform": {"scale": [kx, ky], "translate": [x0, y0]},
+            "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+            "arcs": encoded,
+        }
+
+
+def quantization_for_tolerance(extent: float, tolerance: float) -> int:
+    """Rejilla entera cuyo paso no supera la tolerancia (entre 10^3 y 10^6 pasos)."""
+    if tolerance <= 0:
+        return 1_000_000
+    return int(max(1_000, min(1_000_000, math.ceil(extent / tolerance))))
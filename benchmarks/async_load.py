@@ -0,0 +1,212 @@
+# benchmarks/async_load.py
+"""
+Rendimiento de las lecturas síncronas (threadpool) frente a las asíncronas (DB_ASYNC).
+
+Siembra una base SQLite temporal, monta dos aplicaciones con los mismos
+endpoints (routers síncronos con ``get_db`` y ``async_reads`` con
+``get_async_db``) y lanza la misma mezcla de peticiones con N clientes
+concurrentes. Reporta peticiones/s y latencias p50/p95.
+
+Antes de medir comprueba que ambas versiones respondan lo mismo y que la
+asíncrona no delegue en ``AsyncSession.run_sync``.
+
+Uso:
+    python -m benchmarks.async_load [--projects 200] [--requests 2000]
+                                    [--concurrency 64] [--threads 8] [--min-ratio 0]
+
+Sale con código 1 si las respuestas difieren, si alguna petición falla o si
+async/sync < --min-ratio.
+Requiere aiosqlite (o asyncpg contra Postgres).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend import district_summary, models, response_cache
+from backend.database import get_async_db, get_db
+from backend.migrations import run_migrations
+from backend.routers import async_reads, general_map, projects
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE"]
+
+
+# ---------------------------------------------
+# DATOS Y APLICACIONES
+# ---------------------------------------------
+def seed(Session, count: int):
+    from backend.districts import resolve_ids
+
+    geojson = {"type": "Feature", "properties": {},
+               "geometry": {"type": "Point", "coordinates": [-77.03, -12.12]}}
+    with Session() as db:
+        ids = resolve_ids(db, DISTRICTS)
+        for i in range(count):
+            name = DISTRICTS[i % len(DISTRICTS)]
+            project = models.Project(name=f"Proyecto {i}", status="active")
+            project.districts = [models.ProjectDistrict(distrito_name=name, district_id=ids.get(name))]
+            project.drawings = [models.Drawing(geojson=geojson, drawing_type="marker") for _ in range(3)]
+            db.add(project)
+        db.commit()
+        district_summary.rebuild(db)
+
+
+def sync_app(Session) -> FastAPI:
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/projects")
+    app.include_router(general_map.router, prefix="/api")
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return app
+
+
+def async_app(AsyncSession) -> FastAPI:
+    app = FastAPI()
+    app.include_router(async_reads.projects_router, prefix="/api/projects")
+    app.include_router(async_reads.districts_router, prefix="/api")
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return app
+
+
+# ---------------------------------------------
+# PARIDAD
+# ---------------------------------------------
+def forbid_run_sync():
+    """Las lecturas asíncronas deben ejecutar sus consultas con ``await db.execute``."""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    async def run_sync(self, fn, *args, **kwargs):
+        raise AssertionError(f"run_sync({fn.__name__}) en una lectura asíncrona")
+
+    AsyncSession.run_sync = run_sync
+
+
+async def compare(sync: FastAPI, asynchronous: FastAPI, urls) -> list:
+    """URLs cuyas respuestas (estado, cuerpo, ETag) difieren entre ambas versiones."""
+    different = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=sync), base_url="http://bench") as a, \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=asynchronous), base_url="http://bench") as b:
+        for url in urls:
+            left, right = await a.get(url), await b.get(url)
+            if (left.status_code, left.content, left.headers.get("etag")) != \
+                    (right.status_code, right.content, right.headers.get("etag")):
+                different.append(url)
+    return different
+
+
+# ---------------------------------------------
+# CARGA
+# ---------------------------------------------
+async def run_load(app: FastAPI, urls, requests: int, concurrency: int):
+    latencies, failures = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(urls[i % len(urls)])
+                latencies.append(time.perf_counter() - start)
+                failures += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "failures": failures,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=8, help="Hilos del threadpool para la versión síncrona")
+    parser.add_argument("--min-ratio", type=float, default=0.0, help="Mínimo async/sync en peticiones/s")
+    args = parser.parse_args(argv)
+
+    # Se mide la BD, no la caché de respuestas
+    response_cache.response_cache = None
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    # Un pool con sitio para todos los clientes: con menos, las sesiones síncronas
+    # que esperan su cierre en el threadpool retienen conexiones y el resto se bloquea
+    pool = {"pool_size": args.concurrency, "max_overflow": 0}
+    engine = create_engine(f"sqlite:///{tmp.name}", connect_args={"check_same_thread": False}, **pool)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp.name}", **pool)
+    try:
+        run_migrations(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed(Session, args.projects)
+        AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        urls = [
+            "/api/projects?limit=20",
+            "/api/projects?limit=20&include=districts,drawings&status=active",
+            f"/api/projects?limit=20&district={DISTRICTS[1]}",
+            *(f"/api/projects/{i}" for i in range(1, 21)),
+            *(f"/api/districts/{d}/stats" for d in DISTRICTS),
+            f"/api/districts/{DISTRICTS[0]},{DISTRICTS[1]}/stats",
+            f"/api/districts/{DISTRICTS[0]}/projects",
+        ]
+
+        async def both():
+            anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+            forbid_run_sync()
+            different = await compare(sync_app(Session), async_app(AsyncSession), urls + ["/api/projects/999999"])
+            sync = await run_load(sync_app(Session), urls, args.requests, args.concurrency)
+            asynchronous = await run_load(async_app(AsyncSession), urls, args.requests, args.concurrency)
+            await async_engine.dispose()
+            return different, sync, asynchronous
+
+        different, sync, asynchronous = asyncio.run(both())
+    finally:
+        engine.dispose()
+        os.unlink(tmp.name)
+
+    for url in different:
+        print(f"respuesta distinta en {url}")
+    print(f"{args.requests} peticiones, {args.concurrency} clientes, {args.threads} hilos (sync)\n")
+    print(f"{'modo':8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'fallos':>7}")
+    for name, result in (("sync", sync), ("async", asynchronous)):
+        print(f"{name:8} {result['rps']:9.1f} {result['p50']:9.1f} {result['p95']:9.1f} {result['failures']:7}")
+    ratio = asynchronous["rps"] / sync["rps"]
+    print(f"\nasync/sync: {ratio:.2f}x")
+
+    failed = different or sync["failures"] or asynchronous["failures"] or ratio < args.min_ratio
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
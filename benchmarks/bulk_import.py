@@ -0,0 +1,126 @@
+# benchmarks/bulk_import.py
+"""
+POST /api/projects/bulk frente a POST /api/projects en un bucle.
+
+Siembra el mismo lote sintético (proyectos con distritos, un dibujo y una
+anotación) en dos bases SQLite temporales y compara el tiempo total.
+
+Uso:
+    python -m benchmarks.bulk_import [--projects 500] [--batch-size 500]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import jwt
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import get_db
+from backend.main import app
+from backend.migrations import run_migrations
+from backend.token_verifier import TokenVerifier, set_verifier
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE"]
+TOKEN = jwt.encode({"sub": "benchmark", "role": "admin"}, "benchmark", algorithm="HS256")
+set_verifier(TokenVerifier(secret="benchmark"))
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def make_rows(n: int):
+    return [
+        {
+            "name": f"Proyecto importado {i}",
+            "description": "Fuente externa",
+            "status": "active",
+            "districts": [DISTRICTS[i % len(DISTRICTS)], DISTRICTS[(i + 1) % len(DISTRICTS)]],
+            "source_url": f"https://example.org/proyectos/{i}",
+            "scraped_at": "2024-01-01T00:00:00",
+            "drawings": [{
+                "geojson": {"type": "Point", "coordinates": [-77.03 + i * 1e-5, -12.12]},
+                "drawing_type": "point",
+            }],
+            "annotations": [{"distrito_name": DISTRICTS[i % len(DISTRICTS)], "title": "Nota", "content": "..."}],
+        }
+        for i in range(n)
+    ]
+
+
+class TemporaryDatabase:
+    """Base SQLite en un archivo temporal, enganchada a ``get_db``."""
+
+    def __enter__(self):
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        self.path = tmp.name
+        self.engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        def override_get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        run_migrations(self.engine)
+        app.dependency_overrides[get_db] = override_get_db
+        return TestClient(app)
+
+    def __exit__(self, *exc):
+        app.dependency_overrides.pop(get_db, None)
+        self.engine.dispose()
+        os.unlink(self.path)
+
+
+def run_loop(client: TestClient, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        created = client.post("/api/projects", json={
+            k: row[k] for k in ("name", "description", "status", "districts")
+        }, headers=HEADERS).json()
+        for drawing in row["drawings"]:
+            client.post(f"/api/projects/{created['id']}/drawings", json=drawing, headers=HEADERS)
+        for annotation in row["annotations"]:
+            client.post(f"/api/projects/{created['id']}/annotations", json=annotation, headers=HEADERS)
+    return time.perf_counter() - start
+
+
+def run_bulk(client: TestClient, rows, batch_size: int) -> float:
+    body = "\n".join(json.dumps(r) for r in rows).encode("utf-8")
+    start = time.perf_counter()
+    report = client.post(
+        f"/api/projects/bulk?batch_size={batch_size}",
+        content=body,
+        headers={**HEADERS, "Content-Type": "application/x-ndjson"},
+    ).json()
+    elapsed = time.perf_counter() - start
+    assert report["created"] == len(rows), report
+    return elapsed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    rows = make_rows(args.projects)
+
+    with TemporaryDatabase() as client:
+        loop = run_loop(client, rows)
+    with TemporaryDatabase() as client:
+        bulk = run_bulk(client, rows, args.batch_size)
+
+    print(f"{args.projects} proyectos")
+    print(f"  create_project en bucle: {loop:8.2f} s  ({args.projects / loop:8.0f} proyectos/s)")
+    print(f"  /api/projects/bulk:      {bulk:8.2f} s  ({args.projects / bulk:8.0f} proyectos/s)")
+    print(f"  aceleración:             {loop / bulk:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# benchmarks/clusters.py
+"""
+Clusters del mapa general (GET /api/projects/clusters) a zoom bajo.
+
+1. Exactitud: tras una secuencia aleatoria de escrituras (dibujos sueltos y por
+   lote, borrados, cambios de estado y distritos, proyectos nuevos, borrados e
+   importación masiva) los clusters del índice incremental deben coincidir con
+   una agregación por fuerza bruta sobre la base, en varios zooms.
+2. Costo a zoom de ciudad: tiempo del endpoint frente a agregar todos los
+   proyectos en cada pedido, y bytes frente a las teselas vectoriales que el
+   mapa pedía antes para el mismo viewport.
+3. Escala: el tiempo del endpoint casi no cambia al multiplicar los proyectos
+   (O(clusters), no O(proyectos)).
+
+Uso:
+    python -m benchmarks.clusters [--projects 20000] [--operations 200] [--min-speedup 20]
+
+Sale con código 1 si algún zoom no coincide o el endpoint no es al menos
+--min-speedup veces más rápido que la agregación completa.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import jwt
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.clusters import (
+    CELL_ZOOM_OFFSET, FINEST, MAX_CLUSTER_ZOOM, ProjectClusterIndex, cluster_index, grid_xy,
+)
+from backend.database import get_db
+from backend.main import app
+from backend.migrations import run_migrations
+from backend.mvt import tiles_for_bbox
+from backend.token_verifier import TokenVerifier, set_verifier
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE", "ATE", "COMAS", "CHORRILLOS"]
+STATUSES = ["active", "completed", "inactive", "archived"]
+TOKEN = jwt.encode({"sub": "benchmark", "role": "admin"}, "benchmark", algorithm="HS256")
+set_verifier(TokenVerifier(secret="benchmark"))
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+# Viewport de la ciudad al zoom inicial del mapa general
+CITY_ZOOM = 11
+CITY_BBOX = (-77.25, -12.30, -76.80, -11.80)
+CHECK_ZOOMS = (6, 9, CITY_ZOOM, 13, MAX_CLUSTER_ZOOM)
+
+
+def point(rng: random.Random) -> dict:
+    lon = rng.uniform(CITY_BBOX[0], CITY_BBOX[2])
+    lat = rng.uniform(CITY_BBOX[1], CITY_BBOX[3])
+    return {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+
+
+def line(rng: random.Random) -> dict:
+    start = point(rng)["geometry"]["coordinates"]
+    end = [start[0] + rng.uniform(-0.01, 0.01), start[1] + rng.uniform(-0.01, 0.01)]
+    return {"type": "Feature", "properties": {}, "geometry": {"type": "LineString", "coordinates": [start, end]}}
+
+
+def drawing(rng: random.Random) -> dict:
+    return ({"geojson": point(rng), "drawing_type": "point"} if rng.random() < 0.6
+            else {"geojson": line(rng), "drawing_type": "polyline"})
+
+
+def project_row(i: int, rng: random.Random) -> dict:
+    # ~15% sin dibujos: se ubican en el centroide de su distrito
+    drawings = 0 if rng.random() < 0.15 else rng.randint(1, 3)
+    return {
+        "name": f"Proyecto {i}",
+        "status": rng.choice(STATUSES),
+        "districts": rng.sample(DISTRICTS, 2),
+        "drawings": [drawing(rng) for _ in range(drawings)],
+    }
+
+
+def bulk(client: TestClient, rows):
+    body = "\n".join(json.dumps(r) for r in rows).encode("utf-8")
+    report = client.post("/api/projects/bulk?batch_size=2000", content=body,
+                         headers={**HEADERS, "Content-Type": "application/x-ndjson"}).json()
+    assert report["created"] == len(rows), report
+
+
+# ---------------------------------------------
+# REFERENCIA: AGREGAR TODO EN CADA PEDIDO
+# ---------------------------------------------
+def brute_force(Session, zoom: int, bbox=None) -> dict:
+    """Lo que costaría cada pedido sin índice: leer todos los proyectos y agruparlos."""
+    with Session() as db:
+        fresh = ProjectClusterIndex._read_projects(db)
+    level = min(zoom, MAX_CLUSTER_ZOOM) + CELL_ZOOM_OFFSET
+    shift = FINEST - level
+    cells = defaultdict(lambda: {"count": 0, "lon": 0.0, "lat": 0.0, "statuses": Counter(), "ids": []})
+    for project_id, member in fresh.items():
+        p = member.point()
+        if p is None:
+            continue
+        gx, gy = grid_xy(*p)
+        cell = cells[(gx >> shift, gy >> shift)]
+        cell["count"] += 1
+        cell["lon"] += p[0]
+        cell["lat"] += p[1]
+        cell["statuses"][member.status] += 1
+        cell["ids"].append(project_id)
+    if bbox is not None:
+        x0, y0, x1, y1 = tiles_for_bbox(level, bbox)
+        cells = {k: c for k, c in cells.items() if x0 <= k[0] <= x1 and y0 <= k[1] <= y1}
+    return {
+        f"{level}/{x}/{y}": (c["count"], c["lon"] / c["count"], c["lat"] / c["count"], dict(c["statuses"]),
+                             c["ids"][0] if c["count"] == 1 else None)
+        for (x, y), c in cells.items()
+    }
+
+
+def same_clusters(served: list, expected: dict) -> bool:
+    if {c["id"] for c in served} != set(expected):
+        return False
+    for c in served:
+        count, lon, lat, statuses, project_id = expected[c["id"]]
+        if (c["count"], c["statuses"], c.get("project_id")) != (count, statuses, project_id):
+            return False
+        # Las sumas se ajustan con altas y bajas: tolerancia de redondeo
+        if abs(c["lon"] - lon) > 1e-5 or abs(c["lat"] - lat) > 1e-5:
+            return False
+    return True
+
+
+def random_operation(client: TestClient, rng: random.Random, counter: list):
+    ids = [p["id"] for p in client.get("/api/projects?fields=id&include=&limit=500").json()]
+    op = rng.choice(["drawing", "batch", "delete_drawing", "update", "delete", "create", "bulk"])
+    counter[0] += 1
+    if op == "create":
+        client.post("/api/projects", json={"name": f"Nuevo {counter[0]}", "status": rng.choice(STATUSES),
+                                           "districts": rng.sample(DISTRICTS, 1)}, headers=HEADERS)
+        return
+    if op == "bulk":
+        bulk(client, [project_row(counter[0] * 100 + i, rng) for i in range(5)])
+        return
+
+    base = f"/api/projects/{rng.choice(ids)}"
+    if op == "drawing":
+        client.post(f"{base}/drawings", json=drawing(rng), headers=HEADERS)
+    elif op == "batch":
+        current = client.get(f"{base}/drawings").json()
+        kept = [{"id": d["id"], "geojson": d["geojson"] if rng.random() < 0.7 else point(rng),
+                 "drawing_type": d["drawing_type"]} for d in current if rng.random() < 0.6]
+        kept += [drawing(rng) for _ in range(rng.randint(0, 2))]
+        client.post(f"{base}/drawings/batch", json={"drawings": kept}, headers=HEADERS)
+    elif op == "delete_drawing":
+        current = client.get(f"{base}/drawings").json()
+        if current:
+            client.delete(f"{base}/drawings/{rng.choice(current)['id']}", headers=HEADERS)
+    elif op == "update":
+        client.put(base, json={"name": "Editado", "status": rng.choice(STATUSES),
+                               "districts": rng.sample(DISTRICTS, rng.randint(1, 2))}, headers=HEADERS)
+    elif op == "delete":
+        client.delete(base, headers=HEADERS)
+
+
+def median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def city_url(zoom: int = CITY_ZOOM) -> str:
+    return f"/api/projects/clusters?zoom={zoom}&bbox={','.join(str(v) for v in CITY_BBOX)}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--min-speedup", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    engine = create_engine(f"sqlite:///{tmp.name}", connect_args={"check_same_thread": False})
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    failures = []
+    try:
+        run_migrations(engine)
+        app.dependency_overrides[get_db] = override_get_db
+        cluster_index.invalidate()
+        client = TestClient(app)
+
+        # 1. Exactitud del índice incremental
+        small = max(1, args.projects // 10)
+        bulk(client, [project_row(i, rng) for i in range(small)])
+        client.get(city_url())          # carga el índice; desde aquí solo se ajusta
+        counter = [0]
+        for _ in range(args.operations):
+            random_operation(client, rng, counter)
+        mismatched = [zoom for zoom in CHECK_ZOOMS
+                      if not same_clusters(client.get(f"/api/projects/clusters?zoom={zoom}").json()["clusters"],
+                                           brute_force(Session, zoom))]
+        print(f"exactitud: {args.operations} escrituras sobre {small} proyectos -> "
+              f"{'clusters idénticos a la agregación completa' if not mismatched else f'DIFIEREN en zoom {mismatched}'}")
+        if mismatched:
+            failures.append(f"los clusters difieren en zoom {mismatched}")
+
+        # 3. Escala (primera medición con 1/10 de los proyectos)
+        small_ms = median_ms(lambda: client.get(city_url()), 50)
+        bulk(client, [project_row(small + i, rng) for i in range(args.projects - small)])
+        client.get(city_url())
+        large_ms = median_ms(lambda: client.get(city_url()), 50)
+
+        # 2. Costo a zoom de ciudad
+        served = client.get(city_url())
+        cluster_bytes = len(served.content)
+        data = served.json()
+        if not same_clusters(data["clusters"], brute_force(Session, CITY_ZOOM, CITY_BBOX)):
+            failures.append("los clusters de la ciudad difieren de la agregación completa")
+        brute_ms = median_ms(lambda: brute_force(Session, CITY_ZOOM, CITY_BBOX), 3)
+
+        x0, y0, x1, y1 = tiles_for_bbox(CITY_ZOOM, CITY_BBOX)
+        tile_urls = [f"/api/tiles/{CITY_ZOOM}/{x}/{y}.mvt" for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+        start = time.perf_counter()
+        tile_bytes = sum(len(client.get(url).content) for url in tile_urls)
+        tiles_ms = (time.perf_counter() - start) * 1000
+
+        speedup = brute_ms / large_ms
+        print(f"\nciudad a zoom {CITY_ZOOM} ({data['total']} proyectos ubicados, {len(data['clusters'])} clusters):")
+        print(f"  clusters (índice):        {large_ms:8.2f} ms  {cluster_bytes / 1024:8.1f} KB")
+        print(f"  agregación por pedido:    {brute_ms:8.2f} ms  ({speedup:.0f}x más lento)")
+        print(f"  teselas del viewport ({len(tile_urls)}): {tiles_ms:8.2f} ms  {tile_bytes / 1024:8.1f} KB "
+              f"({tile_bytes / cluster_bytes:.0f}x más bytes, primera visita)")
+        print(f"\nescala: {small} -> {args.projects} proyectos, el endpoint pasa de "
+              f"{small_ms:.2f} ms a {large_ms:.2f} ms ({large_ms / small_ms:.1f}x)")
+        if speedup < args.min_speedup:
+            failures.append(f"el endpoint es solo {speedup:.1f}x más rápido que agregar por pedido")
+
+        # Costo de mantener el índice frente a recargarlo
+        with Session() as db:
+            start = time.perf_counter()
+            ProjectClusterIndex().ensure_loaded(db)
+            rebuild_ms = (time.perf_counter() - start) * 1000
+        # Alta y baja de un dibujo en proyectos al azar (cada una mueve al proyecto de celda)
+        ids = [p["id"] for p in client.get("/api/projects?fields=id&include=&limit=500").json()]
+        moves = [(10 ** 9 + i, rng.choice(ids), (lon, lat, lon, lat))
+                 for i, (lon, lat) in enumerate(point(rng)["geometry"]["coordinates"] for _ in range(1000))]
+        start = time.perf_counter()
+        for drawing_id, project_id, bbox in moves:
+            cluster_index.drawings_changed([(drawing_id, project_id, bbox)], [])
+            cluster_index.drawings_changed([], [(drawing_id, bbox)])
+        update_us = (time.perf_counter() - start) / (2 * len(moves)) * 1e6
+        print(f"\nmantenimiento: {update_us:.0f} µs por dibujo escrito, frente a {rebuild_ms:.0f} ms "
+              f"de reconstruir el índice ({rebuild_ms * 1000 / update_us:.0f}x)")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        cluster_index.invalidate()
+        engine.dispose()
+        os.unlink(tmp.name)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
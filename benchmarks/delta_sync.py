@@ -0,0 +1,270 @@
+# benchmarks/delta_sync.py
+"""
+Sincronización incremental (GET /api/changes) frente a volver a pedir las listas.
+
+1. Convergencia: aplica una secuencia aleatoria de escrituras (crear, editar y
+   borrar proyectos, dibujos sueltos y por lote, anotaciones, importación
+   masiva) y mantiene una réplica local aplicando solo los deltas (con páginas
+   chicas para ejercitar ``has_more``). Al final la réplica debe ser igual al
+   estado de la base.
+2. Costo tras una edición: bytes y tiempo del delta frente a lo que el
+   frontend recargaba antes (página de la lista, lista de distrito con dibujos
+   y el proyecto abierto).
+3. Aviso SSE: cuándo despierta un suscriptor del flujo respecto de la
+   respuesta de la escritura.
+
+Uso:
+    python -m benchmarks.delta_sync [--projects 2000] [--operations 300] [--min-ratio 10]
+
+Sale con código 1 si la réplica diverge o el delta no es al menos --min-ratio
+veces más chico que la recarga.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import jwt
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from backend import change_log, models, serialization
+from backend.database import get_db
+from backend.main import app
+from backend.migrations import run_migrations
+from backend.token_verifier import TokenVerifier, set_verifier
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE"]
+TOKEN = jwt.encode({"sub": "benchmark", "role": "admin"}, "benchmark", algorithm="HS256")
+set_verifier(TokenVerifier(secret="benchmark"))
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+# Lo que el frontend pedía de nuevo tras cada edición
+FULL_RELOAD = [
+    "/api/projects?fields=id,name,description,status,created_at&include=districts",
+    "/api/projects?fields=id,name,description,status&include=drawings&limit=200",
+    "/api/projects/{project_id}",
+]
+
+
+def point(rng: random.Random) -> dict:
+    return {"type": "Feature", "properties": {},
+            "geometry": {"type": "Point", "coordinates": [-77.1 + rng.random() * 0.2, -12.2 + rng.random() * 0.2]}}
+
+
+def project_row(i: int, rng: random.Random, drawings: int = 3) -> dict:
+    return {
+        "name": f"Proyecto {i}",
+        "description": "Sintético",
+        "status": rng.choice(["active", "completed", "inactive"]),
+        "districts": rng.sample(DISTRICTS, 2),
+        "drawings": [{"geojson": point(rng), "drawing_type": "point"} for _ in range(drawings)],
+        "annotations": [{"distrito_name": DISTRICTS[0], "title": "Nota", "content": "..."}],
+    }
+
+
+def bulk(client: TestClient, rows):
+    body = "\n".join(json.dumps(r) for r in rows).encode("utf-8")
+    report = client.post("/api/projects/bulk", content=body,
+                         headers={**HEADERS, "Content-Type": "application/x-ndjson"}).json()
+    assert report["created"] == len(rows), report
+
+
+# ---------------------------------------------
+# RÉPLICA DEL CLIENTE
+# ---------------------------------------------
+class Replica:
+    def __init__(self, cursor: int):
+        self.cursor = cursor
+        self.projects, self.drawings, self.annotations = {}, {}, {}
+        self.requests = 0
+
+    def load(self, state: dict):
+        self.projects, self.drawings, self.annotations = (dict(state[k]) for k in ("projects", "drawings", "annotations"))
+
+    def sync(self, client: TestClient, limit: int):
+        while True:
+            delta = client.get(f"/api/changes?since={self.cursor}&limit={limit}").json()
+            self.requests += 1
+            self.apply(delta)
+            if not delta["has_more"]:
+                return
+
+    def apply(self, delta: dict):
+        self.cursor = delta["cursor"]
+        for project in delta["projects"]:
+            self.projects[project["id"]] = project
+        for drawing in delta["drawings"]:
+            self.drawings[drawing["id"]] = drawing
+        for annotation in delta["annotations"]:
+            self.annotations[annotation["id"]] = annotation
+        # Sin cascada local: borrar un proyecto trae también las lápidas de sus hijos
+        for kind, items in (("projects", self.projects), ("drawings", self.drawings),
+                            ("annotations", self.annotations)):
+            for tombstone in delta["deleted"][kind]:
+                items.pop(tombstone["id"], None)
+
+
+def server_state(Session) -> dict:
+    """Estado de la base con la misma forma que los deltas (pasado por JSON)."""
+    with Session() as db:
+        rows = db.execute(select(*serialization.project_columns()).order_by(models.Project.id)).all()
+        projects = serialization.project_dicts(db, rows, relations=("districts",))
+        drawings = change_log._drawing_dicts(db, [i for (i,) in db.execute(select(models.Drawing.id))])
+        annotations = change_log._annotation_dicts(db, [i for (i,) in db.execute(select(models.Annotation.id))])
+    state = json.loads(serialization.dumps({"projects": projects, "drawings": drawings, "annotations": annotations}))
+    return {k: {item["id"]: item for item in v} for k, v in state.items()}
+
+
+def random_operation(client: TestClient, rng: random.Random, counter: list):
+    ids = [p["id"] for p in client.get("/api/projects?fields=id&include=&limit=500").json()]
+    op = rng.choice(["create", "update", "delete", "drawing", "batch", "delete_drawing",
+                     "annotation", "delete_annotation", "bulk"] if ids else ["create", "bulk"])
+    counter[0] += 1
+    if op == "create":
+        client.post("/api/projects", json={k: v for k, v in project_row(counter[0], rng).items()
+                                           if k in ("name", "description", "status", "districts")},
+                    headers=HEADERS)
+    elif op == "bulk":
+        bulk(client, [project_row(counter[0] * 100 + i, rng, drawings=2) for i in range(3)])
+    else:
+        project_id = rng.choice(ids)
+        base = f"/api/projects/{project_id}"
+        if op == "update":
+            client.put(base, json={"name": f"Editado {counter[0]}", "status": "completed",
+                                   "districts": rng.sample(DISTRICTS, rng.randint(1, 3))}, headers=HEADERS)
+        elif op == "delete":
+            client.delete(base, headers=HEADERS)
+        elif op == "drawing":
+            client.post(f"{base}/drawings", json={"geojson": point(rng), "drawing_type": "point"}, headers=HEADERS)
+        elif op == "batch":
+            current = client.get(f"{base}/drawings").json()
+            kept = [{"id": d["id"], "geojson": d["geojson"], "drawing_type": d["drawing_type"]}
+                    for d in current if rng.random() < 0.5]
+            kept += [{"geojson": point(rng), "drawing_type": "point"} for _ in range(rng.randint(0, 2))]
+            client.post(f"{base}/drawings/batch", json={"drawings": kept}, headers=HEADERS)
+        elif op == "delete_drawing":
+            current = client.get(f"{base}/drawings").json()
+            if current:
+                client.delete(f"{base}/drawings/{rng.choice(current)['id']}", headers=HEADERS)
+        elif op == "annotation":
+            client.post(f"{base}/annotations", json={"distrito_name": DISTRICTS[1], "title": "t", "content": "c"},
+                        headers=HEADERS)
+        elif op == "delete_annotation":
+            current = client.get(f"{base}/annotations").json()
+            if current:
+                client.delete(f"{base}/annotations/{rng.choice(current)['id']}", headers=HEADERS)
+
+
+# ---------------------------------------------
+# AVISO SSE
+# ---------------------------------------------
+async def wake_latency(client: TestClient, project_id: int, rng: random.Random):
+    """(despertar del suscriptor, fin de la escritura), ambos desde el inicio de la escritura."""
+    wakeup = change_log.broker.subscribe()
+    try:
+        def write():
+            client.post(f"/api/projects/{project_id}/drawings",
+                        json={"geojson": point(rng), "drawing_type": "point"}, headers=HEADERS)
+            return time.perf_counter()
+
+        start = time.perf_counter()
+        task = asyncio.create_task(asyncio.to_thread(write))
+        await asyncio.wait_for(wakeup.wait(), 10)
+        woke = time.perf_counter()
+        done = await task
+        return woke - start, done - start
+    finally:
+        change_log.broker.unsubscribe(wakeup)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--operations", type=int, default=300)
+    parser.add_argument("--min-ratio", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    engine = create_engine(f"sqlite:///{tmp.name}", connect_args={"check_same_thread": False})
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    failures = []
+    try:
+        run_migrations(engine)
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+
+        # 1. Convergencia
+        bulk(client, [project_row(i, rng) for i in range(20)])
+        replica = Replica(client.get("/api/changes").json()["cursor"])
+        replica.load(server_state(Session))
+        counter = [0]
+        for i in range(args.operations):
+            random_operation(client, rng, counter)
+            if rng.random() < 0.3:
+                replica.sync(client, limit=rng.choice([3, 7, 500]))
+        replica.sync(client, limit=500)
+        truth = server_state(Session)
+        same = all(getattr(replica, k) == truth[k] for k in ("projects", "drawings", "annotations"))
+        print(f"convergencia: {args.operations} escrituras, {replica.requests} pedidos de delta, "
+              f"{len(truth['projects'])} proyectos, {len(truth['drawings'])} dibujos -> "
+              f"{'réplica idéntica' if same else 'DIVERGE'}")
+        if not same:
+            failures.append("la réplica diverge del servidor")
+
+        # 2. Costo tras una edición
+        bulk(client, [project_row(1000 + i, rng) for i in range(args.projects)])
+        project_id = client.get("/api/projects?fields=id&limit=1").json()[0]["id"]
+        cursor = client.get("/api/changes").json()["cursor"]
+        client.post(f"/api/projects/{project_id}/drawings", json={"geojson": point(rng), "drawing_type": "point"},
+                    headers=HEADERS)
+
+        start = time.perf_counter()
+        full_bytes = sum(len(client.get(url.format(project_id=project_id)).content) for url in FULL_RELOAD)
+        full_s = time.perf_counter() - start
+        start = time.perf_counter()
+        delta = client.get(f"/api/changes?since={cursor}")
+        delta_s = time.perf_counter() - start
+        delta_bytes = len(delta.content)
+        ratio = full_bytes / delta_bytes
+        print(f"\ntras editar un dibujo ({args.projects} proyectos más):")
+        print(f"  recarga anterior: {len(FULL_RELOAD)} pedidos, {full_bytes / 1024:8.1f} KB, {full_s * 1000:7.1f} ms")
+        print(f"  delta:            1 pedido,  {delta_bytes / 1024:8.1f} KB, {delta_s * 1000:7.1f} ms  ({ratio:.0f}x menos bytes)")
+        if ratio < args.min_ratio:
+            failures.append(f"el delta es solo {ratio:.1f}x más chico")
+
+        # 3. Aviso SSE
+        # El aviso sale en after_commit: el suscriptor despierta antes de que termine la respuesta
+        samples = [asyncio.run(wake_latency(client, project_id, rng)) for _ in range(20)]
+        woke = sorted(w for w, _ in samples)[len(samples) // 2]
+        done = sorted(d for _, d in samples)[len(samples) // 2]
+        print(f"\naviso SSE: el suscriptor despierta a los {woke * 1000:.1f} ms de iniciada la escritura "
+              f"(la escritura responde a los {done * 1000:.1f} ms), sin esperar el sondeo")
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+        os.unlink(tmp.name)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
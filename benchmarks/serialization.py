@@ -0,0 +1,155 @@
+# benchmarks/serialization.py
+"""
+Serialización de listas de proyectos: ruta anterior frente al endpoint real.
+
+- anterior: objetos ORM con selectinload -> ``ProjectResponse.model_validate``
+  por proyecto (dibujos anidados y validador de distritos) -> ``model_dump`` ->
+  ``json.dumps``;
+- nueva: ``GET /api/projects?include=districts,drawings`` con TestClient,
+  recorriendo todas las páginas (proyección a dicts + orjson, y lo que FastAPI
+  haga después con la respuesta). La caché de respuestas se desactiva.
+
+Ambas deben producir los mismos proyectos (salvo el orden de ``districts``). Uso:
+    python -m benchmarks.serialization [--sizes 1000 10000] [--repeat 3] [--min-speedup 1.5]
+
+Sale con código 1 si las salidas difieren, si la aceleración queda bajo
+--min-speedup o si FastAPI vuelve a validar la lista con el ``response_model``
+(el esquema solo documenta; la respuesta ya sale serializada).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import fastapi.routing
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, selectinload
+
+from backend import models, response_cache, schemas, serialization
+from backend.database import get_db
+from backend.main import app
+from backend.migrations import run_migrations
+from backend.routers.projects import MAX_PAGE_SIZE
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE"]
+
+
+def seed(engine, count: int):
+    geojson = {"type": "Feature", "properties": {},
+               "geometry": {"type": "LineString",
+                            "coordinates": [[-77.03 + i * 1e-4, -12.12 + i * 1e-4] for i in range(10)]}}
+    with Session(engine) as db:
+        for i in range(count):
+            project = models.Project(name=f"Proyecto {i}", description="Descripción del proyecto", status="active")
+            project.districts = [models.ProjectDistrict(distrito_name=DISTRICTS[(i + k) % len(DISTRICTS)])
+                                 for k in range(2)]
+            project.drawings = [models.Drawing(geojson=geojson, drawing_type="polyline") for _ in range(3)]
+            db.add(project)
+        db.commit()
+
+
+def previous_path(engine) -> bytes:
+    with Session(engine) as db:
+        projects = db.query(models.Project).options(
+            selectinload(models.Project.districts), selectinload(models.Project.drawings)
+        ).order_by(models.Project.id).all()
+        payload = [schemas.ProjectResponse.model_validate(p).model_dump(mode="json") for p in projects]
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# Llamadas de FastAPI a la validación/serialización del response_model
+validations = 0
+_serialize_response = fastapi.routing.serialize_response
+
+
+async def counting_serialize_response(*args, **kwargs):
+    global validations
+    if kwargs.get("field") is not None:
+        validations += 1
+    return await _serialize_response(*args, **kwargs)
+
+
+def endpoint_path(engine) -> List[bytes]:
+    def override_get_db():
+        with Session(engine) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        client = TestClient(app)
+        url = f"/api/projects?limit={MAX_PAGE_SIZE}&include=districts,drawings"
+        pages = []
+        while url:
+            response = client.get(url)
+            response.raise_for_status()
+            pages.append(response.content)
+            cursor = response.headers.get("X-Next-Cursor")
+            url = f"/api/projects?limit={MAX_PAGE_SIZE}&include=districts,drawings&cursor={cursor}" if cursor else None
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    return pages
+
+
+def normalized(pages: List[bytes]):
+    """
+    Proyectos por id. La relación ``districts`` no tiene orden en el ORM (la
+    proyección la ordena por id) y el endpoint pagina del más reciente al más antiguo.
+    """
+    projects = sorted((p for raw in pages for p in json.loads(raw)), key=lambda p: p["id"])
+    for project in projects:
+        project["districts"].sort()
+    return projects
+
+
+def best_of(fn, engine, repeat: int):
+    best, output = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn(engine)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=1.5)
+    args = parser.parse_args(argv)
+    response_cache.response_cache = None   # cada repetición debe llegar al endpoint
+    fastapi.routing.serialize_response = counting_serialize_response
+
+    encoder = "orjson" if serialization.orjson is not None else "json"
+    print(f"codificador: {encoder}\n")
+    print(f"{'proyectos':>10} {'anterior ms':>12} {'endpoint ms':>12} {'aceleración':>12} {'MB':>7}")
+    failed = False
+    for size in args.sizes:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{path}")
+        try:
+            run_migrations(engine)
+            seed(engine, size)
+            previous_s, previous_out = best_of(previous_path, engine, args.repeat)
+            new_s, new_out = best_of(endpoint_path, engine, args.repeat)
+        finally:
+            engine.dispose()
+            os.unlink(path)
+
+        same = normalized([previous_out]) == normalized(new_out)
+        speedup = previous_s / new_s
+        ok = same and speedup >= args.min_speedup and not validations
+        failed |= not ok
+        print(f"{size:10} {previous_s * 1000:12.1f} {new_s * 1000:12.1f} {speedup:11.1f}x "
+              f"{sum(map(len, new_out)) / 1e6:7.1f}{'' if same else '  ❌ salidas distintas'}")
+    if validations:
+        print(f"\n❌ {validations} respuestas pasaron por la validación del response_model")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
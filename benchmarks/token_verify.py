@@ -0,0 +1,125 @@
+# benchmarks/token_verify.py
+"""
+Costo de verificar tokens RS256 con JWKS (backend/token_verifier.py).
+
+Genera un par de claves RSA, escribe un JWKS local (el mismo formato que
+sirve el proveedor) y mide:
+
+- la primera verificación de un token (carga del JWKS + firma RSA);
+- verificaciones repetidas del mismo token (LRU de tokens verificados);
+- verificaciones sin LRU (una operación de clave pública por petición).
+
+Además comprueba que se rechazan firmas alteradas, tokens vencidos y claves
+desconocidas, y que una rotación de claves (``kid`` nuevo) recarga el JWKS.
+
+Uso:
+    python -m benchmarks.token_verify [--iterations 20000] [--max-cached-us 50]
+
+Sale con código 1 si algo falla o si la verificación memoizada supera --max-cached-us.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from backend.token_verifier import JWKSKeySet, TokenVerifier
+
+
+def new_key(kid: str):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private, jwk
+
+
+def sign(private, kid: str, **claims) -> str:
+    payload = {"sub": "user-1", "role": "editor",
+               "exp": datetime.now(timezone.utc) + timedelta(hours=1), **claims}
+    return jwt.encode(payload, private, algorithm="RS256", headers={"kid": kid})
+
+
+def write_jwks(path: str, *jwks):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"keys": list(jwks)}, f)
+
+
+def rejects(verifier: TokenVerifier, token: str) -> bool:
+    try:
+        verifier.verify(token)
+    except jwt.InvalidTokenError:
+        return True
+    return False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--max-cached-us", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    private, jwk = new_key("k1")
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    failures = []
+    try:
+        write_jwks(path, jwk)
+        keys = JWKSKeySet(f"file://{path}", min_refresh_seconds=0)
+        verifier = TokenVerifier(keys=keys)
+        token = sign(private, "k1")
+
+        start = time.perf_counter()
+        claims = verifier.verify(token)
+        first_ms = (time.perf_counter() - start) * 1000
+        if claims.get("role") != "editor":
+            failures.append("claims incorrectas")
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            verifier.verify(token)
+        cached_us = (time.perf_counter() - start) / args.iterations * 1e6
+
+        uncached = TokenVerifier(keys=keys, cache_size=0)
+        n = max(1, args.iterations // 50)
+        start = time.perf_counter()
+        for _ in range(n):
+            uncached.verify(token)
+        uncached_us = (time.perf_counter() - start) / n * 1e6
+
+        # Rechazos: firma alterada, vencido, kid desconocido
+        header, payload, signature = token.split(".")
+        tampered = ".".join([header, payload, signature[:-4] + ("AAAA" if signature[-4:] != "AAAA" else "BBBB")])
+        if not rejects(verifier, tampered):
+            failures.append("aceptó una firma alterada")
+        if not rejects(verifier, sign(private, "k1", exp=datetime.now(timezone.utc) - timedelta(minutes=1))):
+            failures.append("aceptó un token vencido")
+        other, _ = new_key("k-otra")
+        if not rejects(verifier, sign(other, "k-otra")):
+            failures.append("aceptó una clave que no está en el JWKS")
+
+        # Rotación: el proveedor publica k2 y el verificador la toma en el primer fallo de kid
+        private2, jwk2 = new_key("k2")
+        write_jwks(path, jwk, jwk2)
+        if rejects(verifier, sign(private2, "k2")):
+            failures.append("no recargó el JWKS ante un kid nuevo")
+    finally:
+        os.unlink(path)
+
+    print(f"primera verificación (JWKS + RSA): {first_ms:8.2f} ms")
+    print(f"sin LRU (RSA por petición):        {uncached_us:8.1f} µs")
+    print(f"con LRU (token ya verificado):     {cached_us:8.2f} µs")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if cached_us > args.max_cached_us:
+        print(f"❌ la verificación memoizada supera {args.max_cached_us} µs")
+        failures.append("lento")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,18 +46,31 @@ window.Api = {
         const text = await res.text();
         if (!text) return {};
 
+        let data;
         try {
-            return JSON.parse(text);
+            data = JSON.parse(text);
         } catch (e) {
             console.error("JSON parse error on response:", text);
             return { text: text }; // Return as text if not JSON
         }
+
+        // Listas paginadas: el cursor de la página siguiente viene en un header
+        if (options.withCursor) {
+            return { items: data, nextCursor: res.headers.get("X-Next-Cursor") };
+        }
+        return data;
     },
 
     async get(url) {
         return this.request(url, { method: "GET" });
     },
 
+    // Página de una lista con cursor: { items, nextCursor }
+    async getPage(url, cursor = null) {
+        if (cursor) url += `${url.includes("?") ? "&" : "?"}cursor=${encodeURIComponent(cursor)}`;
+        return this.request(url, { method: "GET", withCursor: true });
+    },
+
     async post(url, data) {
         return this.request(url, {
             method: "POST",
@@ -74,5 +87,14 @@ window.Api = {
 
     async del(url) {
         return this.request(url, { method: "DELETE" });
+    },
+
+    // Distritos en TopoJSON (bordes compartidos una sola vez), decodificados a GeoJSON.
+    // Sin zoom se pide la geometría completa.
+    async getDistricts(zoom = null) {
+        const params = new URLSearchParams({ format: "topojson" });
+        if (zoom !== null) params.set("zoom", zoom);
+        const topology = await this.get(`/api/districts-geojson?${params}`);
+        return window.TopoJSON.toGeoJSON(topology);
     }
 };
\ No newline at end of file
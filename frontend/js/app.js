@@ -11,8 +11,8 @@ async function initApp() {
     try {
         console.log("🚀 Iniciando aplicación...");
 
-        // 1. Cargar GeoJSON
-        const geojson = await Api.get("/api/districts-geojson");
+        // 1. Cargar GeoJSON (nivel simplificado para el zoom inicial del mapa general)
+        const geojson = await Api.getDistricts(GeneralMap.INITIAL_ZOOM);
         AppState.districtsGeoJSON = geojson;
         console.log("✅ GeoJSON cargado");
 
@@ -26,12 +26,27 @@ async function initApp() {
         // 3. Inicializar UI
         if (window.UI) UI.init();
 
-        // 4. Cargar Proyectos
+        // 4. Cargar Proyectos (el cursor de cambios se toma antes: lo que cambie mientras tanto llega como delta)
+        if (window.Changes) {
+            try {
+                await Changes.init();
+            } catch (err) {
+                console.error("Sin sincronización incremental", err);
+            }
+        }
         if (window.Projects) {
+            Projects.initSearch();
             await Projects.loadProjects();
             console.log("✅ Proyectos cargados");
         }
 
+        // 5. Cambios de otros clientes (y propios): se parchea el estado local, sin recargar listas
+        if (window.Changes) {
+            if (window.Projects) Changes.onChange(Projects.applyChanges);
+            if (window.GeneralMap) Changes.onChange(GeneralMap.applyChanges);
+            Changes.start();
+        }
+
         // Custom event listener para la creación de proyectos desde el Modal
         document.addEventListener('projectModalSubmit', async function (e) {
             const data = e.detail;
@@ -44,7 +59,8 @@ async function initApp() {
                     districts: [data.distrito]
                 });
 
-                await Projects.loadProjectsForCurrentDistrict();
+                Projects.upsertProject(newProject);
+                if (window.Changes) await Changes.sync();
                 await Projects.loadProject(newProject.id);
 
                 // Notificación de éxito (Opcional, si ProjectModal lo soporta)
@@ -0,0 +1,76 @@
+// frontend/js/changes.js
+// Sincronización incremental: los deltas de /api/changes llegan por SSE (o por sondeo
+// si no hay EventSource) y cada módulo parchea su estado local en lugar de recargar.
+window.Changes = (function () {
+    const POLL_MS = 15000;
+
+    let cursor = null;
+    let source = null;
+    let pollTimer = null;
+    const listeners = [];
+
+    // Cursor antes de la carga inicial: lo que cambie mientras tanto llega como delta
+    async function init() {
+        const data = await Api.get("/api/changes");
+        cursor = data.cursor;
+    }
+
+    function onChange(fn) {
+        listeners.push(fn);
+    }
+
+    function dispatch(delta) {
+        // Un delta ya aplicado (p. ej. repetido al reconectar) se ignora
+        if (!delta.reset && delta.cursor <= cursor) return;
+        cursor = delta.cursor;
+        listeners.forEach(fn => {
+            Promise.resolve()
+                .then(() => fn(delta))
+                .catch(err => console.error("Error aplicando cambios", err));
+        });
+    }
+
+    // También sirve para aplicar de inmediato una escritura propia
+    async function poll() {
+        if (cursor === null) return;
+        try {
+            let delta;
+            do {
+                delta = await Api.get(`/api/changes?since=${cursor}`);
+                dispatch(delta);
+            } while (delta.has_more);
+        } catch (err) {
+            console.error("Error consultando cambios", err);
+        }
+    }
+
+    function start() {
+        if (cursor === null || source || pollTimer) return;
+
+        if (!window.EventSource) {
+            pollTimer = setInterval(poll, POLL_MS);
+            return;
+        }
+
+        // Al reconectar, el navegador envía Last-Event-ID y el servidor sigue desde ahí
+        source = new EventSource(`/api/changes/stream?since=${cursor}`);
+        source.addEventListener("changes", e => dispatch(JSON.parse(e.data)));
+        source.addEventListener("reset", e => dispatch(JSON.parse(e.data)));
+    }
+
+    function stop() {
+        if (source) source.close();
+        clearInterval(pollTimer);
+        source = null;
+        pollTimer = null;
+    }
+
+    return {
+        init,
+        start,
+        stop,
+        onChange,
+        sync: poll,
+        getCursor: () => cursor
+    };
+})();
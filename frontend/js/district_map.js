@@ -8,6 +8,23 @@ window.DistrictMap = (function () {
     // Guardamos las capas de los bordes blancos para poder limpiarlas
     let activeBorderLayers = [];
 
+    // AppState.districtsGeoJSON viene simplificado para el mapa general;
+    // la vista de detalle usa la geometría completa (se pide una sola vez).
+    let detailGeoJSON = null;
+    let focusRequest = 0;
+
+    async function getDetailGeoJSON() {
+        if (!detailGeoJSON) {
+            try {
+                detailGeoJSON = await Api.getDistricts();
+            } catch (err) {
+                console.error("Error cargando geometría completa de distritos", err);
+                return AppState.districtsGeoJSON;
+            }
+        }
+        return detailGeoJSON;
+    }
+
     function init() {
         map = L.map("map-detail", {
             center: [-12.0464, -77.0428],
@@ -71,9 +88,11 @@ window.DistrictMap = (function () {
     // ---------------------------------------------------------
     //  ENFOQUE Y MÁSCARA (Soporte Multiselect)
     // ---------------------------------------------------------
-    function focusOnSelectedDistrict() {
+    async function focusOnSelectedDistrict() {
+        const requestId = ++focusRequest;
         const rawSelection = AppState.selectedDistrict;
-        const geo = AppState.districtsGeoJSON;
+        const geo = rawSelection ? await getDetailGeoJSON() : null;
+        if (requestId !== focusRequest) return; // hubo otra selección mientras cargaba
 
         // Limpiar capas anteriores
         activeBorderLayers.forEach(l => map.removeLayer(l));
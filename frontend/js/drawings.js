@@ -3,6 +3,10 @@ window.Drawings = (function () {
 
     let selectedLayer = null;
 
+    // Cambios en la capa de edición que aún no se guardaron (los deltas remotos no la repintan)
+    let unsavedEdits = false;
+    const markUnsaved = () => { unsavedEdits = true; };
+
     // Helper para notificaciones (consistente con el resto de la app)
     function notify(message, type = 'success') {
         if (window.ProjectModal && typeof window.ProjectModal.showNotification === 'function') {
@@ -28,6 +32,10 @@ window.Drawings = (function () {
         // 🟢 Listener global en los mapas para deseleccionar al hacer clic afuera
         if (window.mapOverview) window.mapOverview.on('click', deselectLayer);
         if (window.mapDetail) window.mapDetail.on('click', deselectLayer);
+
+        if (window.mapDetail && L.Draw) {
+            window.mapDetail.on([L.Draw.Event.CREATED, L.Draw.Event.EDITED, L.Draw.Event.DELETED].join(" "), markUnsaved);
+        }
     }
 
     function deselectLayer() {
@@ -64,6 +72,7 @@ window.Drawings = (function () {
         else if (e.key === 'ArrowRight') newLng += step;
 
         e.preventDefault();
+        markUnsaved();
         selectedLayer.setLatLng([newLat, newLng]);
         updateCoordinateEditor(newLat, newLng);
 
@@ -111,11 +120,19 @@ window.Drawings = (function () {
         }
     }
 
+    function setDrawingId(layer, drawingId) {
+        layer.feature = layer.feature || { type: "Feature", properties: {} };
+        layer.feature.properties = { ...layer.feature.properties, drawing_id: drawingId };
+    }
+
     function renderProjects(projects, targetLayer, options = {}) {
         if (!targetLayer) return;
 
         const { clear = false, highlightId = null } = options;
-        if (clear) targetLayer.clearLayers();
+        if (clear) {
+            targetLayer.clearLayers();
+            if (targetLayer === window.DistrictMap?.getDrawingLayer()) unsavedEdits = false;
+        }
 
         projects.forEach(p => {
             const isHighlighted = p.id === highlightId;
@@ -166,6 +183,9 @@ window.Drawings = (function () {
                     // extraemos los sub-layers para que Leaflet.draw los reconozca individualmente.
                     if (targetLayer instanceof L.FeatureGroup) {
                         geoLayer.eachLayer(layer => {
+                            // Recordar el id guardado: el lote solo reescribe lo que cambió
+                            setDrawingId(layer, d.id);
+
                             // Copiar el tooltip a la subcapa si existe
                             if (geoLayer.getTooltip()) {
                                 layer.bindTooltip(geoLayer.getTooltip().getContent(), geoLayer.options);
@@ -191,6 +211,7 @@ window.Drawings = (function () {
 
                                 // Sincronizar arrastre con el panel de coordenadas
                                 layer.on('dragstart', () => selectLayer(layer));
+                                layer.on('dragend', markUnsaved);
                                 layer.on('drag', (e) => {
                                     const ll = e.target.getLatLng();
                                     updateCoordinateEditor(ll.lat, ll.lng);
@@ -228,16 +249,18 @@ window.Drawings = (function () {
         });
     }
 
+    // Proyecto (con sus dibujos) resaltado en el mapa de detalle
+    function showProject(project) {
+        const detailLayer = window.DistrictMap?.getDrawingLayer();
+        if (detailLayer) {
+            renderProjects([project], detailLayer, { clear: true, highlightId: project.id });
+        }
+    }
+
     async function loadProjectDrawings(projectId) {
         try {
             const project = await Api.get(`/api/projects/${projectId}`);
-            if (!project) return;
-
-            const detailLayer = window.DistrictMap?.getDrawingLayer();
-            if (detailLayer) {
-                renderProjects([project], detailLayer, { clear: true, highlightId: projectId });
-            }
-
+            if (project) showProject(project);
         } catch (err) {
             console.error(err);
         }
@@ -270,8 +293,8 @@ window.Drawings = (function () {
 
         // 3. Guardado
         try {
-            // Usamos el endpoint Batch que creamos en el backend
-            // El batch endpoint REEMPLAZA todos los dibujos del proyecto.
+            // El batch endpoint REEMPLAZA el set de dibujos del proyecto, pero solo
+            // escribe lo que cambió (por id o por contenido).
             const payload = {
                 drawings: layersGeoJSON.features.map(feature => {
                     // Limpiamos propiedades extras que añade Leaflet al exportar
@@ -282,21 +305,27 @@ window.Drawings = (function () {
                     };
 
                     return {
+                        id: feature.properties?.drawing_id ?? null,
                         geojson: cleanFeature,
                         drawing_type: feature.geometry.type.toLowerCase()
                     };
                 })
             };
 
-            await Api.post(`/api/projects/${project.id}/drawings/batch`, payload);
+            const result = await Api.post(`/api/projects/${project.id}/drawings/batch`, payload);
 
-            notify(`Dibujos guardados exitosamente en "${project.name}"`, "success");
-
-            // Opcional: Recargar el proyecto en el estado local si es necesario
-            if (window.Projects && typeof window.Projects.loadProjects === 'function') {
-                await window.Projects.loadProjects();
+            // Los ids vuelven en el orden del lote (mismo orden que las capas)
+            if (Array.isArray(result.ids)) {
+                drawingLayer.getLayers().forEach((layer, i) => setDrawingId(layer, result.ids[i]));
             }
 
+            // Lo guardado ya es el estado del servidor; las listas se actualizan con el delta
+            if (drawingLayer === window.DistrictMap?.getDrawingLayer()) unsavedEdits = false;
+
+            notify(`Dibujos guardados exitosamente en "${project.name}"`, "success");
+            window.GeneralMap?.refreshDrawingTiles();
+            window.Changes?.sync();
+
         } catch (err) {
             console.error(err);
             if (!err.message.includes('Auth Error')) {
@@ -307,7 +336,10 @@ window.Drawings = (function () {
 
     return {
         init,
+        getStatusColor,
+        showProject,
         loadProjectDrawings,
+        hasUnsavedEdits: () => unsavedEdits,
         saveCurrentDrawings,
         renderProjects
     };
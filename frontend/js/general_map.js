@@ -2,11 +2,24 @@
 window.GeneralMap = (function () {
     let map = null;
     let drawingLayer = null;
+    let drawingTiles = null;
+    let clusterLayer = null;
     let tileLayer = null;
     const districtLayers = {}; 
     
     const selectedDistricts = new Set();
 
+    // Niveles de detalle del backend (backend/district_lod.py: LOD_ZOOMS).
+    // Por encima del último nivel se pide la geometría completa.
+    const INITIAL_ZOOM = 11;
+    const LOD_ZOOMS = [9, 11, 13, 15];
+    let currentLod = null;
+    let lodRequest = 0;
+
+    // Hasta este zoom se dibujan clusters (GET /api/projects/clusters) en lugar de las geometrías
+    const CLUSTER_MAX_ZOOM = 13;
+    let clusterRequest = 0;
+
     const DEFAULT_STYLE = {
         color: "#6B7280",
         weight: 2,
@@ -14,6 +27,12 @@ window.GeneralMap = (function () {
         opacity: 1
     };
 
+    // Coropleta: total de proyectos por distrito (GET /api/districts/stats, una sola petición)
+    const CHOROPLETH_COLOR = "#00B4D8";
+    const CHOROPLETH_MAX_OPACITY = 0.45;
+    let districtTotals = {};
+    let maxDistrictTotal = 0;
+
     const SELECTED_STYLE = {
         color: "#58a6ff",
         weight: 4,
@@ -25,7 +44,7 @@ window.GeneralMap = (function () {
     function init(districtsGeoJSON) {
         map = L.map("map-overview", {
             center: [-12.0464, -77.0428],
-            zoom: 11,
+            zoom: INITIAL_ZOOM,
             zoomControl: true
         });
 
@@ -33,13 +52,21 @@ window.GeneralMap = (function () {
         
         // 🟢 FIX: Llamamos a la función de setup
         setupDrawingLayer();
+        setupDrawingTiles();
+        setupClusterLayer();
         
         loadDistricts(districtsGeoJSON);
+        currentLod = lodForZoom(INITIAL_ZOOM);
+        refreshDistrictStats();
 
         map.on('click', (e) => {
             deselectAll();
         });
 
+        map.on('zoomend', refreshDistrictDetail);
+        map.on('moveend', refreshClusters);
+        refreshClusters();
+
         window.mapOverview = map;
     }
 
@@ -53,6 +80,107 @@ window.GeneralMap = (function () {
         map.addLayer(drawingLayer);
     }
 
+    // Dibujos de todos los proyectos como teselas vectoriales: solo se piden las teselas visibles
+    function setupDrawingTiles() {
+        if (!L.vectorGrid) return;
+
+        drawingTiles = L.vectorGrid.protobuf("/api/tiles/{z}/{x}/{y}.mvt", {
+            rendererFactory: L.canvas.tile,
+            interactive: true,
+            maxNativeZoom: 19,
+            getFeatureId: f => f.properties.drawing_id,
+            vectorTileLayerStyles: {
+                // Los bordes de distrito ya se dibujan como GeoJSON (son interactivos)
+                districts: [],
+                drawings: props => {
+                    const color = window.Drawings ? Drawings.getStatusColor(props.status) : "#00B4D8";
+                    return { color, weight: 3, opacity: 1, fill: true, fillColor: color, fillOpacity: 0.2, radius: 6 };
+                }
+            }
+        });
+
+        drawingTiles.on("click", e => {
+            const props = e.layer.properties;
+            L.DomEvent.stopPropagation(e);
+            L.popup()
+                .setLatLng(e.latlng)
+                .setContent(`<strong>${props.name}</strong><br>${props.status}`)
+                .openOn(map);
+        });
+
+        // Se agrega al mapa solo por encima de CLUSTER_MAX_ZOOM (ver refreshClusters)
+    }
+
+    // Tras guardar/borrar dibujos: volver a pedir las teselas visibles (el ETag evita descargas inútiles)
+    function refreshDrawingTiles() {
+        if (drawingTiles) drawingTiles.redraw();
+    }
+
+    /* ---------------------------------------------------------
+       CLUSTERS: conteos por celda a zoom bajo
+    --------------------------------------------------------- */
+    function setupClusterLayer() {
+        clusterLayer = L.layerGroup().addTo(map);
+    }
+
+    async function refreshClusters() {
+        const zoom = map.getZoom();
+        const showClusters = zoom <= CLUSTER_MAX_ZOOM;
+
+        if (drawingTiles) {
+            if (showClusters && map.hasLayer(drawingTiles)) map.removeLayer(drawingTiles);
+            if (!showClusters && !map.hasLayer(drawingTiles)) drawingTiles.addTo(map);
+        }
+
+        const requestId = ++clusterRequest;
+        if (!showClusters) {
+            clusterLayer.clearLayers();
+            return;
+        }
+
+        const b = map.getBounds().pad(0.25);
+        const bbox = [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].map(v => v.toFixed(5)).join(",");
+        try {
+            const data = await Api.get(`/api/projects/clusters?zoom=${zoom}&bbox=${bbox}`);
+            if (requestId !== clusterRequest) return; // llegó una respuesta más nueva
+
+            clusterLayer.clearLayers();
+            data.clusters.forEach(cluster => clusterLayer.addLayer(clusterMarker(cluster)));
+        } catch (err) {
+            console.error("Error cargando clusters de proyectos", err);
+        }
+    }
+
+    function clusterMarker(cluster) {
+        // Color del estado con más proyectos; tamaño según el conteo
+        const [status] = Object.entries(cluster.statuses).sort((a, b) => b[1] - a[1])[0];
+        const color = window.Drawings ? Drawings.getStatusColor(status) : "#00B4D8";
+        const size = 26 + Math.min(22, Math.round(Math.log2(cluster.count) * 4));
+
+        const marker = L.marker([cluster.lat, cluster.lon], {
+            icon: L.divIcon({
+                className: "project-cluster",
+                html: `<span style="background:${color}">${cluster.count}</span>`,
+                iconSize: [size, size]
+            })
+        });
+
+        const breakdown = Object.entries(cluster.statuses).map(([s, n]) => `${s}: ${n}`).join("<br>");
+        marker.bindTooltip(breakdown, { direction: "top", className: "custom-tooltip" });
+
+        marker.on("click", e => {
+            L.DomEvent.stopPropagation(e);
+            if (cluster.count === 1) {
+                // Un solo proyecto: acercarse hasta ver su geometría
+                map.setView([cluster.lat, cluster.lon], Math.max(map.getZoom() + 2, CLUSTER_MAX_ZOOM + 1));
+            } else {
+                const [west, south, east, north] = cluster.bbox;
+                map.fitBounds([[south, west], [north, east]]);
+            }
+        });
+        return marker;
+    }
+
     function setBaseLayer(style) {
         if (tileLayer) map.removeLayer(tileLayer);
 
@@ -125,6 +253,63 @@ window.GeneralMap = (function () {
         });
     }
 
+    /* ---------------------------------------------------------
+       NIVEL DE DETALLE: cambiar la geometría según el zoom
+    --------------------------------------------------------- */
+    function lodForZoom(zoom) {
+        const level = LOD_ZOOMS.find(z => zoom <= z);
+        return level === undefined ? "full" : level;
+    }
+
+    async function refreshDistrictDetail() {
+        const lod = lodForZoom(map.getZoom());
+        if (lod === currentLod) return;
+        currentLod = lod;
+
+        const requestId = ++lodRequest;
+        try {
+            const geojson = await Api.getDistricts(lod === "full" ? null : lod);
+            if (requestId !== lodRequest) return; // llegó una respuesta más nueva
+
+            geojson.features.forEach(feature => {
+                const layer = districtLayers[feature.properties.distrito];
+                if (!layer) return;
+                layer.clearLayers();
+                layer.addData(feature);
+            });
+            updateVisuals();
+        } catch (err) {
+            console.error("Error cargando nivel de detalle de distritos", err);
+        }
+    }
+
+    /* ---------------------------------------------------------
+       COROPLETA: proyectos por distrito
+    --------------------------------------------------------- */
+    async function refreshDistrictStats() {
+        try {
+            const stats = await Api.get("/api/districts/stats");
+            districtTotals = {};
+            Object.entries(stats.districts || {}).forEach(([name, s]) => {
+                districtTotals[name.toUpperCase()] = s.total;
+            });
+            maxDistrictTotal = Math.max(0, ...Object.values(districtTotals));
+            updateVisuals();
+        } catch (err) {
+            console.error("Error cargando estadísticas de distritos", err);
+        }
+    }
+
+    function districtStyle(name) {
+        const total = districtTotals[name.toUpperCase()] || 0;
+        if (!total || !maxDistrictTotal) return DEFAULT_STYLE;
+        return {
+            ...DEFAULT_STYLE,
+            fillColor: CHOROPLETH_COLOR,
+            fillOpacity: 0.08 + (CHOROPLETH_MAX_OPACITY - 0.08) * total / maxDistrictTotal
+        };
+    }
+
     function toggleDistrict(distrito) {
         if (selectedDistricts.has(distrito)) {
             selectedDistricts.delete(distrito);
@@ -154,7 +339,7 @@ window.GeneralMap = (function () {
                 layer.setStyle(SELECTED_STYLE);
                 layer.bringToFront();
             } else {
-                layer.setStyle(DEFAULT_STYLE);
+                layer.setStyle(districtStyle(name));
                 layer.bringToBack(); 
             }
         });
@@ -196,12 +381,31 @@ window.GeneralMap = (function () {
         return drawingLayer;
     }
 
+    // Deltas de /api/changes: teselas, clusters y coropleta se vuelven a pedir, agrupando ráfagas
+    // (el ETag de cada tesela evita descargar las que no cambiaron)
+    let changesTimer = null;
+    function applyChanges(delta) {
+        const touched = delta.reset || delta.projects.length || delta.drawings.length ||
+            delta.deleted.projects.length || delta.deleted.drawings.length;
+        if (!touched) return;
+        clearTimeout(changesTimer);
+        changesTimer = setTimeout(() => {
+            refreshDrawingTiles();
+            refreshClusters();
+            refreshDistrictStats();
+        }, 1000);
+    }
+
     return {
+        INITIAL_ZOOM,
         init,
         setBaseLayer,
         toggleDistrict, 
         deselectAll,
         getDrawingLayer,
+        refreshDrawingTiles,
+        refreshDistrictStats,
+        applyChanges,
         districtLayers
     };
 })();
\ No newline at end of file
@@ -2,6 +2,22 @@
 window.Projects = (function () {
     let currentProject = null;
 
+    // Lista paginada: solo los campos de la tarjeta, sin dibujos
+    const LIST_URL = "/api/projects?fields=id,name,description,status,created_at&include=districts";
+    let listCursor = null;
+
+    // Búsqueda de texto completo: con texto en la caja la lista muestra resultados de /api/search
+    const SEARCH_PAGE_SIZE = 30;
+    let searchQuery = "";
+    let searchTimer = null;
+
+    // Estado local de las listas: los deltas de /api/changes lo parchean sin recargar
+    const listProjects = new Map();     // tarjetas de la pestaña Proyectos (sin búsqueda)
+    let districtProjects = null;        // proyectos (con dibujos) de la pestaña Detalle
+    let districtKey = null;             // distrito con el que se cargó districtProjects
+    let districtHighlightId = null;
+    let detailView = null;              // qué muestra el mapa de detalle: "district" | "project"
+
     /* ---------------------------------------------------------
        HELPER: NOTIFICATIONS
     --------------------------------------------------------- */
@@ -16,7 +32,73 @@ window.Projects = (function () {
     /* ---------------------------------------------------------
        LOAD ALL PROJECTS (Projects tab)
     --------------------------------------------------------- */
-    async function loadProjects() {
+    function renderProjectCard(p) {
+        return `
+                <div class="project-card ${currentProject?.id === p.id ? "active" : ""}" 
+                     data-id="${p.id}">
+                     
+                    <div class="project-name">${escapeHTML(p.name)}</div>
+
+                    <div class="project-description">
+                        ${escapeHTML(p.description || "Sin descripción")}
+                    </div>
+
+                    <div class="project-meta">
+                        <span class="status-badge ${p.status}">
+                            ${getStatusText(p.status)}
+                        </span>
+                        <span>${formatDate(p.created_at)}</span>
+                    </div>
+
+                    <div class="district-badges">
+                        ${p.districts.map(d => `<span class="district-badge">${d}</span>`).join("")}
+                    </div>
+
+                </div>
+            `;
+    }
+
+    // Tarjeta de resultado: el HTML de título y fragmento ya viene escapado por el servidor
+    function renderSearchCard(r) {
+        const isAnnotation = r.kind === "annotation";
+        return `
+                <div class="project-card search-result ${currentProject?.id === r.project_id ? "active" : ""}"
+                     data-id="${r.project_id}">
+
+                    <div class="project-name">${isAnnotation ? escapeHTML(r.project_name) : r.title_html}</div>
+
+                    <div class="project-description">
+                        ${isAnnotation ? `<strong>${r.title_html}</strong> — ` : ""}${r.snippet_html || "Sin descripción"}
+                    </div>
+
+                    <div class="project-meta">
+                        <span>${isAnnotation ? "Anotación" : "Proyecto"}</span>
+                    </div>
+
+                </div>
+            `;
+    }
+
+    async function searchPage(offset) {
+        const params = new URLSearchParams({ q: searchQuery, limit: SEARCH_PAGE_SIZE, offset: offset || 0 });
+        const data = await Api.get(`/api/search?${params}`);
+        return { items: data.results, nextCursor: data.next_offset };
+    }
+
+    function initSearch() {
+        const input = document.getElementById("project-search");
+        if (!input) return;
+        input.addEventListener("input", () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                searchQuery = input.value.trim();
+                listCursor = null;
+                loadProjects();
+            }, 250);
+        });
+    }
+
+    async function loadProjects(append = false) {
         try {
             // 1. Salvar el panel de detalles antes de regenerar la lista
             const detailsSection = document.getElementById("project-details-section");
@@ -27,10 +109,28 @@ window.Projects = (function () {
                 detailsSection.style.display = "none";
             }
 
-            const projects = await Api.get("/api/projects");
+            const searching = Boolean(searchQuery);
+            const page = searching
+                ? await searchPage(append ? listCursor : 0)
+                : await Api.getPage(LIST_URL, append ? listCursor : null);
+            const projects = page.items;
+            listCursor = page.nextCursor;
             const listDiv = document.getElementById("project-list");
 
-            if (!projects.length) {
+            if (!append) listProjects.clear();
+            if (!searching) projects.forEach(p => listProjects.set(p.id, p));
+
+            if (!append && !projects.length && searching) {
+                listDiv.innerHTML = `
+                    <div class="empty-state">
+                        <div class="empty-icon"><i data-lucide="search"></i></div>
+                        <p>Sin resultados para "${escapeHTML(searchQuery)}"</p>
+                    </div>`;
+                if (window.lucide) lucide.createIcons();
+                return;
+            }
+
+            if (!append && !projects.length) {
                 listDiv.innerHTML = `
                     <div class="empty-state">
                         <div class="empty-icon"><i data-lucide="list"></i></div>
@@ -41,33 +141,26 @@ window.Projects = (function () {
                 return;
             }
 
-            listDiv.innerHTML = projects.map(p => `
-                <div class="project-card ${currentProject?.id === p.id ? "active" : ""}" 
-                     data-id="${p.id}">
-                     
-                    <div class="project-name">${escapeHTML(p.name)}</div>
-
-                    <div class="project-description">
-                        ${escapeHTML(p.description || "Sin descripción")}
-                    </div>
-
-                    <div class="project-meta">
-                        <span class="status-badge ${p.status}">
-                            ${getStatusText(p.status)}
-                        </span>
-                        <span>${formatDate(p.created_at)}</span>
-                    </div>
-
-                    <div class="district-badges">
-                        ${p.districts.map(d => `<span class="district-badge">${d}</span>`).join("")}
-                    </div>
-
-                </div>
-            `).join("");
+            document.getElementById("project-list-more")?.remove();
+            const cardsHTML = projects.map(searching ? renderSearchCard : renderProjectCard).join("");
+            if (append) {
+                listDiv.insertAdjacentHTML("beforeend", cardsHTML);
+            } else {
+                listDiv.innerHTML = cardsHTML;
+            }
 
-            document.querySelectorAll(".project-card").forEach(el =>
-                el.addEventListener("click", () => loadProject(el.dataset.id))
-            );
+            bindProjectCards(listDiv);
+
+            // Botón para pedir la página siguiente (si la hay)
+            if (listCursor != null) {
+                listDiv.insertAdjacentHTML("beforeend", `
+                    <button type="button" id="project-list-more" class="btn-modal btn-modal-cancel"
+                            style="grid-column: 1 / -1; justify-self: center;">
+                        Cargar más
+                    </button>`);
+                document.getElementById("project-list-more")
+                    .addEventListener("click", () => loadProjects(true));
+            }
 
             // Restaurar panel si había un proyecto abierto
             if (currentProject) {
@@ -81,6 +174,13 @@ window.Projects = (function () {
         }
     }
 
+    function bindProjectCards(listDiv) {
+        listDiv.querySelectorAll(".project-card:not([data-bound])").forEach(el => {
+            el.dataset.bound = "1";
+            el.addEventListener("click", () => loadProject(el.dataset.id));
+        });
+    }
+
     /* ---------------------------------------------------------
        GRID EXPANSION LOGIC
     --------------------------------------------------------- */
@@ -112,7 +212,8 @@ window.Projects = (function () {
         const referenceCard = cards[lastCardInRowIndex];
 
         if (lastCardInRowIndex === cards.length - 1) {
-            grid.appendChild(detailsSection);
+            // Antes del botón "Cargar más" si existe (insertBefore(x, null) = append)
+            grid.insertBefore(detailsSection, document.getElementById("project-list-more"));
         } else {
             grid.insertBefore(detailsSection, referenceCard.nextSibling);
         }
@@ -149,7 +250,8 @@ window.Projects = (function () {
             statusInput.value = "active";
             for (let i = 0; i < districtSelect.options.length; i++) districtSelect.options[i].selected = false;
 
-            await loadProjects();
+            upsertProject(newProject);
+            window.Changes?.sync();
             await loadProject(newProject.id);
 
             notify(`Proyecto "${newProject.name}" creado exitosamente`, "success");
@@ -169,40 +271,12 @@ window.Projects = (function () {
             if (card) card.classList.add("active");
 
             currentProject = await Api.get(`/api/projects/${projectId}`);
+            renderProjectDetails();
 
-            document.getElementById("current-project-info").innerHTML = `
-                <div style="display: flex; justify-content: space-between; align-items: start;">
-                    <div>
-                        <strong style="font-size: 22px;">${escapeHTML(currentProject.name)}</strong>
-                        <div style="margin-top: 8px; margin-bottom: 12px;">
-                            <span class="status-badge ${currentProject.status}">${getStatusText(currentProject.status)}</span>
-                        </div>
-                    </div>
-                    <button id="btn-edit-project-modal" class="action-btn secondary" style="width: auto; padding: 8px 12px;">
-                        <i data-lucide="edit-3"></i> Editar
-                    </button>
-                </div>
-                
-                <p style="color: #cbd5e1; line-height: 1.6;">${escapeHTML(currentProject.description || "Sin descripción")}</p>
-                
-                <div style="margin-top: 16px; font-size: 13px; color: #94a3b8;">
-                    <span><i data-lucide="calendar" style="width:14px; display:inline;"></i> ${formatDate(currentProject.created_at)}</span>
-                </div>
-            `;
-
-            document.getElementById("project-districts").innerHTML =
-                currentProject.districts
-                    .map(d => `<span class="district-badge">${d}</span>`)
-                    .join("");
-
-            // Listener para botón Editar
-            document.getElementById("btn-edit-project-modal").addEventListener("click", () => {
-                if (window.ProjectModal) {
-                    window.ProjectModal.open(currentProject);
-                }
-            });
-
-            if (window.Drawings) await Drawings.loadProjectDrawings(currentProject.id);
+            if (window.Drawings) {
+                detailView = "project";
+                Drawings.showProject(currentProject);
+            }
 
             injectDetailsPanelAfterRow(projectId);
             if (window.lucide) lucide.createIcons();
@@ -213,84 +287,127 @@ window.Projects = (function () {
         }
     }
 
+    function renderProjectDetails() {
+        document.getElementById("current-project-info").innerHTML = `
+            <div style="display: flex; justify-content: space-between; align-items: start;">
+                <div>
+                    <strong style="font-size: 22px;">${escapeHTML(currentProject.name)}</strong>
+                    <div style="margin-top: 8px; margin-bottom: 12px;">
+                        <span class="status-badge ${currentProject.status}">${getStatusText(currentProject.status)}</span>
+                    </div>
+                </div>
+                <button id="btn-edit-project-modal" class="action-btn secondary" style="width: auto; padding: 8px 12px;">
+                    <i data-lucide="edit-3"></i> Editar
+                </button>
+            </div>
+            
+            <p style="color: #cbd5e1; line-height: 1.6;">${escapeHTML(currentProject.description || "Sin descripción")}</p>
+            
+            <div style="margin-top: 16px; font-size: 13px; color: #94a3b8;">
+                <span><i data-lucide="calendar" style="width:14px; display:inline;"></i> ${formatDate(currentProject.created_at)}</span>
+            </div>
+        `;
+
+        document.getElementById("project-districts").innerHTML =
+            currentProject.districts
+                .map(d => `<span class="district-badge">${d}</span>`)
+                .join("");
+
+        // Listener para botón Editar
+        document.getElementById("btn-edit-project-modal").addEventListener("click", () => {
+            if (window.ProjectModal) {
+                window.ProjectModal.open(currentProject);
+            }
+        });
+
+        if (window.lucide) lucide.createIcons();
+    }
+
     /* ---------------------------------------------------------
        PROJECTS FOR CURRENT DISTRICT (Detail tab)
        🟢 ACTUALIZADO CON LÓGICA DE TOGGLE
     --------------------------------------------------------- */
     async function loadProjectsForCurrentDistrict(highlightId = null) {
         try {
-            let projects;
-            const listDiv = document.getElementById("district-projects-list");
-
+            districtKey = AppState.selectedDistrict;
             if (!AppState.selectedDistrict) {
-                // 🟢 Si no hay distrito, cargamos TODOS los proyectos
-                projects = await Api.get("/api/projects");
+                // 🟢 Si no hay distrito, cargamos los proyectos más recientes con sus dibujos
+                districtProjects = await Api.get("/api/projects?fields=id,name,description,status,created_at&include=drawings&limit=200");
             } else {
                 const encoded = encodeURIComponent(AppState.selectedDistrict);
-                projects = await Api.get(`/api/districts/${encoded}/projects`);
+                districtProjects = await Api.get(`/api/districts/${encoded}/projects`);
             }
+            renderDistrictProjects(highlightId);
+        } catch (err) {
+            console.error(err);
+        }
+    }
 
-            if (!projects.length) {
-                listDiv.innerHTML = `
-                    <div class="info-box" style="margin-top: 10px;">
-                        No hay proyectos ${AppState.selectedDistrict ? "en este distrito" : "disponibles"}
-                    </div>`;
+    // Lista y dibujos de la pestaña Detalle desde el estado local (sin pedir nada al servidor)
+    function renderDistrictProjects(highlightId = districtHighlightId) {
+        const projects = districtProjects || [];
+        const listDiv = document.getElementById("district-projects-list");
+        districtHighlightId = highlightId;
+        detailView = "district";
 
-                if (window.DistrictMap) window.DistrictMap.getDrawingLayer().clearLayers();
-                return;
-            }
+        if (!projects.length) {
+            listDiv.innerHTML = `
+                <div class="info-box district-empty" style="margin-top: 10px;">
+                    No hay proyectos ${AppState.selectedDistrict ? "en este distrito" : "disponibles"}
+                </div>`;
 
-            listDiv.innerHTML = projects.map(p => `
-                <div class="project-card ${highlightId === p.id ? "active" : ""}" data-id="${p.id}">
-                    <div class="project-name">${escapeHTML(p.name)}</div>
-                    <div class="project-description">${escapeHTML(p.description || "")}</div>
-                    <div class="project-meta">
-                        <span class="status-badge ${p.status}">${getStatusText(p.status)}</span>
-                    </div>
+            if (window.DistrictMap) window.DistrictMap.getDrawingLayer().clearLayers();
+            return;
+        }
+
+        listDiv.innerHTML = projects.map(p => `
+            <div class="project-card ${highlightId === p.id ? "active" : ""}" data-id="${p.id}">
+                <div class="project-name">${escapeHTML(p.name)}</div>
+                <div class="project-description">${escapeHTML(p.description || "")}</div>
+                <div class="project-meta">
+                    <span class="status-badge ${p.status}">${getStatusText(p.status)}</span>
                 </div>
-            `).join("");
+            </div>
+        `).join("");
+
+        // 🟢 Renderizar dibujos de TODOS los proyectos, resaltando el seleccionado si existe
+        if (window.Drawings) {
+            const detailLayer = window.DistrictMap?.getDrawingLayer();
+            Drawings.renderProjects(projects, detailLayer, {
+                clear: true,
+                highlightId: highlightId,
+                fitBounds: highlightId ? true : false // Solo centrar si hay selección
+            });
+        }
 
-            // 🟢 Renderizar dibujos de TODOS los proyectos, resaltando el seleccionado si existe
-            if (window.Drawings) {
-                const detailLayer = window.DistrictMap?.getDrawingLayer();
-                Drawings.renderProjects(projects, detailLayer, {
-                    clear: true,
-                    highlightId: highlightId,
-                    fitBounds: highlightId ? true : false // Solo centrar si hay selección
-                });
-            }
+        // Seleccionamos todas las tarjetas recién creadas
+        const cards = document.querySelectorAll("#district-projects-list .project-card");
+
+        cards.forEach(el => {
+
+            el.addEventListener("click", () => {
+                const projectId = parseInt(el.dataset.id);
+                const isAlreadyActive = el.classList.contains("active");
 
-            // Seleccionamos todas las tarjetas recién creadas
-            const cards = document.querySelectorAll("#district-projects-list .project-card");
-
-            cards.forEach(el => {
-
-                el.addEventListener("click", async () => {
-                    const projectId = parseInt(el.dataset.id);
-                    const isAlreadyActive = el.classList.contains("active");
-
-                    if (isAlreadyActive) {
-                        // --- CASO DESELECCIONAR ---
-                        console.log("Proyecto deseleccionado");
-                        await loadProjectsForCurrentDistrict(null);
-                    } else {
-                        // --- CASO SELECCIONAR ---
-                        console.log("Seleccionando proyecto:", projectId);
-                        await loadProjectsForCurrentDistrict(projectId);
-                    }
-                });
-
-                // 🟢 2. DOBLE CLICK: Ir a Gestión (Se mantiene igual)
-                el.addEventListener("dblclick", () => {
-                    loadProject(el.dataset.id);
-                    if (window.UI) UI.switchTab("projects");
-                });
+                if (isAlreadyActive) {
+                    // --- CASO DESELECCIONAR ---
+                    console.log("Proyecto deseleccionado");
+                    renderDistrictProjects(null);
+                } else {
+                    // --- CASO SELECCIONAR ---
+                    console.log("Seleccionando proyecto:", projectId);
+                    renderDistrictProjects(projectId);
+                }
             });
 
-            if (window.lucide) lucide.createIcons();
-        } catch (err) {
-            console.error(err);
-        }
+            // 🟢 2. DOBLE CLICK: Ir a Gestión (Se mantiene igual)
+            el.addEventListener("dblclick", () => {
+                loadProject(el.dataset.id);
+                if (window.UI) UI.switchTab("projects");
+            });
+        });
+
+        if (window.lucide) lucide.createIcons();
     }
 
     /* ---------------------------------------------------------
@@ -299,8 +416,10 @@ window.Projects = (function () {
     async function createProjectFromModal(projectData) {
         try {
             const newProject = await Api.post("/api/projects", projectData);
+            window.GeneralMap?.refreshDistrictStats();
             if (window.UI) UI.switchTab("projects");
-            await loadProjects();
+            upsertProject(newProject);
+            window.Changes?.sync();
             await loadProject(newProject.id);
             return newProject;
         } catch (err) {
@@ -311,9 +430,16 @@ window.Projects = (function () {
 
     async function updateProjectFromModal(projectId, projectData) {
         try {
-            const updatedProject = await Api.put(`/ api / projects / ${projectId} `, projectData);
-            await loadProjects();
-            await loadProject(updatedProject.id);
+            const updatedProject = await Api.put(`/api/projects/${projectId}`, projectData);
+            window.GeneralMap?.refreshDrawingTiles();
+            window.GeneralMap?.refreshDistrictStats();
+            // La respuesta ya trae el proyecto completo: se parchea sin volver a pedirlo
+            if (currentProject?.id === updatedProject.id) {
+                currentProject = updatedProject;
+                renderProjectDetails();
+            }
+            upsertProject(updatedProject);
+            window.Changes?.sync();
             return updatedProject;
         } catch (err) {
             console.error('Error updating project:', err);
@@ -336,15 +462,20 @@ window.Projects = (function () {
         const deletedName = currentProject.name;
 
         try {
-            await Api.del(`/ api / projects / ${deletedId} `);
+            await Api.del(`/api/projects/${deletedId}`);
 
-            // Importante: Limpiar estado ANTES de recargar
+            // Importante: Limpiar estado ANTES de quitar las tarjetas
             currentProject = null;
             closeProjectDetails();
 
-            await loadProjects();
+            removeProject(deletedId);
+            window.Changes?.sync();
 
-            if (window.GeneralMap) window.GeneralMap.getDrawingLayer().clearLayers();
+            if (window.GeneralMap) {
+                window.GeneralMap.getDrawingLayer().clearLayers();
+                window.GeneralMap.refreshDrawingTiles();
+                window.GeneralMap.refreshDistrictStats();
+            }
             if (window.DistrictMap) window.DistrictMap.getDrawingLayer().clearLayers();
 
             notify(`Proyecto "${deletedName}" eliminado`, "success");
@@ -359,6 +490,139 @@ window.Projects = (function () {
         }
     }
 
+    /* ---------------------------------------------------------
+       SINCRONIZACIÓN INCREMENTAL (deltas de /api/changes)
+    --------------------------------------------------------- */
+    function isNewer(project, loaded) {
+        const created = new Date(project.created_at).getTime();
+        return [...loaded].every(p => !p.created_at || new Date(p.created_at).getTime() <= created);
+    }
+
+    // Alta o cambio de un proyecto en la lista de la pestaña Proyectos
+    function upsertProject(project) {
+        const listDiv = document.getElementById("project-list");
+        if (!listDiv || searchQuery) return;  // los resultados de búsqueda van por relevancia
+
+        const card = listDiv.querySelector(`.project-card[data-id="${project.id}"]`);
+        if (card) {
+            listProjects.set(project.id, project);
+            card.outerHTML = renderProjectCard(project);
+        } else if (isNewer(project, listProjects.values())) {
+            // Más reciente que todo lo cargado: va primero (proyectos viejos aparecen al paginar)
+            listProjects.set(project.id, project);
+            listDiv.querySelector(".empty-state")?.remove();
+            listDiv.insertAdjacentHTML("afterbegin", renderProjectCard(project));
+            if (currentProject) setTimeout(() => injectDetailsPanelAfterRow(currentProject.id), 0);
+        }
+        bindProjectCards(listDiv);
+    }
+
+    function removeProject(projectId) {
+        listProjects.delete(projectId);
+        document.querySelector(`#project-list .project-card[data-id="${projectId}"]`)?.remove();
+        if (currentProject?.id === projectId) closeProjectDetails();
+    }
+
+    function inSelectedDistrict(project) {
+        if (!AppState.selectedDistrict) return true;
+        const target = AppState.selectedDistrict.toUpperCase();
+        return project.districts.some(d => d.toUpperCase() === target);
+    }
+
+    function patchDrawings(project, delta) {
+        const removed = new Set(delta.deleted.drawings.filter(t => t.project_id === project.id).map(t => t.id));
+        const changed = delta.drawings.filter(d => d.project_id === project.id);
+        if (!removed.size && !changed.length) return false;
+
+        changed.forEach(d => removed.add(d.id));
+        project.drawings = (project.drawings || [])
+            .filter(d => !removed.has(d.id))
+            .concat(changed)
+            .sort((a, b) => a.id - b.id);
+        return true;
+    }
+
+    // Devuelve true si cambió algo visible en la pestaña Detalle
+    async function patchDistrictProjects(delta) {
+        if (!districtProjects || AppState.selectedDistrict !== districtKey) return false;
+
+        let changed = false;
+        const byId = new Map(districtProjects.map(p => [p.id, p]));
+        const entered = [];
+        delta.projects.forEach(p => {
+            const known = byId.get(p.id);
+            if (!inSelectedDistrict(p)) {
+                if (known) {
+                    byId.delete(p.id);
+                    changed = true;
+                }
+            } else if (known) {
+                byId.set(p.id, { ...known, ...p });
+                changed = true;
+            } else if (AppState.selectedDistrict) {
+                entered.push(p.id);  // entró al distrito: sus dibujos anteriores no vienen en el delta
+            } else if (isNewer(p, byId.values())) {
+                byId.set(p.id, { ...p, drawings: [] });
+                changed = true;
+            }
+        });
+        delta.deleted.projects.forEach(t => {
+            if (byId.delete(t.id)) changed = true;
+        });
+
+        for (const projectId of entered) {
+            try {
+                byId.set(projectId, await Api.get(`/api/projects/${projectId}`));
+                changed = true;
+            } catch (err) {
+                console.error(err);
+            }
+        }
+        byId.forEach(p => {
+            if (patchDrawings(p, delta)) changed = true;
+        });
+
+        if (changed) {
+            // Los nuevos primero; el resto conserva su orden
+            const previous = new Set(districtProjects.map(p => p.id));
+            const fresh = [...byId.values()].filter(p => !previous.has(p.id));
+            districtProjects = fresh.concat(districtProjects.filter(p => byId.has(p.id)).map(p => byId.get(p.id)));
+        }
+        return changed;
+    }
+
+    async function applyChanges(delta) {
+        if (delta.reset) {
+            await loadProjects();
+            if (districtProjects) await loadProjectsForCurrentDistrict(districtHighlightId);
+            return;
+        }
+
+        delta.projects.forEach(upsertProject);
+        delta.deleted.projects.forEach(t => removeProject(t.id));
+
+        let currentDrawingsChanged = false;
+        if (currentProject) {
+            const updated = delta.projects.find(p => p.id === currentProject.id);
+            if (updated) {
+                currentProject = { ...currentProject, ...updated };
+                renderProjectDetails();
+            }
+            currentDrawingsChanged = patchDrawings(currentProject, delta);
+        }
+        const districtChanged = await patchDistrictProjects(delta);
+
+        // No pisar dibujos sin guardar: el estado queda parcheado y se verá en el próximo render
+        if (window.Drawings?.hasUnsavedEdits()) return;
+        // (la lista solo se repinta si sigue a la vista: otros paneles la limpian o reemplazan)
+        const listShown = document.querySelector("#district-projects-list .project-card, #district-projects-list .district-empty");
+        if (detailView === "district" && districtChanged && listShown) {
+            renderDistrictProjects();
+        } else if (detailView === "project" && currentDrawingsChanged && window.Drawings) {
+            Drawings.showProject(currentProject);
+        }
+    }
+
     /* ---------------------------------------------------------
        Helpers
     --------------------------------------------------------- */
@@ -440,19 +704,23 @@ window.Projects = (function () {
 
         // D. Resaltar en el mapa si se solicita
         if (updateMap && window.Drawings && currentProject) {
-            // Nota: Aquí preferimos Drawings.loadProjectDrawings ya que maneja el resaltado y centrado
-            await Drawings.loadProjectDrawings(projectId);
+            // Nota: Drawings.showProject maneja el resaltado y centrado (el proyecto ya trae sus dibujos)
+            detailView = "project";
+            Drawings.showProject(currentProject);
         }
     }
 
     return {
         loadProjects,
+        initSearch,
         createProject,
         createProjectFromModal,
         updateProjectFromModal,
         loadProject,
         loadProjectsForCurrentDistrict,
         deleteCurrentProject,
+        upsertProject,
+        applyChanges,
         getCurrentProject: () => currentProject,
 
         viewProjectOnMap,
@@ -0,0 +1,59 @@
+// frontend/js/topojson.js
+// Decodificador mínimo de TopoJSON (arcos compartidos + coordenadas cuantizadas
+// en deltas) a un FeatureCollection GeoJSON, el formato que usan los mapas.
+window.TopoJSON = (function () {
+
+    function decodeArcs(topology) {
+        const t = topology.transform;
+        return topology.arcs.map(arc => {
+            let x = 0, y = 0;
+            return arc.map(([dx, dy]) => {
+                if (!t) return [dx, dy];
+                x += dx;
+                y += dy;
+                return [x * t.scale[0] + t.translate[0], y * t.scale[1] + t.translate[1]];
+            });
+        });
+    }
+
+    function ring(refs, arcs) {
+        const points = [];
+        refs.forEach(ref => {
+            const arc = ref >= 0 ? arcs[ref] : arcs[~ref].slice().reverse();
+            arc.forEach((p, i) => {
+                if (i > 0 || points.length === 0) points.push(p);
+            });
+        });
+        return points;
+    }
+
+    function geometry(geom, arcs) {
+        if (geom.type === "Polygon") {
+            return { type: "Polygon", coordinates: geom.arcs.map(r => ring(r, arcs)) };
+        }
+        if (geom.type === "MultiPolygon") {
+            return { type: "MultiPolygon", coordinates: geom.arcs.map(p => p.map(r => ring(r, arcs))) };
+        }
+        return null;
+    }
+
+    function toGeoJSON(topology, objectName) {
+        const name = objectName || Object.keys(topology.objects)[0];
+        const arcs = decodeArcs(topology);
+
+        return {
+            type: "FeatureCollection",
+            features: topology.objects[name].geometries.map(geom => {
+                const feature = {
+                    type: "Feature",
+                    properties: geom.properties || {},
+                    geometry: geometry(geom, arcs)
+                };
+                if (geom.id !== undefined) feature.id = geom.id;
+                return feature;
+            })
+        };
+    }
+
+    return { toGeoJSON };
+})();
@@ -326,13 +326,9 @@ window.UI = (function () {
         try {
             const encoded = encodeURIComponent(districtName);
             // IMPORTANTE: Este endpoint ya debe soportar comas gracias al fix del backend
-            const projects = await Api.get(`/api/districts/${encoded}/projects`);
-
-            const total = projects.length;
-            const active = projects.filter(p => p.status === 'active').length;
-            const inactive = projects.filter(p => p.status === 'inactive').length;
-            const completed = projects.filter(p => p.status === 'completed').length;
-            const archived = projects.filter(p => p.status === 'archived').length;
+            // Conteos agregados en la BD (GROUP BY status), sin descargar los proyectos
+            const { total, active, inactive, completed, archived } =
+                await Api.get(`/api/districts/${encoded}/stats`);
 
             statsDiv.innerHTML = `
                 <div class="district-stats-card">
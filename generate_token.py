@@ -1,6 +1,10 @@
 
 import jwt
+import os
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
 
 def generate_admin_token():
     # We use hardcoded role string to avoid import issues in this simple script
@@ -11,9 +15,9 @@ def generate_admin_token():
         "exp": datetime.utcnow() + timedelta(days=7)
     }
     
-    # Backend currently decodes with verify_signature=False, 
-    # so any key works for now. 
-    token = jwt.encode(payload, "secret-dev-key", algorithm="HS256")
+    # Firmado con SECRET_KEY: el backend lo verifica con HS256 cuando no hay
+    # AUTH_JWKS_URL (misma clave de desarrollo por defecto que backend/token_verifier.py)
+    token = jwt.encode(payload, os.getenv("SECRET_KEY", "secret-dev-key"), algorithm="HS256")
     return token
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+# tests/conftest.py
+"""
+Base SQLite temporal por test, cliente con ``get_db`` redirigido a ella y
+contador de consultas (listener ``before_cursor_execute``) y de filas leídas.
+"""
+import sqlite3
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend import response_cache, token_verifier
+from backend.database import get_db
+from backend.main import app
+from backend.migrations import run_migrations
+
+SECRET = "tests-only-hs256-secret-of-32-bytes"
+
+
+class Counter:
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.statements = []
+
+    def reset(self):
+        self.queries = 0
+        self.rows = 0
+        self.statements = []
+
+
+class CountingCursor(sqlite3.Cursor):
+    """Cuenta las filas que realmente viajan desde la BD."""
+    counter: Counter = None
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self.counter.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self.counter.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self.counter.rows += len(rows)
+        return rows
+
+
+@pytest.fixture
+def counter():
+    return Counter()
+
+
+@pytest.fixture
+def Session(tmp_path, counter):
+    cursor_class = type("Cursor", (CountingCursor,), {"counter": counter})
+
+    class Connection(sqlite3.Connection):
+        def cursor(self, factory=cursor_class):
+            return super().cursor(factory)
+
+    path = tmp_path / "tests.db"
+    engine = create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(path, factory=Connection, check_same_thread=False),
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        counter.queries += 1
+        counter.statements.append(statement)
+
+    run_migrations(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def client(Session, monkeypatch):
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Cada petición debe llegar a la BD
+    monkeypatch.setattr(response_cache, "response_cache", None)
+    monkeypatch.setattr(token_verifier, "_verifier", token_verifier.TokenVerifier(secret=SECRET))
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def headers():
+    token = jwt.encode({"sub": "tests", "role": "admin"}, SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
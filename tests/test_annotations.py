@@ -0,0 +1,22 @@
+# tests/test_annotations.py
+"""Anotaciones y el resumen por distrito."""
+
+
+def test_annotation_updates_district_last_updated(client, headers):
+    project = client.post("/api/projects", json={
+        "name": "Proyecto", "description": "", "status": "active", "districts": ["Lince"],
+    }, headers=headers).json()
+    before = client.get("/api/districts/LINCE/stats").json()["last_updated"]
+
+    response = client.post(f"/api/projects/{project['id']}/annotations", json={
+        "distrito_name": "Lince", "title": "Visita", "content": "Obra detenida",
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    updated = client.get(f"/api/projects/{project['id']}").json()["updated_at"]
+    stats = client.get("/api/districts/LINCE/stats").json()
+    assert stats["last_updated"] == updated > before
+
+    response = client.delete(f"/api/projects/{project['id']}/annotations/{response.json()['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    updated = client.get(f"/api/projects/{project['id']}").json()["updated_at"]
+    assert client.get("/api/districts/LINCE/stats").json()["last_updated"] == updated
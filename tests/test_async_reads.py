@@ -0,0 +1,89 @@
+# tests/test_async_reads.py
+"""Las lecturas asíncronas (DB_ASYNC=1) responden lo mismo que las síncronas, sin ``run_sync``."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from starlette.routing import Match
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend import district_summary, models
+from backend.database import get_async_db
+from backend.districts import resolve_ids
+from backend.routers import async_reads
+
+pytest.importorskip("aiosqlite")
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO"]
+POINT = {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [-77.03, -12.12]}}
+URLS = [
+    "/api/projects?limit=4",
+    "/api/projects?limit=4&include=districts,drawings&status=active",
+    "/api/projects?district=SAN%20ISIDRO&fields=id,name",
+    "/api/projects/1",
+    "/api/projects/999",
+    "/api/districts/MIRAFLORES/projects",
+    "/api/districts/MIRAFLORES/stats",
+    "/api/districts/MIRAFLORES,SAN%20ISIDRO/stats",
+]
+
+
+@pytest.fixture
+def async_app(Session, tmp_path, monkeypatch):
+    with Session() as db:
+        ids = resolve_ids(db, DISTRICTS)
+        for i in range(6):
+            project = models.Project(name=f"Proyecto {i}", status="active" if i % 2 else "completed")
+            project.districts = [
+                models.ProjectDistrict(distrito_name=name, district_id=ids.get(name)) for name in DISTRICTS[: i % 3 + 1]
+            ]
+            project.drawings = [models.Drawing(geojson=POINT, drawing_type="marker") for _ in range(2)]
+            db.add(project)
+        db.commit()
+        district_summary.rebuild(db)
+
+    async def forbidden_run_sync(self, fn, *args, **kwargs):
+        raise AssertionError(f"run_sync({fn.__name__})")
+
+    monkeypatch.setattr(AsyncSession, "run_sync", forbidden_run_sync)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tests.db'}")
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    reads = FastAPI()
+    reads.include_router(async_reads.projects_router, prefix="/api/projects")
+    reads.include_router(async_reads.districts_router, prefix="/api")
+    reads.dependency_overrides[get_async_db] = override_get_async_db
+    yield reads
+    asyncio.run(engine.dispose())
+
+
+async def fetch(application: FastAPI, url: str, headers=None) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=application), base_url="http://tests") as http:
+        return await http.get(url, headers=headers)
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_same_response_as_sync(client, async_app, url):
+    expected = client.get(url)
+    response = asyncio.run(fetch(async_app, url))
+    assert response.status_code == expected.status_code
+    assert response.json() == expected.json()
+    assert response.headers.get("etag") == expected.headers.get("etag")
+    assert response.headers.get("x-next-cursor") == expected.headers.get("x-next-cursor")
+
+
+def test_not_modified(client, async_app):
+    etag = client.get("/api/districts/MIRAFLORES/projects").headers["etag"]
+    response = asyncio.run(fetch(async_app, "/api/districts/MIRAFLORES/projects", {"If-None-Match": etag}))
+    assert response.status_code == 304
+
+
+def test_clusters_left_to_sync_router(async_app):
+    """Montadas antes que las síncronas, las rutas asíncronas no deben capturar /clusters."""
+    scope = {"type": "http", "method": "GET", "path": "/api/projects/clusters", "root_path": ""}
+    assert all(route.matches(scope)[0] == Match.NONE for route in async_app.routes)
@@ -0,0 +1,79 @@
+# tests/test_change_log.py
+"""Retención de ``change_log``: poda al escribir, compactación y ``reset`` para cursores podados."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from backend import change_log, models
+
+
+@pytest.fixture
+def small_log(monkeypatch):
+    monkeypatch.setattr(change_log, "PRUNE_EVERY", 4)
+    monkeypatch.setattr(change_log, "MAX_ENTRIES", 6)
+
+
+def create_project(client, headers, name: str) -> int:
+    response = client.post("/api/projects", json={"name": name, "status": "active", "districts": ["MIRAFLORES"]},
+                           headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def rename(client, headers, project_id: int, name: str):
+    response = client.put(f"/api/projects/{project_id}",
+                          json={"name": name, "status": "active", "districts": ["MIRAFLORES"]}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_log_is_pruned_and_compacted_on_write(client, headers, Session, small_log):
+    project_id = create_project(client, headers, "Editado")
+    for i in range(12):
+        rename(client, headers, project_id, f"Editado {i}")
+    others = [create_project(client, headers, f"Nuevo {i}") for i in range(12)]
+
+    with Session() as db:
+        entries = db.execute(select(models.ChangeLog.entity_id, models.ChangeLog.id)).all()
+        latest = change_log.latest_cursor(db)
+        pruned = change_log.horizon(db)
+    assert latest == 25
+    # Ventana de MAX_ENTRIES cursores y, de cada entidad, solo su última entrada
+    assert pruned >= latest - change_log.MAX_ENTRIES - change_log.PRUNE_EVERY
+    assert all(entry_id > pruned for _, entry_id in entries)
+    assert len({entity_id for entity_id, _ in entries}) == len(entries)
+    assert {entity_id for entity_id, _ in entries} <= set(others)
+
+
+def test_since_before_horizon_resets(client, headers, Session, small_log):
+    old_cursor = client.get("/api/changes").json()["cursor"]
+    ids = [create_project(client, headers, f"Proyecto {i}") for i in range(10)]
+    client.delete(f"/api/projects/{ids[0]}", headers=headers)
+
+    delta = client.get(f"/api/changes?since={old_cursor}").json()
+    with Session() as db:
+        assert old_cursor < change_log.horizon(db)
+        latest = change_log.latest_cursor(db)
+    # El borrado de ids[0] pudo podarse: recarga completa en lugar de un delta incompleto
+    assert delta["reset"] and delta["cursor"] == latest
+    assert not delta["projects"] and not delta["deleted"]["projects"]
+
+    # Desde el horizonte en adelante los deltas siguen completos
+    project_id = create_project(client, headers, "Después")
+    delta = client.get(f"/api/changes?since={latest}").json()
+    assert not delta["reset"] and [p["id"] for p in delta["projects"]] == [project_id]
+
+
+def test_old_entries_expire(client, headers, Session, monkeypatch):
+    ids = [create_project(client, headers, f"Proyecto {i}") for i in range(3)]
+    with Session() as db:
+        db.query(models.ChangeLog).filter(models.ChangeLog.entity_id != ids[-1]).update(
+            {"changed_at": datetime.utcnow() - timedelta(days=change_log.RETENTION_DAYS + 1)}
+        )
+        latest = change_log.latest_cursor(db)
+        assert change_log.prune(db, latest) == latest - 1
+        db.commit()
+        assert db.execute(select(func.count(models.ChangeLog.id))).scalar() == 1
+
+    assert client.get("/api/changes?since=0").json()["reset"]
+    assert not client.get(f"/api/changes?since={latest - 1}").json()["reset"]
@@ -0,0 +1,16 @@
+# tests/test_drawings.py
+"""Respuestas de los endpoints de dibujos."""
+
+POINT = {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [-77.03, -12.12]}}
+
+
+def test_add_drawing_hides_internal_columns(client, headers):
+    project = client.post("/api/projects", json={
+        "name": "Proyecto", "description": "", "status": "active", "districts": ["Miraflores"],
+    }, headers=headers).json()
+
+    response = client.post(f"/api/projects/{project['id']}/drawings",
+                           json={"geojson": POINT, "drawing_type": "marker"}, headers=headers)
+    assert response.status_code == 200, response.text
+    # bbox y hash de contenido son columnas internas
+    assert set(response.json()) == {"id", "geojson", "drawing_type", "created_at"}
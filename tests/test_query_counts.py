@@ -0,0 +1,122 @@
+# tests/test_query_counts.py
+"""
+Consultas y filas por endpoint de proyectos.
+
+El número de consultas es fijo (no crece con los proyectos: sin N+1) y las
+filas leídas son proyectos + distritos + dibujos (sin producto cartesiano
+districts × drawings).
+"""
+import pytest
+
+from backend import district_summary, models
+from backend.districts import resolve_ids
+
+DISTRICTS = ["MIRAFLORES", "SAN ISIDRO", "BARRANCO", "SURQUILLO", "LINCE", "JESUS MARIA", "BREÑA"]
+PROJECTS, PROJECT_DISTRICTS, DRAWINGS = 20, 3, 10
+
+LINE = {
+    "type": "Feature",
+    "properties": {},
+    "geometry": {"type": "LineString", "coordinates": [[-77.03 + i * 1e-4, -12.12 + i * 1e-4] for i in range(20)]},
+}
+POINT_IN_MIRAFLORES = {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [-77.03, -12.12]}}
+
+
+def project_districts(i: int):
+    return [DISTRICTS[(i + d) % len(DISTRICTS)] for d in range(PROJECT_DISTRICTS)]
+
+
+@pytest.fixture
+def seeded(Session):
+    with Session() as db:
+        ids = resolve_ids(db, DISTRICTS)
+        for i in range(PROJECTS):
+            project = models.Project(name=f"Proyecto {i}", status="active")
+            project.districts = [
+                models.ProjectDistrict(distrito_name=name, district_id=ids.get(name)) for name in project_districts(i)
+            ]
+            project.drawings = [
+                models.Drawing(geojson=LINE, drawing_type="polyline", bbox=(-77.03, -12.12, -77.02, -12.11),
+                               content_hash=models.Drawing.compute_hash(LINE, "polyline"))
+                for _ in range(DRAWINGS)
+            ]
+            db.add(project)
+        db.commit()
+        district_summary.rebuild(db)
+
+
+def measure(client, counter, method: str, url: str, **kwargs):
+    counter.reset()
+    response = client.request(method, url, **kwargs)
+    assert response.status_code == 200, response.text
+    return response
+
+
+# ---------------------------------------------
+# LECTURAS
+# ---------------------------------------------
+@pytest.mark.parametrize("include, queries, relation_rows", [
+    ("districts", 2, PROJECTS * PROJECT_DISTRICTS),
+    ("districts,drawings", 3, PROJECTS * (PROJECT_DISTRICTS + DRAWINGS)),
+])
+def test_list_projects(client, counter, seeded, include, queries, relation_rows):
+    response = measure(client, counter, "GET", f"/api/projects?limit={PROJECTS}&include={include}")
+    assert len(response.json()) == PROJECTS
+    assert counter.queries == queries
+    # + la fila extra que indica si hay página siguiente
+    assert counter.rows <= PROJECTS + 1 + relation_rows
+
+
+def test_get_project(client, counter, seeded):
+    response = measure(client, counter, "GET", "/api/projects/1")
+    assert len(response.json()["drawings"]) == DRAWINGS
+    assert counter.queries == 3
+    assert counter.rows <= 1 + PROJECT_DISTRICTS + DRAWINGS
+
+
+def test_district_projects(client, counter, seeded):
+    in_district = [i for i in range(PROJECTS) if DISTRICTS[0] in project_districts(i)]
+    response = measure(client, counter, "GET", f"/api/districts/{DISTRICTS[0]}/projects")
+    assert len(response.json()) == len(in_district)
+    # + la consulta de marca de agua del ETag (una fila)
+    assert counter.queries == 4
+    assert counter.rows <= 1 + len(in_district) * (1 + PROJECT_DISTRICTS + DRAWINGS)
+
+
+# ---------------------------------------------
+# ESCRITURAS
+# ---------------------------------------------
+def test_save_drawings_batch(client, counter, headers, seeded):
+    stored = client.get("/api/projects/1/drawings").json()
+    moved = dict(LINE, geometry={"type": "Point", "coordinates": [-77.04, -12.1]})
+    batch = [{"id": d["id"], "geojson": d["geojson"], "drawing_type": d["drawing_type"]} for d in stored[:-1]]
+    batch[0] = dict(batch[0], geojson=moved)                          # uno actualizado
+    batch.append({"geojson": POINT_IN_MIRAFLORES, "drawing_type": "marker"})  # uno nuevo, el último se borra
+
+    response = measure(client, counter, "POST", "/api/projects/1/drawings/batch", json={"drawings": batch},
+                       headers=headers)
+    result = response.json()
+    assert (result["inserted"], result["updated"], result["deleted"]) == (1, 1, 1)
+    # proyecto, estado guardado, DELETE/UPDATE/INSERT de dibujos, touch, resumen
+    # (distritos, borrado, variantes, agregado y 3 filas), 3 change_log y la respuesta (2)
+    assert counter.queries == 18, counter.statements
+
+
+def test_batch_summary_sees_auto_assigned_districts(client, headers, seeded, Session):
+    """Un lote que asigna MIRAFLORES a un proyecto lo suma al resumen de ese distrito."""
+    project_id = next(i for i in range(PROJECTS) if DISTRICTS[0] not in project_districts(i)) + 1
+    stats_url = f"/api/districts/{DISTRICTS[0]}/stats"
+    before = client.get(stats_url).json()["total"]
+
+    response = client.post(
+        f"/api/projects/{project_id}/drawings/batch?auto_assign_districts=true",
+        json={"drawings": [{"geojson": POINT_IN_MIRAFLORES, "drawing_type": "marker"}]}, headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert DISTRICTS[0] in response.json()["assigned_districts"]
+
+    with Session() as db:
+        expected = db.query(models.ProjectDistrict.project_id).filter(
+            models.ProjectDistrict.distrito_name == DISTRICTS[0]
+        ).distinct().count()
+    assert client.get(stats_url).json()["total"] == before + 1 == expected